@@ -0,0 +1,186 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, status
+from rest_framework.request import clone_request
+
+logger = logging.getLogger(__name__)
+
+
+def not_found():
+    return {
+        "status": status.HTTP_404_NOT_FOUND,
+        "body": {"detail": _("Not found.")},
+    }
+
+
+def server_error():
+    return {
+        "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+        "body": {"detail": _("A server error occurred.")},
+    }
+
+
+def api_error(error):
+    return {"status": error.status_code, "body": {"detail": error.detail}}
+
+
+def resolve_path(path, viewsets):
+    """Return the resolver match and query string of a sub-request path
+
+    The match is ``None`` unless the path routes to a GET action of one of
+    the viewsets, so a batch cannot reach any other view of the project.
+    """
+    parts = urlsplit(path)
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return None, parts.query
+    cls = getattr(match.func, "cls", None)
+    actions = getattr(match.func, "actions", {})
+    if cls not in viewsets or "get" not in actions:
+        return None, parts.query
+    return match, parts.query
+
+
+def is_coalescable(match, query):
+    """Check a sub-request is a plain detail lookup"""
+    return (
+        match.func.actions["get"] == "retrieve"
+        and not query
+        and "pk" in match.kwargs
+    )
+
+
+def retrieve_many(request, cls, pks):
+    """Answer several detail lookups from one query
+
+    Returns the response entry of each primary key found. The viewset's
+    permissions are checked as its views would, for the request and for
+    each object, on a GET of the batch's request.
+    """
+    request = clone_request(request, "GET")
+    view = cls(request=request, format_kwarg=None, action="retrieve")
+    view.kwargs = {}
+    view.check_permissions(request)
+    queryset = view.get_queryset()
+    model = queryset.model
+    keys = {}
+    for pk in pks:
+        try:
+            keys[pk] = model._meta.pk.to_python(pk)
+        except ValidationError:
+            continue
+    objects = queryset.filter(pk__in=set(keys.values())).prefetch_related(
+        *(field.name for field in model._meta.many_to_many)
+    )
+    objects = {obj.pk: obj for obj in objects}
+    serializer_class = view.get_serializer_class()
+    context = view.get_serializer_context()
+    found = {}
+    for pk, key in keys.items():
+        if key not in objects:
+            continue
+        try:
+            view.check_object_permissions(request, objects[key])
+        except exceptions.APIException as error:
+            found[pk] = api_error(error)
+            continue
+        found[pk] = {
+            "status": status.HTTP_200_OK,
+            "body": serializer_class(objects[key], context=context).data,
+        }
+    return found
+
+
+def dispatch(request, match, path, query):
+    """Run a sub-request through its view as the batch's user"""
+    sub_request = HttpRequest()
+    sub_request.method = "GET"
+    sub_request.path = sub_request.path_info = path
+    sub_request.META = {
+        key: value
+        for key, value in request.META.items()
+        if key not in ("CONTENT_LENGTH", "CONTENT_TYPE", "wsgi.input")
+    }
+    sub_request.META["REQUEST_METHOD"] = "GET"
+    sub_request.META["QUERY_STRING"] = query
+    sub_request.GET = QueryDict(query)
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Http404:
+        return not_found()
+    except Exception:
+        logger.exception("Batch sub-request %s failed", path)
+        return server_error()
+    return {
+        "status": response.status_code,
+        "body": getattr(response, "data", None),
+    }
+
+
+def dispatch_in_thread(*args):
+    try:
+        return dispatch(*args)
+    finally:
+        connections.close_all()
+
+
+def execute(request, paths, viewsets, parallel=False):
+    """Return the response to each sub-request in order
+
+    Only GET routes of ``viewsets`` are served, others are not found.
+    Detail lookups on the same viewset are answered together from one
+    ``pk__in`` query. Other sub-requests are dispatched to their views,
+    concurrently on ``BATCH_WORKERS`` threads when ``parallel`` is set.
+    """
+    results = [None] * len(paths)
+    lookups = {}
+    dispatched = []
+    for index, path in enumerate(paths):
+        match, query = resolve_path(path, viewsets)
+        if match is None:
+            results[index] = not_found()
+        elif is_coalescable(match, query):
+            pk = match.kwargs["pk"]
+            lookups.setdefault(match.func.cls, []).append((index, pk))
+        else:
+            dispatched.append((index, match, urlsplit(path).path, query))
+
+    for cls, entries in lookups.items():
+        try:
+            found = retrieve_many(request, cls, [pk for index, pk in entries])
+        except exceptions.APIException as error:
+            for index, pk in entries:
+                results[index] = api_error(error)
+            continue
+        except Exception:
+            logger.exception("Batch lookups on %s failed", cls.__name__)
+            for index, pk in entries:
+                results[index] = server_error()
+            continue
+        for index, pk in entries:
+            results[index] = found.get(pk) or not_found()
+
+    if parallel and len(dispatched) > 1:
+        with ThreadPoolExecutor(settings.BATCH_WORKERS) as executor:
+            responses = list(
+                executor.map(
+                    lambda args: dispatch_in_thread(request, *args[1:]),
+                    dispatched,
+                )
+            )
+    else:
+        responses = [dispatch(request, *args[1:]) for args in dispatched]
+    for args, response in zip(dispatched, responses):
+        results[args[0]] = response
+    return results
@@ -0,0 +1,24 @@
+from urllib.parse import urlencode
+
+from rest_framework.response import Response
+
+from core import coalescing
+
+
+class CoalescedListMixin:
+    """Lists shared by concurrent identical requests and cached briefly
+
+    Catalog lists are the same for every authenticated user, so requests
+    with the same query string share one computation of the serialized
+    data, see ``core.coalescing.get_or_compute``. Each request is still
+    authenticated, throttled and rendered in its own format.
+    """
+
+    def list(self, request, *args, **kwargs):
+        compute = super().list
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        key = "%s?%s" % (type(self).__name__, query)
+        data = coalescing.get_or_compute(
+            key, lambda: compute(request, *args, **kwargs).data
+        )
+        return Response(data)
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, status
+
+
+class PreconditionFailed(exceptions.APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = _("The object was changed by another request.")
+    default_code = "precondition_failed"
+
+
+class PreconditionRequired(exceptions.APIException):
+    status_code = status.HTTP_428_PRECONDITION_REQUIRED
+    default_detail = _("An If-Match header is required.")
+    default_code = "precondition_required"
+
+
+def etag(version):
+    return '"%d"' % version
+
+
+def parse_if_match(header):
+    """Return the entity tags in an If-Match header, ignoring weakness
+
+    The compression middleware marks ETags weak once it re-encodes a body,
+    so ``W/"3"`` is accepted as version 3.
+    """
+    tags = set()
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+class VersionedModelMixin:
+    """Optimistic concurrency for viewsets of models with a version
+
+    Retrieves and writes send the object's version as its ``ETag``.
+    Updates and deletes first bump the version with a compare-and-swap
+    UPDATE. It matches the version given in ``If-Match``, or else the
+    version read at the start of the request. A writer that lost the race
+    gets ``412 Precondition Failed`` instead of overwriting the other's
+    change. No lock is held between reading and writing; readers never
+    wait, and writers only contend while the winning write commits.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        return self.tag(response)
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        return self.tag(response)
+
+    def tag(self, response):
+        version = response.data.get("version")
+        if version is not None:
+            response["ETag"] = etag(version)
+        return response
+
+    def get_expected_version(self, instance):
+        header = self.request.META.get("HTTP_IF_MATCH")
+        if header is None:
+            if settings.REQUIRE_IF_MATCH:
+                raise PreconditionRequired()
+            return instance.version
+        tags = parse_if_match(header)
+        if "*" not in tags and etag(instance.version) not in tags:
+            raise PreconditionFailed()
+        return instance.version
+
+    def claim(self, instance):
+        """Bump the stored version if it is still the expected one"""
+        expected = self.get_expected_version(instance)
+        claimed = (
+            type(instance)
+            .objects.filter(pk=instance.pk, version=expected)
+            .update(version=F("version") + 1)
+        )
+        if not claimed:
+            raise PreconditionFailed()
+        return expected + 1
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            version = self.claim(serializer.instance)
+            serializer.save(version=version)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            self.claim(instance)
+            instance.delete()
@@ -0,0 +1,31 @@
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from core import deletion
+from core.serializers import DeletionSerializer
+
+
+class ChunkedDestroyMixin:
+    """Deletes with set-based statements, large objects in the background
+
+    Objects with few dependents are deleted before answering ``204``.
+    Others answer ``202 Accepted`` with a deletion resource whose
+    ``deleted`` count grows as chunks are committed; its URL is in the
+    ``Location`` header. Views using this need ``VersionedModelMixin``.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        with transaction.atomic():
+            self.claim(instance)
+            job = deletion.schedule(instance)
+        if job is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        url = reverse("deletion", args=[job.pk], request=request)
+        return Response(
+            DeletionSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": url},
+        )
@@ -0,0 +1,337 @@
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Exists, OuterRef
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+from rest_framework.settings import api_settings
+
+from core import diet, fuzzy
+
+MAX_FUZZY_RESULTS = 100
+
+MAX_FILTER_VALUES = 50
+
+# The largest integer every supported database can store and compare.
+MAX_INTEGER = 2 ** 63 - 1
+
+
+@lru_cache(maxsize=None)
+def index_columns(model):
+    """Return the column tuples of every index on the model
+
+    Covers the primary key, ``db_index``/``unique`` fields, foreign keys,
+    ``Meta.indexes`` and ``unique_together``. Field names are used rather
+    than column names so they can be compared with query parameters.
+    """
+    opts = model._meta
+    indexes = {(opts.pk.name,)}
+    for field in opts.local_fields:
+        if field.db_index or field.unique:
+            indexes.add((field.name,))
+    for index in opts.indexes:
+        indexes.add(tuple(name.lstrip("-") for name in index.fields))
+    for fields in opts.unique_together:
+        indexes.add(tuple(fields))
+    return frozenset(indexes)
+
+
+def is_indexed(model, column, leading=()):
+    """Check an index serves ``column`` once ``leading`` columns are fixed
+
+    An index matches when its columns start with any number of the
+    ``leading`` (equality filtered) columns followed by ``column``.
+    """
+    for columns in index_columns(model):
+        position = 0
+        while position < len(columns) and columns[position] in leading:
+            position += 1
+        if position < len(columns) and columns[position] == column:
+            return True
+    return False
+
+
+def parse_ids(param, raw):
+    """Parse a comma separated list of primary keys"""
+    try:
+        ids = [int(value) for value in raw.split(",") if value.strip()]
+        if any(abs(pk) > MAX_INTEGER for pk in ids):
+            raise ValueError
+    except ValueError:
+        msg = _("Expected a comma separated list of ids.")
+        raise exceptions.ValidationError({param: [msg]})
+    if len(ids) > MAX_FILTER_VALUES:
+        msg = _("At most %d ids may be given.") % MAX_FILTER_VALUES
+        raise exceptions.ValidationError({param: [msg]})
+    return ids
+
+
+def parse_number(param, raw, low, high=None):
+    """Parse a whole number between ``low`` and ``high`` inclusive
+
+    Without ``high`` the number may go up to ``MAX_INTEGER``, beyond which
+    databases cannot compare it with a column.
+    """
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        value = low - 1
+    if value < low or value > (MAX_INTEGER if high is None else high):
+        msg = _("Expected a number of at least %d.") % low
+        if high is not None:
+            msg = _("Expected a number from %d to %d.") % (low, high)
+        raise exceptions.ValidationError({param: [msg]})
+    return value
+
+
+class CatalogFilter:
+    """A query parameter compiled into a single indexed WHERE predicate
+
+    ``column`` is the model field the predicate runs against, or ``None``
+    when the predicate is an EXISTS subquery on another table. Equality
+    filters fix their column to one value, so an index may skip past it
+    when serving the requested ordering.
+    """
+
+    column = None
+
+    def __init__(self, param):
+        self.param = param
+
+    def check(self, model):
+        """Raise if the predicate cannot use an index"""
+        if self.column is not None and not is_indexed(model, self.column):
+            raise ImproperlyConfigured(
+                "Filter '%s' on %s.%s has no index."
+                % (self.param, model.__name__, self.column)
+            )
+
+    def is_active(self, params):
+        return self.param in params
+
+    def is_equality(self, params):
+        return False
+
+    def filter(self, queryset, params):
+        raise NotImplementedError
+
+
+class RangeFilter(CatalogFilter):
+    """Filters a numeric field with ``min_<param>`` and ``max_<param>``
+
+    Bounds are checked with the field's own validators and against
+    ``MAX_INTEGER``, so a value the column could not hold is rejected
+    rather than sent to the database.
+    """
+
+    def __init__(self, param, field=None):
+        super().__init__(param)
+        self.column = field or param
+
+    def is_active(self, params):
+        return "min_" + self.param in params or "max_" + self.param in params
+
+    def filter(self, queryset, params):
+        field = queryset.model._meta.get_field(self.column)
+        for prefix, lookup in (("min_", "gte"), ("max_", "lte")):
+            name = prefix + self.param
+            if name not in params:
+                continue
+            try:
+                value = field.to_python(params[name])
+                field.run_validators(value)
+            except DjangoValidationError as error:
+                raise exceptions.ValidationError({name: error.messages})
+            if isinstance(value, int) and abs(value) > MAX_INTEGER:
+                msg = _("Expected a number from %d to %d.") % (
+                    -MAX_INTEGER,
+                    MAX_INTEGER,
+                )
+                raise exceptions.ValidationError({name: [msg]})
+            lookup = "%s__%s" % (self.column, lookup)
+            queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+
+class MembershipFilter(CatalogFilter):
+    """Filters a foreign key against a comma separated list of ids"""
+
+    def __init__(self, param, field=None):
+        super().__init__(param)
+        self.column = field or param
+
+    def is_equality(self, params):
+        return len(parse_ids(self.param, params[self.param])) == 1
+
+    def filter(self, queryset, params):
+        ids = parse_ids(self.param, params[self.param])
+        return queryset.filter(**{"%s__in" % self.column: ids})
+
+
+class ExistsFilter(CatalogFilter):
+    """Filters on related ids with EXISTS subqueries over a through table
+
+    Joining the relation would return one row per matching link and need a
+    DISTINCT; an EXISTS probe uses the through table's index and never
+    duplicates rows. ``<param>_match=all`` requires every id to be linked,
+    adding one probe per id, otherwise any of the ids is enough.
+    """
+
+    def __init__(self, param, through, outer, field):
+        super().__init__(param)
+        self.through = through
+        self.outer = outer
+        self.field = field
+
+    def check(self, model):
+        outer = self.through._meta.get_field(self.outer)
+        if not outer.db_index:
+            raise ImproperlyConfigured(
+                "Filter '%s' has no index on %s.%s."
+                % (self.param, self.through.__name__, self.outer)
+            )
+
+    def filter(self, queryset, params):
+        ids = parse_ids(self.param, params[self.param])
+        match = params.get(self.param + "_match", "any")
+        if match not in ("any", "all"):
+            msg = _("Expected 'any' or 'all'.")
+            raise exceptions.ValidationError({self.param + "_match": [msg]})
+
+        links = self.through.objects.filter(**{self.outer: OuterRef("pk")})
+        lookup = self.field + "__in"
+        if match == "any":
+            return queryset.filter(Exists(links.filter(**{lookup: ids})))
+        for pk in ids:
+            queryset = queryset.filter(Exists(links.filter(**{lookup: [pk]})))
+        return queryset
+
+
+def parse_diet(param, raw):
+    """Parse a comma separated list of dietary flags into a bitmask"""
+    flags = [value.strip() for value in raw.split(",") if value.strip()]
+    unknown = [flag for flag in flags if flag not in diet.BITS]
+    if not flags or unknown:
+        msg = _("Expected a comma separated list of %s.") % ", ".join(
+            diet.FLAGS
+        )
+        raise exceptions.ValidationError({param: [msg]})
+    return diet.mask(flags)
+
+
+class DietFilter(CatalogFilter):
+    """Filters dishes having all of some dietary flags, e.g. ``vegan``
+
+    The flags are matched against the precomputed ``diet`` bitmask with a
+    single ``IN`` over the bitmasks holding them, so no ingredient is
+    read. ``field`` is the path to that bitmask; with ``through``, objects
+    match through an EXISTS probe for a linked dish like ``ExistsFilter``.
+    """
+
+    def __init__(self, param, field="diet", through=None, outer=None):
+        super().__init__(param)
+        self.field = field
+        self.through = through
+        self.outer = outer
+        if through is None:
+            self.column = field
+
+    def check(self, model):
+        if self.through is None:
+            return super().check(model)
+        outer = self.through._meta.get_field(self.outer)
+        if not outer.db_index:
+            raise ImproperlyConfigured(
+                "Filter '%s' has no index on %s.%s."
+                % (self.param, self.through.__name__, self.outer)
+            )
+
+    def filter(self, queryset, params):
+        masks = diet.supersets(parse_diet(self.param, params[self.param]))
+        lookup = {self.field + "__in": masks}
+        if self.through is None:
+            return queryset.filter(**lookup)
+        links = self.through.objects.filter(
+            **{self.outer: OuterRef("pk")}, **lookup
+        )
+        return queryset.filter(Exists(links))
+
+
+class CatalogFilterBackend(BaseFilterBackend):
+    """Applies the ``catalog_filters`` declared on a view
+
+    Requests which combine filters with an ordering the indexes cannot
+    serve are rejected instead of making the database sort the result.
+    """
+
+    ordering_param = api_settings.ORDERING_PARAM
+    _checked = set()
+
+    def get_filters(self, view, model):
+        catalog_filters = getattr(view, "catalog_filters", ())
+        if type(view) not in self._checked:
+            for catalog_filter in catalog_filters:
+                catalog_filter.check(model)
+            self._checked.add(type(view))
+        return catalog_filters
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        catalog_filters = self.get_filters(view, queryset.model)
+        active = [f for f in catalog_filters if f.is_active(params)]
+        if not active:
+            return queryset
+
+        self.check_ordering(view, queryset.model, params, active)
+        for catalog_filter in active:
+            queryset = catalog_filter.filter(queryset, params)
+        return queryset
+
+    def check_ordering(self, view, model, params, active):
+        """Reject an ordering that needs a sort of the filtered rows"""
+        ordering = params.get(self.ordering_param)
+        if not ordering:
+            return
+        column = ordering.split(",")[0].strip().lstrip("-")
+        orderings = getattr(view, "orderings", {})
+        if column in orderings:
+            column = orderings[column][0]
+        if column == "pk":
+            return
+        leading = {f.column for f in active if f.is_equality(params)}
+        if not is_indexed(model, column, leading):
+            msg = _("Ordering by '%s' is not supported with these filters.")
+            raise exceptions.ValidationError(
+                {self.ordering_param: [msg % column]}
+            )
+
+
+class FuzzySearchFilter(SearchFilter):
+    """``?search=`` with ``?search_mode=fuzzy`` for typo tolerant names
+
+    Fuzzy searches rank up to ``MAX_FUZZY_RESULTS`` objects by the trigram
+    similarity of their name, so they must come after the ordering
+    backend and cannot be combined with ``?ordering=``. Substring search,
+    the default mode, is left to ``SearchFilter``.
+    """
+
+    mode_param = "search_mode"
+    modes = ("substring", "fuzzy")
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        mode = params.get(self.mode_param, "substring")
+        if mode not in self.modes:
+            msg = _("Expected one of: %s.") % ", ".join(self.modes)
+            raise exceptions.ValidationError({self.mode_param: [msg]})
+        text = params.get(self.search_param, "").strip()
+        if mode == "substring" or not text:
+            return super().filter_queryset(request, queryset, view)
+        if params.get(api_settings.ORDERING_PARAM):
+            msg = _("Fuzzy search results are ordered by similarity.")
+            raise exceptions.ValidationError(
+                {api_settings.ORDERING_PARAM: [msg]}
+            )
+        return fuzzy.search(queryset, text, MAX_FUZZY_RESULTS)
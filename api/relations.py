@@ -0,0 +1,80 @@
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+from api.concurrency import etag
+from api.filters import parse_number
+from core.fields import BulkPrimaryKeyRelatedField
+
+MAX_LINKS = 1000
+
+
+class LinkedCollectionMixin:
+    """Sub-resources paging through and editing many-to-many fields
+
+    ``GET`` lists the linked ids in pages keyed by id, ``?after=<id>`` and
+    ``?limit=``. ``POST`` and ``DELETE`` take ``{"ids": [...]}`` and add or
+    remove those links only, so large collections are never sent whole.
+    Edits bump the owner's version like any other update and honour
+    ``If-Match``; views using this need ``VersionedModelMixin``.
+    """
+
+    def manage_links(self, request, field_name):
+        instance = self.get_object()
+        field = instance._meta.get_field(field_name)
+        if request.method == "GET":
+            return self.list_links(instance, field)
+
+        objects = self.get_linked_objects(request, field)
+        relation = getattr(instance, field_name)
+        with transaction.atomic():
+            version = self.claim(instance)
+            if request.method == "POST":
+                relation.add(*objects)
+            else:
+                relation.remove(*objects)
+        response = Response({"version": version})
+        response["ETag"] = etag(version)
+        return response
+
+    def list_links(self, instance, field):
+        params = self.request.query_params
+        after = parse_number("after", params.get("after", 0), 0)
+        limit = parse_number("limit", params.get("limit", 100), 1, MAX_LINKS)
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        links = field.remote_field.through.objects.filter(
+            **{source: instance.pk, target + "__gt": after}
+        )
+        ids = list(
+            self.filter_links(links, field)
+            .order_by(target)
+            .values_list(target, flat=True)[:limit]
+        )
+        return Response(
+            {
+                "results": ids,
+                "next": ids[-1] if len(ids) == limit else None,
+            }
+        )
+
+    def filter_links(self, links, field):
+        """Narrow the link rows listed for a field, by default none are"""
+        return links
+
+    def get_linked_objects(self, request, field):
+        """Return the objects for the submitted ids, fetched in one query"""
+        ids = request.data.get("ids") if hasattr(request.data, "get") else None
+        if isinstance(ids, list) and len(ids) > MAX_LINKS:
+            msg = _("Expected at most %d ids.") % MAX_LINKS
+            raise exceptions.ValidationError({"ids": [msg]})
+        related = BulkPrimaryKeyRelatedField(
+            queryset=field.related_model.objects.all(),
+            many=True,
+            allow_empty=False,
+        )
+        try:
+            return related.run_validation(ids)
+        except exceptions.ValidationError as error:
+            raise exceptions.ValidationError({"ids": error.detail})
@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Cuisine, Dish, Ingredient, Menu, Restaurant
+
+ANALYTICS_URL = reverse("analytics")
+
+
+class TestAnalyticsAPI(TestCase):
+    """Test the catalog analytics endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+
+    def test_login_required(self):
+        res = self.client.get(ANALYTICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_report(self):
+        self.client.force_authenticate(user=self.user)
+        indian = Cuisine.objects.create(name="Indian", origin="India")
+        rice = Ingredient.objects.create(name="Rice", price="1.00")
+        dishes = [
+            Dish.objects.create(name=name, price=price, cuisine=indian)
+            for name, price in (("A", "10.00"), ("B", "5.00"), ("C", "6.00"))
+        ]
+        dishes[0].ingredients.add(rice)
+        restaurant = Restaurant.objects.create(
+            name="Spice",
+            owner="A",
+            location="Delhi",
+            email="a@spice.com",
+            contact_number="123",
+            website="https://spice.com",
+        )
+        Menu.objects.create(restaurant=restaurant).dishes.add(*dishes[:2])
+
+        with self.assertNumQueries(3):
+            res = self.client.get(ANALYTICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["cuisines"],
+            [
+                {
+                    "cuisine": indian.id,
+                    "name": "Indian",
+                    "dishes": 3,
+                    "avg_price": Decimal("7.00"),
+                }
+            ],
+        )
+        self.assertEqual(
+            res.data["restaurants"][0]["avg_price"], Decimal("7.50")
+        )
+        self.assertEqual(
+            res.data["ingredients"],
+            [{"ingredient": rice.id, "name": "Rice", "dishes": 1}],
+        )
+
+    def test_report_limit(self):
+        """Test each section lists the entries with the most dishes"""
+        self.client.force_authenticate(user=self.user)
+        cuisines = [
+            Cuisine.objects.create(name=name, origin=name)
+            for name in ("Thai", "Indian", "Greek")
+        ]
+        for count, cuisine in enumerate(cuisines, 1):
+            for number in range(count):
+                Dish.objects.create(
+                    name="%s %d" % (cuisine.name, number),
+                    price="5.00",
+                    cuisine=cuisine,
+                )
+
+        res = self.client.get(ANALYTICS_URL, {"limit": 2})
+
+        self.assertEqual(
+            [(row["name"], row["dishes"]) for row in res.data["cuisines"]],
+            [("Greek", 3), ("Indian", 2)],
+        )
+        res = self.client.get(ANALYTICS_URL, {"limit": 0})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
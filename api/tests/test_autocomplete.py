@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.autocomplete import name_index
+from core.models import Dish, Ingredient
+
+AUTOCOMPLETE_URL = reverse("autocomplete")
+
+
+class TestAutocompleteAPI(TestCase):
+    """Test the autocomplete endpoint"""
+
+    def setUp(self):
+        name_index.clear()
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.dish = Dish.objects.create(name="Paneer Tikka", price="12.00")
+        self.paneer = Ingredient.objects.create(name="Paneer", price="3.00")
+
+    def test_suggestions(self):
+        with self.assertNumQueries(4):
+            res = self.client.get(AUTOCOMPLETE_URL, {"q": "pan"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {
+                "dish": [{"id": self.dish.id, "name": "Paneer Tikka"}],
+                "ingredient": [{"id": self.paneer.id, "name": "Paneer"}],
+                "cuisine": [],
+                "restaurant": [],
+            },
+        )
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                AUTOCOMPLETE_URL, {"q": "tik", "types": "dish", "k": 1}
+            )
+        self.assertEqual(
+            res.data, {"dish": [{"id": self.dish.id, "name": "Paneer Tikka"}]}
+        )
+
+    def test_invalid_params(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "a", "types": "menu"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "a", "k": 0})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
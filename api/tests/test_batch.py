@@ -0,0 +1,154 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.test import APIClient
+
+from api.views import DishesViewSet
+from core.models import Cuisine, Dish, Ingredient
+from core.serializers import DishSerializer
+
+BATCH_URL = reverse("batch")
+
+
+class TestBatchAPI(TestCase):
+    """Test the batch request endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.rice = Ingredient.objects.create(name="Rice", price="1.00")
+        self.dishes = [
+            Dish.objects.create(name="Dish %d" % i, price="1.00")
+            for i in range(3)
+        ]
+        for dish in self.dishes:
+            dish.ingredients.add(self.rice)
+
+    def test_login_required(self):
+        self.client.force_authenticate(user=None)
+
+        res = self.client.post(
+            BATCH_URL, {"requests": ["/api/dishes/"]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_coalesces_detail_lookups(self):
+        """Test detail lookups on one resource share a single query"""
+        paths = ["/api/dishes/%d/" % dish.id for dish in self.dishes]
+        paths += ["/api/dishes/999/", "/api/ingredients/%d/" % self.rice.id]
+
+        with self.assertNumQueries(3):
+            res = self.client.post(
+                BATCH_URL, {"requests": paths}, format="json"
+            )
+
+        responses = res.data["responses"]
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [response["status"] for response in responses],
+            [200, 200, 200, 404, 200],
+        )
+        self.assertEqual(
+            responses[1]["body"], DishSerializer(self.dishes[1]).data
+        )
+        self.assertEqual(responses[4]["body"]["name"], "Rice")
+
+    def test_dispatches_other_requests(self):
+        Cuisine.objects.create(name="Thai", origin="Thailand")
+        paths = [
+            "/api/cuisines/?ordering=name",
+            "/api/dishes/%d/similar/" % self.dishes[0].id,
+            "/api/nowhere/",
+        ]
+
+        res = self.client.post(BATCH_URL, {"requests": paths}, format="json")
+
+        responses = res.data["responses"]
+        self.assertEqual(responses[0]["body"][0]["name"], "Thai")
+        self.assertEqual(responses[1]["status"], 200)
+        self.assertEqual(responses[2]["status"], 404)
+
+    def test_only_catalog_viewsets(self):
+        """Test paths outside the catalog viewsets are not served"""
+        paths = [
+            "/admin/",
+            "/api/user/me/",
+            "/health/ready/",
+            "/api/",
+            "/api/batch/",
+            "/api/dishes/",
+        ]
+
+        res = self.client.post(BATCH_URL, {"requests": paths}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [response["status"] for response in res.data["responses"]],
+            [404, 404, 404, 404, 404, 200],
+        )
+
+    def test_coalesced_lookups_check_permissions(self):
+        """Test detail lookups answered together keep their permissions"""
+        paths = [
+            "/api/dishes/%d/" % self.dishes[0].id,
+            "/api/ingredients/%d/" % self.rice.id,
+        ]
+
+        with patch.object(
+            DishesViewSet, "permission_classes", (IsAdminUser,)
+        ):
+            res = self.client.post(
+                BATCH_URL, {"requests": paths}, format="json"
+            )
+
+        self.assertEqual(
+            [response["status"] for response in res.data["responses"]],
+            [403, 200],
+        )
+
+    def test_failed_sub_request(self):
+        """Test an error in one sub-request fails only its own entry"""
+        paths = [
+            "/api/dishes/%d/similar/" % self.dishes[0].id,
+            "/api/dishes/%d/" % self.dishes[0].id,
+        ]
+
+        with patch(
+            "api.views.dish_index.similar", side_effect=RuntimeError
+        ), self.assertLogs("api.batch", "ERROR"):
+            res = self.client.post(
+                BATCH_URL, {"requests": paths}, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [response["status"] for response in res.data["responses"]],
+            [500, 200],
+        )
+
+    def test_parallel(self):
+        paths = ["/api/nowhere/", "/api/dishes/?min_price=abc"]
+
+        res = self.client.post(
+            BATCH_URL, {"requests": paths, "parallel": True}, format="json"
+        )
+
+        self.assertEqual(
+            [response["status"] for response in res.data["responses"]],
+            [404, 400],
+        )
+
+    def test_invalid_batch(self):
+        res = self.client.post(
+            BATCH_URL, {"requests": ["/api/dishes/"] * 51}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
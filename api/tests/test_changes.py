@@ -0,0 +1,159 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import changes
+from core.authentication import read_stream_ticket
+from core.models import CatalogChange, Dish, ExpiringToken, Ingredient, Menu
+
+CHANGES_URL = reverse("changes")
+TICKET_URL = reverse("event-ticket")
+
+
+class TestChangesAPI(TestCase):
+    """Test the catalog change feed"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_current_version(self):
+        Ingredient.objects.create(name="Rice", price="1.00")
+
+        res = self.client.get(CHANGES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"version": changes.current_version()})
+
+    def test_changes_since(self):
+        """Test only the latest state of objects changed since is sent"""
+        rice = Ingredient.objects.create(name="Rice", price="1.00")
+        version = changes.current_version()
+        dish = Dish.objects.create(name="Biryani", price="10.00")
+        dish.ingredients.add(rice)
+        menu = Menu.objects.create()
+        menu_id = menu.id
+        menu.delete()
+
+        res = self.client.get(CHANGES_URL, {"since": version})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["version"], changes.current_version())
+        self.assertFalse(res.data["more"])
+        self.assertEqual(
+            res.data["changes"],
+            {
+                "dish": {
+                    "upserted": [
+                        {
+                            "id": dish.id,
+                            "ingredients": [rice.id],
+                            "name": "Biryani",
+                            "price": Decimal("10.00"),
+                            "serves": 1,
+                            "cuisine": None,
+                            "diet": [],
+                            "version": 1,
+                        }
+                    ],
+                    "deleted": [],
+                },
+                "menu": {"upserted": [], "deleted": [menu_id]},
+            },
+        )
+
+    def test_pages(self):
+        for name in "ABC":
+            Ingredient.objects.create(name=name, price="1.00")
+
+        res = self.client.get(CHANGES_URL, {"since": 0, "limit": 2})
+        names = [
+            i["name"] for i in res.data["changes"]["ingredient"]["upserted"]
+        ]
+        res = self.client.get(
+            CHANGES_URL, {"since": res.data["version"], "limit": 2}
+        )
+
+        self.assertFalse(res.data["more"])
+        names += [
+            i["name"] for i in res.data["changes"]["ingredient"]["upserted"]
+        ]
+        self.assertEqual(names, ["A", "B", "C"])
+
+    def test_late_commit_not_skipped(self):
+        """Test a change committed after later ones is still served"""
+        rice = Ingredient.objects.create(name="Rice", price="1.00")
+        early = CatalogChange.objects.get()
+        # Ids are taken before commit: stand in for a transaction that
+        # logged the change first but is still open.
+        early.delete()
+        Ingredient.objects.create(name="Salt", price="1.00")
+        res = self.client.get(CHANGES_URL, {"since": 0})
+        version = res.data["version"]
+        self.assertEqual(
+            [i["name"] for i in res.data["changes"]["ingredient"]["upserted"]],
+            ["Salt"],
+        )
+
+        CatalogChange.objects.create(
+            id=early.id,
+            model="ingredient",
+            object_id=rice.id,
+            operation=CatalogChange.CREATE,
+        )
+        res = self.client.get(CHANGES_URL, {"since": version})
+
+        self.assertGreater(res.data["version"], version)
+        self.assertEqual(
+            [i["name"] for i in res.data["changes"]["ingredient"]["upserted"]],
+            ["Rice"],
+        )
+
+    def test_compacted_version_gone(self):
+        Menu.objects.create().delete()
+        changes.compact(timezone.now() + timedelta(seconds=1))
+
+        res = self.client.get(CHANGES_URL, {"since": 0})
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+        self.assertEqual(res.data["version"], changes.current_version())
+
+    def test_invalid_since(self):
+        res = self.client.get(CHANGES_URL, {"since": "abc"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestEventTicketAPI(TestCase):
+    """Test tickets for opening change streams"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+
+    def test_ticket_issued(self):
+        token = ExpiringToken.objects.issue(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
+
+        res = self.client.post(TICKET_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["expires_in"], 30)
+        user = read_stream_ticket(res.data["ticket"])
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_ticket_requires_authentication(self):
+        res = self.client.post(TICKET_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Dish
+
+DISHES_URL = reverse("dish-list")
+
+
+@override_settings(CATALOG_CACHE_TTL=60)
+class TestCoalescedLists(TestCase):
+    """Test catalog lists are cached until the catalog changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Dish.objects.create(name="Biryani", price="10.00")
+
+    def test_list_cached_until_write(self):
+        res = self.client.get(DISHES_URL, {"ordering": "name"})
+        self.assertEqual([dish["name"] for dish in res.data], ["Biryani"])
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                DISHES_URL,
+                {"ordering": "name"},
+                HTTP_ACCEPT="application/msgpack",
+            )
+        self.assertEqual(res["Content-Type"], "application/msgpack")
+
+        Dish.objects.create(name="Korma", price="9.00")
+
+        res = self.client.get(DISHES_URL, {"ordering": "name"})
+        self.assertEqual(
+            [dish["name"] for dish in res.data], ["Biryani", "Korma"]
+        )
+
+    def test_query_strings_cached_apart(self):
+        res = self.client.get(DISHES_URL, {"max_price": 5})
+        self.assertEqual(res.data, [])
+
+        res = self.client.get(DISHES_URL, {"max_price": 50})
+        self.assertEqual(len(res.data), 1)
@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.concurrency import VersionedModelMixin, parse_if_match
+from api.views import DishesViewSet
+from core.models import Dish, Menu
+
+
+class TestOptimisticConcurrency(TestCase):
+    """Test versioned updates with If-Match preconditions"""
+
+    def setUp(self):
+        self.staff_user = get_user_model().objects.create_superuser(
+            email="abc@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff_user)
+        self.dish = Dish.objects.create(name="Biryani", price="10.00")
+        self.menu = Menu.objects.create()
+        self.url = reverse("menu-detail", args=[self.menu.id])
+
+    def test_retrieve_sends_etag(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(res["ETag"], '"1"')
+        self.assertEqual(res.data["version"], 1)
+
+    def test_update_with_matching_version(self):
+        """Test a matching If-Match applies the change and bumps the version"""
+        res = self.client.patch(
+            self.url, {"dishes": [self.dish.id]}, HTTP_IF_MATCH='W/"1"'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["ETag"], '"2"')
+        self.menu.refresh_from_db()
+        self.assertEqual(self.menu.version, 2)
+        self.assertEqual(list(self.menu.dishes.all()), [self.dish])
+
+    def test_stale_update_rejected(self):
+        """Test an update based on an old version loses no other change"""
+        self.client.patch(self.url, {"dishes": [self.dish.id]})
+
+        res = self.client.patch(self.url, {"dishes": []}, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(list(self.menu.dishes.all()), [self.dish])
+
+    def test_stale_delete_rejected(self):
+        Menu.objects.filter(pk=self.menu.pk).update(version=3)
+
+        res = self.client.delete(self.url, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(Menu.objects.filter(pk=self.menu.pk).exists())
+
+    def test_version_changed_after_read(self):
+        """Test the compare-and-swap fails if the row moved on meanwhile"""
+        url = reverse("dish-detail", args=[self.dish.id])
+
+        def racing(viewset, instance):
+            Dish.objects.filter(pk=instance.pk).update(version=5)
+            return VersionedModelMixin.get_expected_version(viewset, instance)
+
+        with patch.object(
+            DishesViewSet,
+            "get_expected_version",
+            autospec=True,
+            side_effect=racing,
+        ):
+            res = self.client.patch(url, {"name": "Pulao"})
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.name, "Biryani")
+
+    @override_settings(REQUIRE_IF_MATCH=True)
+    def test_if_match_required(self):
+        res = self.client.delete(self.url)
+
+        self.assertEqual(
+            res.status_code, status.HTTP_428_PRECONDITION_REQUIRED
+        )
+
+    def test_parse_if_match(self):
+        self.assertEqual(
+            parse_if_match('"1", W/"2" ,*'), {'"1"', '"2"', "*"}
+        )
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Cuisine, Deletion, Dish, Menu, Restaurant
+
+
+class TestDeletionsAPI(TestCase):
+    """Test deleting restaurants and cuisines through the API"""
+
+    def setUp(self):
+        self.staff_user = get_user_model().objects.create_superuser(
+            email="abc@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff_user)
+        self.restaurant = Restaurant.objects.create(
+            name="Spice",
+            owner="A",
+            location="Delhi",
+            email="a@spice.com",
+            contact_number="123",
+            website="https://spice.com",
+        )
+        self.cuisine = Cuisine.objects.create(name="Indian", origin="India")
+        dish = Dish.objects.create(
+            name="Biryani", price="10.00", cuisine=self.cuisine
+        )
+        for _ in range(3):
+            Menu.objects.create(restaurant=self.restaurant).dishes.add(dish)
+
+    def test_small_delete(self):
+        url = reverse("cuisine-detail", args=[self.cuisine.id])
+
+        res = self.client.delete(url)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Cuisine.objects.exists())
+        self.assertFalse(Dish.objects.exists())
+        self.assertEqual(Menu.objects.count(), 3)
+
+    @override_settings(DELETION_ASYNC_THRESHOLD=2)
+    def test_large_delete(self):
+        """Test a large delete is accepted with a progress resource"""
+        url = reverse("restaurant-detail", args=[self.restaurant.id])
+
+        res = self.client.delete(url, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job = Deletion.objects.get()
+        self.assertEqual(res.data["total"], 4)
+        self.assertEqual(res.data["status"], Deletion.PENDING)
+        self.assertTrue(
+            res["Location"].endswith(reverse("deletion", args=[job.id]))
+        )
+
+        res = self.client.get(res["Location"])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["deleted"], 0)
+
+    def test_stale_version(self):
+        url = reverse("restaurant-detail", args=[self.restaurant.id])
+
+        res = self.client.delete(url, HTTP_IF_MATCH='"5"')
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(Restaurant.objects.exists())
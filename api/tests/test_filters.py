@@ -0,0 +1,168 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from api.filters import CatalogFilterBackend, RangeFilter, is_indexed
+from api.views import RestaurantViewSet
+from core.models import Cuisine, Dish, Ingredient, Menu, Restaurant
+
+
+class TestCatalogFilters(TestCase):
+    """Test filtering the catalog with query parameters"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.paneer = Ingredient.objects.create(name="Paneer", price=3)
+        self.tomato = Ingredient.objects.create(name="Tomato", price=1)
+        self.indian = Cuisine.objects.create(name="Indian", origin="India")
+        self.italian = Cuisine.objects.create(name="Italian", origin="Italy")
+        self.tikka = Dish.objects.create(
+            name="Paneer Tikka", price=12, serves=2, cuisine=self.indian
+        )
+        self.tikka.ingredients.add(self.paneer, self.tomato)
+        self.makhani = Dish.objects.create(
+            name="Paneer Makhani", price=18, serves=1, cuisine=self.indian
+        )
+        self.makhani.ingredients.add(self.paneer)
+        self.pizza = Dish.objects.create(
+            name="Pizza", price=10, serves=4, cuisine=self.italian
+        )
+        self.pizza.ingredients.add(self.tomato)
+        self.restaurant = Restaurant.objects.create(
+            name="Spice",
+            owner="A",
+            location="Delhi",
+            email="a@spice.com",
+            contact_number="123",
+            website="https://spice.com",
+        )
+        self.menu = Menu.objects.create(restaurant=self.restaurant)
+        self.menu.dishes.add(self.tikka, self.pizza)
+
+    def get_ids(self, params):
+        res = self.client.get(reverse("dish-list"), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return sorted(dish["id"] for dish in res.data)
+
+    def test_price_range(self):
+        ids = self.get_ids({"min_price": 11, "max_price": 15})
+        self.assertEqual(ids, [self.tikka.id])
+
+    def test_serves_range(self):
+        ids = self.get_ids({"min_serves": 2})
+        self.assertEqual(ids, sorted([self.tikka.id, self.pizza.id]))
+
+    def test_cuisine_price_and_ingredient_combined(self):
+        ids = self.get_ids(
+            {
+                "max_price": 15.0,
+                "cuisine": self.indian.id,
+                "ingredient": self.paneer.id,
+            }
+        )
+        self.assertEqual(ids, [self.tikka.id])
+
+    def test_ingredient_any_does_not_duplicate(self):
+        ingredients = "%d,%d" % (self.paneer.id, self.tomato.id)
+        ids = self.get_ids({"ingredient": ingredients})
+        self.assertEqual(
+            ids, sorted([self.tikka.id, self.makhani.id, self.pizza.id])
+        )
+
+    def test_ingredient_all(self):
+        ingredients = "%d,%d" % (self.paneer.id, self.tomato.id)
+        ids = self.get_ids(
+            {"ingredient": ingredients, "ingredient_match": "all"}
+        )
+        self.assertEqual(ids, [self.tikka.id])
+
+    def test_restaurant_membership(self):
+        ids = self.get_ids({"restaurant": self.restaurant.id})
+        self.assertEqual(ids, sorted([self.tikka.id, self.pizza.id]))
+
+    def test_menu_filtered_by_dish(self):
+        url = reverse("menu-list")
+        res = self.client.get(url, {"dish": self.makhani.id})
+        self.assertEqual(res.data, [])
+        res = self.client.get(url, {"dish": self.tikka.id})
+        self.assertEqual([menu["id"] for menu in res.data], [self.menu.id])
+
+    def test_diet(self):
+        """Test dishes are filtered on the flags of all their ingredients"""
+        self.paneer.vegetarian = self.paneer.nut_free = True
+        self.paneer.save()
+        self.tomato.vegetarian = self.tomato.vegan = True
+        self.tomato.nut_free = True
+        self.tomato.save()
+
+        ids = self.get_ids({"diet": "vegan"})
+        self.assertEqual(ids, [self.pizza.id])
+        ids = self.get_ids({"diet": "vegetarian,nut_free", "max_price": 15})
+        self.assertEqual(ids, sorted([self.tikka.id, self.pizza.id]))
+        ids = self.get_ids({"diet": "dairy_free"})
+        self.assertEqual(ids, [])
+
+    def test_menu_filtered_by_diet(self):
+        self.tomato.vegan = True
+        self.tomato.save()
+
+        res = self.client.get(reverse("menu-list"), {"diet": "vegan"})
+        self.assertEqual([menu["id"] for menu in res.data], [self.menu.id])
+        res = self.client.get(
+            reverse("menu-dishes", args=[self.menu.id]), {"diet": "vegan"}
+        )
+        self.assertEqual(res.data["results"], [self.pizza.id])
+        res = self.client.get(reverse("dish-list"), {"diet": "keto"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_values_rejected(self):
+        url = reverse("dish-list")
+        res = self.client.get(url, {"min_price": "cheap"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(url, {"min_serves": "9" * 30})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(url, {"max_price": "1e30"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(url, {"ingredient": "9" * 30})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(url, {"ingredient": "a,b"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(
+            url, {"ingredient": self.paneer.id, "ingredient_match": "some"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_indexed_ordering_allowed(self):
+        params = {"cuisine": self.indian.id, "ordering": "-price"}
+        res = self.client.get(reverse("dish-list"), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [dish["id"] for dish in res.data], [self.makhani.id, self.tikka.id]
+        )
+
+    def test_unindexed_ordering_rejected(self):
+        backend = CatalogFilterBackend()
+        with self.assertRaises(ValidationError):
+            backend.check_ordering(
+                RestaurantViewSet(),
+                Restaurant,
+                {"ordering": "owner"},
+                [RangeFilter("established")],
+            )
+
+    def test_index_lookup(self):
+        self.assertTrue(is_indexed(Dish, "price"))
+        self.assertTrue(is_indexed(Dish, "price", leading={"cuisine"}))
+        self.assertFalse(is_indexed(Dish, "ingredients"))
+
+    def test_unindexed_filter_declaration_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            RangeFilter("owner").check(Restaurant)
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Restaurant
+
+NEARBY_URL = reverse("restaurant-nearby")
+
+
+class TestNearbyAPI(TestCase):
+    """Test the nearby restaurants endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com",
+            password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.restaurant = Restaurant.objects.create(
+            name="Spice",
+            owner="A",
+            location="Delhi",
+            email="a@spice.com",
+            contact_number="123",
+            website="https://spice.com",
+            latitude=28.6315,
+            longitude=77.2167,
+        )
+
+    def test_nearby(self):
+        res = self.client.get(
+            NEARBY_URL, {"lat": 28.6139, "lng": 77.2090, "radius": 5}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        self.assertAlmostEqual(res.data[0]["distance"], 2.1, delta=0.1)
+        self.assertEqual(res.data[0]["restaurant"]["id"], self.restaurant.id)
+
+    def test_invalid_point(self):
+        res = self.client.get(NEARBY_URL, {"lat": 91, "lng": 0})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("lat", res.data)
+
+    def test_invalid_radius(self):
+        res = self.client.get(NEARBY_URL, {"lat": 0, "lng": 0, "radius": 1000})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.ordering import (
+    IndexedOrderingFilter,
+    is_index_ordered,
+    ordering_terms,
+    plan_sorts,
+)
+from api.urls import router
+from core.models import Dish, Ingredient, Restaurant
+
+
+class TestIndexedOrdering(TestCase):
+    """Test ordering catalog lists by whitelisted orderings"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.salt = Ingredient.objects.create(name="Salt", price=1)
+        self.honey = Ingredient.objects.create(name="Honey", price=4)
+        self.sugar = Ingredient.objects.create(name="Sugar", price=1)
+
+    def get_ids(self, ordering):
+        url = reverse("ingredient-list")
+        res = self.client.get(url, {"ordering": ordering})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [ingredient["id"] for ingredient in res.data]
+
+    def test_ties_broken_by_id(self):
+        self.assertEqual(
+            self.get_ids("price"), [self.salt.id, self.sugar.id, self.honey.id]
+        )
+
+    def test_descending_applies_to_tiebreaker(self):
+        self.assertEqual(
+            self.get_ids("-price"),
+            [self.honey.id, self.sugar.id, self.salt.id],
+        )
+
+    def test_default_ordering_by_id(self):
+        res = self.client.get(reverse("ingredient-list"))
+        self.assertEqual(
+            [ingredient["id"] for ingredient in res.data],
+            [self.salt.id, self.honey.id, self.sugar.id],
+        )
+
+    def test_unknown_ordering_rejected(self):
+        res = self.client.get(reverse("ingredient-list"), {"ordering": "pk"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ordering_terms(self):
+        self.assertEqual(ordering_terms(("price",)), ("price", "id"))
+        self.assertEqual(
+            ordering_terms(("cuisine", "price"), descending=True),
+            ("-cuisine", "-price", "-id"),
+        )
+        self.assertEqual(ordering_terms(("id",)), ("id",))
+
+    def test_declared_orderings_are_indexed(self):
+        for prefix, viewset, basename in router.registry:
+            model = viewset.queryset.model
+            for keys in viewset.orderings.values():
+                self.assertTrue(is_index_ordered(model, keys), (prefix, keys))
+
+    def test_unindexed_ordering_declaration_rejected(self):
+        class View:
+            orderings = {"owner": ("owner",)}
+
+        with self.assertRaises(ImproperlyConfigured):
+            IndexedOrderingFilter().get_orderings(View(), Restaurant)
+
+    def test_plan_sorts(self):
+        plan = Dish.objects.order_by("price", "id").explain()
+        self.assertEqual(plan_sorts(plan), [])
+        plan = "Sort  (cost=1.0..2.0 rows=10 width=4)\n  ->  Seq Scan on x"
+        self.assertEqual(len(plan_sorts(plan)), 1)
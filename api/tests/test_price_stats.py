@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.aggregates import interpolate
+from core.models import Cuisine, Dish, Menu, Restaurant
+
+
+class TestPriceStatsAPI(TestCase):
+    """Test price aggregates per cuisine and restaurant"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.indian = Cuisine.objects.create(name="Indian", origin="India")
+        self.dishes = [
+            Dish.objects.create(name=name, price=price, cuisine=self.indian)
+            for name, price in (("A", "10.10"), ("B", "20.20"), ("C", "30.30"))
+        ]
+        self.restaurant = Restaurant.objects.create(
+            name="Spice",
+            owner="A",
+            location="Delhi",
+            email="a@spice.com",
+            contact_number="123",
+            website="https://spice.com",
+        )
+        menu = Menu.objects.create(restaurant=self.restaurant)
+        menu.dishes.add(*self.dishes[:2])
+
+    def test_stats_by_cuisine(self):
+        url = reverse("dish-price-stats")
+        res = self.client.get(url, {"percentiles": "50,90"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "cuisine": self.indian.id,
+                    "count": 3,
+                    "min": Decimal("10.10"),
+                    "max": Decimal("30.30"),
+                    "avg": Decimal("20.20"),
+                    "p50": Decimal("20.20"),
+                    "p90": Decimal("28.28"),
+                }
+            ],
+        )
+
+    def test_stats_by_restaurant(self):
+        url = reverse("dish-price-stats")
+        res = self.client.get(url, {"by": "restaurant", "percentiles": "50"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["restaurant"], self.restaurant.id)
+        self.assertEqual(res.data[0]["count"], 2)
+        self.assertEqual(res.data[0]["p50"], Decimal("15.15"))
+
+    def test_largest_groups_first(self):
+        """Test only the ``limit`` cuisines with the most dishes are sent"""
+        thai = Cuisine.objects.create(name="Thai", origin="Thailand")
+        Cuisine.objects.create(name="Greek", origin="Greece")
+        Dish.objects.create(name="D", price="5.00", cuisine=thai)
+        url = reverse("dish-price-stats")
+
+        res = self.client.get(url, {"percentiles": "50"})
+        self.assertEqual(
+            [(row["cuisine"], row["count"]) for row in res.data],
+            [(self.indian.id, 3), (thai.id, 1)],
+        )
+
+        res = self.client.get(url, {"percentiles": "50", "limit": 1})
+        self.assertEqual(
+            [row["cuisine"] for row in res.data], [self.indian.id]
+        )
+
+    def test_invalid_parameters(self):
+        url = reverse("dish-price-stats")
+        res = self.client.get(url, {"by": "owner"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(url, {"percentiles": "100"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(url, {"limit": 101})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_interpolate(self):
+        values = [Decimal(1), Decimal(2), Decimal(3), Decimal(4)]
+        self.assertEqual(interpolate(values, Decimal("0.5")), Decimal("2.5"))
+        self.assertEqual(interpolate(values, Decimal("1")), Decimal(4))
+
+    def test_price_stored_exactly(self):
+        dish = Dish.objects.get(pk=self.dishes[0].pk)
+        self.assertEqual(dish.price, Decimal("10.10"))
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Dish, Ingredient
+from core.recommendations import dish_index
+from core.serializers import DishSerializer
+
+
+class TestRecommendationAPI(TestCase):
+    """Test dish recommendation endpoints"""
+
+    def setUp(self):
+        dish_index.clear()
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.rice = Ingredient.objects.create(name="Rice", price=1)
+        self.egg = Ingredient.objects.create(name="Egg", price=1)
+        self.fried_rice = Dish.objects.create(name="Fried Rice", price=8)
+        self.fried_rice.ingredients.add(self.rice, self.egg)
+        self.omelette = Dish.objects.create(name="Omelette", price=4)
+        self.omelette.ingredients.add(self.egg)
+
+    def test_similar_dishes(self):
+        url = reverse("dish-similar", args=[self.omelette.pk])
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [{"score": 0.5, "dish": DishSerializer(self.fried_rice).data}],
+        )
+
+    def test_similar_invalid_metric(self):
+        url = reverse("dish-similar", args=[self.omelette.pk])
+        res = self.client.get(url, {"metric": "euclidean"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_similar_missing_dish(self):
+        res = self.client.get(reverse("dish-similar", args=[1234]))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_makeable_dishes(self):
+        url = reverse("dish-makeable")
+        res = self.client.get(url, {"ingredient": self.egg.pk, "k": 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item["dish"]["id"], item["score"]) for item in res.data],
+            [(self.omelette.pk, 1.0)],
+        )
+
+    def test_makeable_invalid_limit(self):
+        url = reverse("dish-makeable")
+        res = self.client.get(url, {"ingredient": self.egg.pk, "k": 1000})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Cuisine, Dish, Ingredient, Menu
+
+
+class TestLinkedCollections(TestCase):
+    """Test sub-resources for many-to-many fields"""
+
+    def setUp(self):
+        self.staff_user = get_user_model().objects.create_superuser(
+            email="abc@test.com", password="password123",
+        )
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff_user)
+        self.dishes = [
+            Dish.objects.create(name="Dish %d" % i, price="1.00")
+            for i in range(5)
+        ]
+        self.ids = [dish.id for dish in self.dishes]
+        self.menu = Menu.objects.create()
+        self.menu.dishes.add(*self.dishes[:4])
+        self.url = reverse("menu-dishes", args=[self.menu.id])
+
+    def test_pages_through_links(self):
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.get(self.url, {"limit": 3})
+        self.assertEqual(
+            res.data, {"results": self.ids[:3], "next": self.ids[2]}
+        )
+
+        res = self.client.get(self.url, {"limit": 3, "after": self.ids[2]})
+        self.assertEqual(res.data, {"results": self.ids[3:4], "next": None})
+
+    def test_add_and_remove(self):
+        """Test only the given links change and the version is bumped"""
+        res = self.client.post(
+            self.url, {"ids": [self.ids[4], self.ids[0]]}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"version": 2})
+
+        res = self.client.delete(
+            self.url, {"ids": self.ids[1:3]}, format="json"
+        )
+        self.assertEqual(res["ETag"], '"3"')
+        self.assertEqual(
+            sorted(self.menu.dishes.values_list("id", flat=True)),
+            [self.ids[0], self.ids[3], self.ids[4]],
+        )
+
+    def test_missing_ids_rejected(self):
+        res = self.client.post(
+            self.url, {"ids": [self.ids[4], 999]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("999", res.data["ids"][0])
+        self.assertEqual(self.menu.dishes.count(), 4)
+
+    def test_stale_version_rejected(self):
+        res = self.client.post(
+            self.url,
+            {"ids": [self.ids[4]]},
+            format="json",
+            HTTP_IF_MATCH='"7"',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_edit_requires_staff(self):
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.post(self.url, {"ids": [self.ids[4]]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_other_relations(self):
+        rice = Ingredient.objects.create(name="Rice", price="1.00")
+        cuisine = Cuisine.objects.create(name="Thai", origin="Thailand")
+
+        self.client.post(
+            reverse("dish-ingredients", args=[self.ids[0]]),
+            {"ids": [rice.id]},
+            format="json",
+        )
+        res = self.client.post(
+            reverse("cuisine-popular-ingredients", args=[cuisine.id]),
+            {"ids": [rice.id]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(self.dishes[0].ingredients.all()), [rice])
+        self.assertEqual(list(cuisine.popular_ingredients.all()), [rice])
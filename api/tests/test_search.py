@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.fuzzy import trigram_index
+from core.models import Cuisine, Dish, Restaurant
+
+
+class TestSearch(TestCase):
+    """Test substring and fuzzy search on the catalog"""
+
+    def setUp(self):
+        trigram_index.clear()
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com",
+            password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.indian = Cuisine.objects.create(name="Indian", origin="India")
+        self.tikka = Dish.objects.create(
+            name="Paneer Tikka", price=12, cuisine=self.indian
+        )
+        self.masala = Dish.objects.create(
+            name="Chicken Tikka Masala", price=15, cuisine=self.indian
+        )
+        self.pizza = Dish.objects.create(name="Pizza", price=10)
+
+    def get_names(self, params, url=None):
+        res = self.client.get(url or reverse("dish-list"), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [obj["name"] for obj in res.data]
+
+    def test_substring_search(self):
+        self.assertEqual(
+            self.get_names({"search": "tikka", "ordering": "-price"}),
+            ["Chicken Tikka Masala", "Paneer Tikka"],
+        )
+        Restaurant.objects.create(
+            name="Spice",
+            owner="A",
+            location="Delhi",
+            email="a@spice.com",
+            contact_number="123",
+            website="https://spice.com",
+        )
+        url = reverse("restaurant-list")
+        self.assertEqual(self.get_names({"search": "delhi"}, url), ["Spice"])
+
+    def test_fuzzy_search_ranks_by_similarity(self):
+        """Test misspelled names are found and other filters still apply"""
+        names = self.get_names(
+            {"search": "panner tika", "search_mode": "fuzzy"}
+        )
+        self.assertEqual(names, ["Paneer Tikka"])
+
+        names = self.get_names(
+            {"search": "chiken tika", "search_mode": "fuzzy"}
+        )
+        self.assertEqual(names, ["Chicken Tikka Masala"])
+
+        params = {"search": "panner tika", "search_mode": "fuzzy"}
+        self.assertEqual(self.get_names(dict(params, min_price=13)), [])
+
+    def test_fuzzy_search_follows_writes(self):
+        self.get_names({"search": "pizza", "search_mode": "fuzzy"})
+
+        self.pizza.name = "Pissaladiere"
+        self.pizza.save()
+        Cuisine.objects.create(name="Italian", origin="Italy")
+
+        names = self.get_names({"search": "pizza", "search_mode": "fuzzy"})
+        self.assertEqual(names, [])
+        names = self.get_names(
+            {"search": "italain", "search_mode": "fuzzy"},
+            reverse("cuisine-list"),
+        )
+        self.assertEqual(names, ["Italian"])
+
+    def test_invalid_params(self):
+        url = reverse("dish-list")
+        res = self.client.get(url, {"search": "tika", "search_mode": "exact"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(
+            url, {"search": "tika", "search_mode": "fuzzy", "ordering": "name"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fuzzy_search_on_detail_routes(self):
+        """Test routes fetching one object still filter the ranked dishes"""
+        params = "?search=panner+tika&search_mode=fuzzy"
+        url = reverse("dish-detail", args=[self.tikka.pk]) + params
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["name"], "Paneer Tikka")
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.patch(url, {"price": 13}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        url = reverse("dish-similar", args=[self.tikka.pk]) + params
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        url = reverse("dish-detail", args=[self.pizza.pk]) + params
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -12,5 +12,29 @@ router.register("cuisines", views.CuisinesViewSet, basename="cuisine")
 
 
 urlpatterns = [
+    path(
+        "autocomplete/",
+        views.AutocompleteView.as_view(),
+        name="autocomplete",
+    ),
+    path("analytics/", views.AnalyticsView.as_view(), name="analytics"),
+    path("changes/", views.ChangesView.as_view(), name="changes"),
+    path(
+        "events/ticket/",
+        views.EventTicketView.as_view(),
+        name="event-ticket",
+    ),
+    path(
+        "deletions/<int:pk>/",
+        views.DeletionView.as_view(),
+        name="deletion",
+    ),
+    path(
+        "batch/",
+        views.BatchView.as_view(
+            viewsets=tuple(viewset for _, viewset, _ in router.registry)
+        ),
+        name="batch",
+    ),
     path("", include(router.urls)),
 ]
@@ -1,11 +1,58 @@
-from rest_framework import viewsets, filters
-from rest_framework.authentication import TokenAuthentication
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import viewsets, filters, exceptions, generics, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from core import serializers, models, permissions
+from api import batch
+from api.coalescing import CoalescedListMixin
+from api.concurrency import VersionedModelMixin
+from api.deletions import ChunkedDestroyMixin
+from api.filters import (
+    CatalogFilterBackend,
+    DietFilter,
+    ExistsFilter,
+    FuzzySearchFilter,
+    MembershipFilter,
+    RangeFilter,
+    parse_diet,
+    parse_ids,
+    parse_number,
+)
+from api.ordering import IndexedOrderingFilter
+from api.relations import LinkedCollectionMixin
+from core import (
+    changes,
+    diet,
+    geo,
+    models,
+    permissions,
+    rollups,
+    serializers,
+)
+from core.aggregates import GROUPS, price_stats
+from core.autocomplete import MAX_SUGGESTIONS, name_index
+from core.authentication import (
+    AccessTokenAuthentication,
+    ExpiringTokenAuthentication,
+    issue_stream_ticket,
+)
+from core.recommendations import METRICS, dish_index
+from core.renderers import CATALOG_RENDERER_CLASSES
+from core.throttling import BatchThrottle, CatalogThrottle
 
+MAX_RECOMMENDATIONS = 100
+MAX_CHANGES = 1000
+MAX_BATCH = 50
+MAX_RADIUS_KM = 100
+MAX_ANALYTICS_ROWS = 100
 
-class IngredientsViewSet(viewsets.ModelViewSet):
+
+class IngredientsViewSet(
+    CoalescedListMixin, VersionedModelMixin, viewsets.ModelViewSet
+):
     """Ingredients ViewSet"""
 
     serializer_class = serializers.IngredientSerializer
@@ -14,16 +61,33 @@ class IngredientsViewSet(viewsets.ModelViewSet):
         IsAuthenticated,
         permissions.UpdateInformation,
     )
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+    renderer_classes = CATALOG_RENDERER_CLASSES
     filter_backends = (
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        CatalogFilterBackend,
+        IndexedOrderingFilter,
+        FuzzySearchFilter,
     )
-    search_fields = "__all__"
-    ordering_fields = "__all__"
+    search_fields = ("name",)
+    orderings = {
+        "id": ("id",),
+        "name": ("name",),
+        "price": ("price",),
+    }
+    catalog_filters = (RangeFilter("price"),)
 
 
-class CuisinesViewSet(viewsets.ModelViewSet):
+class CuisinesViewSet(
+    CoalescedListMixin,
+    ChunkedDestroyMixin,
+    LinkedCollectionMixin,
+    VersionedModelMixin,
+    viewsets.ModelViewSet,
+):
     """Cuisines ViewSet"""
 
     serializer_class = serializers.CuisineSerializer
@@ -32,16 +96,47 @@ class CuisinesViewSet(viewsets.ModelViewSet):
         IsAuthenticated,
         permissions.UpdateInformation,
     )
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+    renderer_classes = CATALOG_RENDERER_CLASSES
     filter_backends = (
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        CatalogFilterBackend,
+        IndexedOrderingFilter,
+        FuzzySearchFilter,
+    )
+    search_fields = ("name", "origin")
+    orderings = {
+        "id": ("id",),
+        "name": ("name",),
+    }
+    catalog_filters = (
+        ExistsFilter(
+            "ingredient",
+            models.Cuisine.popular_ingredients.through,
+            "cuisine",
+            "ingredient",
+        ),
+    )
+
+    @action(
+        detail=True,
+        methods=["get", "post", "delete"],
+        url_path="popular-ingredients",
     )
-    search_fields = "__all__"
-    ordering_fields = "__all__"
+    def popular_ingredients(self, request, pk=None):
+        """Page through, add or remove the popular ingredients of a cuisine"""
+        return self.manage_links(request, "popular_ingredients")
 
 
-class DishesViewSet(viewsets.ModelViewSet):
+class DishesViewSet(
+    CoalescedListMixin,
+    LinkedCollectionMixin,
+    VersionedModelMixin,
+    viewsets.ModelViewSet,
+):
     """Dishes ViewSet"""
 
     serializer_class = serializers.DishSerializer
@@ -50,16 +145,132 @@ class DishesViewSet(viewsets.ModelViewSet):
         IsAuthenticated,
         permissions.UpdateInformation,
     )
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+    renderer_classes = CATALOG_RENDERER_CLASSES
     filter_backends = (
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        CatalogFilterBackend,
+        IndexedOrderingFilter,
+        FuzzySearchFilter,
     )
-    search_fields = "__all__"
-    ordering_fields = "__all__"
+    search_fields = ("name",)
+    orderings = {
+        "id": ("id",),
+        "name": ("name",),
+        "price": ("price",),
+        "serves": ("serves",),
+        "cuisine": ("cuisine", "price"),
+    }
+    catalog_filters = (
+        RangeFilter("price"),
+        RangeFilter("serves"),
+        MembershipFilter("cuisine"),
+        DietFilter("diet"),
+        ExistsFilter(
+            "ingredient",
+            models.Dish.ingredients.through,
+            "dish",
+            "ingredient",
+        ),
+        ExistsFilter(
+            "restaurant",
+            models.Menu.dishes.through,
+            "dish",
+            "menu__restaurant",
+        ),
+    )
+
+    @action(detail=True, methods=["get", "post", "delete"])
+    def ingredients(self, request, pk=None):
+        """Page through, add or remove the ingredients of a dish"""
+        return self.manage_links(request, "ingredients")
+
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        """List dishes sharing the most ingredients with this dish"""
+        dish = self.get_object()
+        metric = request.query_params.get("metric", METRICS[0])
+        if metric not in METRICS:
+            msg = _("Expected one of: %s.") % ", ".join(METRICS)
+            raise exceptions.ValidationError({"metric": [msg]})
+        ranked = dish_index.similar(dish.pk, self.get_limit(), metric)
+        return self.get_recommendations_response(ranked)
+
+    @action(detail=False)
+    def makeable(self, request):
+        """List dishes best covered by the given ingredients"""
+        ingredient_ids = parse_ids(
+            "ingredient", request.query_params.get("ingredient", "")
+        )
+        ranked = dish_index.makeable(ingredient_ids, self.get_limit())
+        return self.get_recommendations_response(ranked)
+
+    @action(detail=False, url_path="price-stats")
+    def price_stats(self, request):
+        """Aggregate dish prices of the ``?limit=`` (default 20) groups
+        with the most dishes: cuisines, or restaurants with
+        ``?by=restaurant``.
+        """
+        group = request.query_params.get("by", "cuisine")
+        if group not in GROUPS:
+            msg = _("Expected one of: %s.") % ", ".join(GROUPS)
+            raise exceptions.ValidationError({"by": [msg]})
+        raw = request.query_params.get("percentiles", "50,90")
+        try:
+            percentiles = [int(p) for p in raw.split(",") if p.strip()]
+        except ValueError:
+            percentiles = None
+        if (
+            percentiles is None
+            or len(percentiles) > 5
+            or not all(0 < p < 100 for p in percentiles)
+        ):
+            msg = _("Expected up to 5 whole percentiles between 1 and 99.")
+            raise exceptions.ValidationError({"percentiles": [msg]})
+        limit = parse_number(
+            "limit",
+            request.query_params.get("limit", 20),
+            1,
+            MAX_ANALYTICS_ROWS,
+        )
+        return Response(price_stats(group, percentiles, limit))
 
+    def get_limit(self):
+        """Return the number of recommendations asked for with ``k``"""
+        try:
+            limit = int(self.request.query_params.get("k", 10))
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= MAX_RECOMMENDATIONS:
+            msg = _("Expected a number from 1 to %d.") % MAX_RECOMMENDATIONS
+            raise exceptions.ValidationError({"k": [msg]})
+        return limit
 
-class RestaurantViewSet(viewsets.ModelViewSet):
+    def get_recommendations_response(self, ranked):
+        """Serialize ranked (dish id, score) pairs in rank order"""
+        queryset = self.get_queryset().prefetch_related("ingredients")
+        dishes = queryset.in_bulk([dish_id for dish_id, score in ranked])
+        return Response(
+            [
+                {
+                    "score": round(score, 4),
+                    "dish": self.get_serializer(dishes[dish_id]).data,
+                }
+                for dish_id, score in ranked
+                if dish_id in dishes
+            ]
+        )
+
+
+class RestaurantViewSet(
+    CoalescedListMixin,
+    ChunkedDestroyMixin,
+    VersionedModelMixin,
+    viewsets.ModelViewSet,
+):
     """Restaurant ViewSet"""
 
     serializer_class = serializers.RestaurantSerializer
@@ -68,16 +279,69 @@ class RestaurantViewSet(viewsets.ModelViewSet):
         IsAuthenticated,
         permissions.UpdateInformation,
     )
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+    renderer_classes = CATALOG_RENDERER_CLASSES
     filter_backends = (
+        CatalogFilterBackend,
         filters.SearchFilter,
-        filters.OrderingFilter,
+        IndexedOrderingFilter,
     )
-    search_fields = "__all__"
-    ordering_fields = "__all__"
+    search_fields = ("name", "location")
+    orderings = {
+        "id": ("id",),
+        "name": ("name",),
+        "established": ("established",),
+    }
+
+    @action(detail=False)
+    def nearby(self, request):
+        """List the restaurants nearest a point, optionally within a radius"""
+        params = request.query_params
+        point = {}
+        for param, bound in (("lat", 90), ("lng", 180)):
+            try:
+                point[param] = float(params[param])
+            except (KeyError, ValueError):
+                point[param] = None
+            if point[param] is None or not -bound <= point[param] <= bound:
+                msg = _("Expected a number from %d to %d.") % (-bound, bound)
+                raise exceptions.ValidationError({param: [msg]})
+        radius = None
+        if "radius" in params:
+            try:
+                radius = float(params["radius"])
+            except ValueError:
+                radius = 0
+            if not 0 < radius <= MAX_RADIUS_KM:
+                msg = _("Expected kilometres up to %d.") % MAX_RADIUS_KM
+                raise exceptions.ValidationError({"radius": [msg]})
+        limit = parse_number(
+            "k", params.get("k", 10), 1, MAX_RECOMMENDATIONS
+        )
+        found = geo.nearby(
+            self.get_queryset(), point["lat"], point["lng"], limit, radius
+        )
+        return Response(
+            [
+                {
+                    "distance": round(distance, 3),
+                    "restaurant": self.get_serializer(restaurant).data,
+                }
+                for distance, restaurant in found
+            ]
+        )
 
 
-class MenuViewSet(viewsets.ModelViewSet):
+class MenuViewSet(
+    CoalescedListMixin,
+    LinkedCollectionMixin,
+    VersionedModelMixin,
+    viewsets.ModelViewSet,
+):
     """Menu ViewSet"""
 
     serializer_class = serializers.MenuSerializer
@@ -86,10 +350,269 @@ class MenuViewSet(viewsets.ModelViewSet):
         IsAuthenticated,
         permissions.UpdateInformation,
     )
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+    renderer_classes = CATALOG_RENDERER_CLASSES
     filter_backends = (
+        CatalogFilterBackend,
         filters.SearchFilter,
-        filters.OrderingFilter,
+        IndexedOrderingFilter,
+    )
+    search_fields = ("restaurant__name",)
+    orderings = {
+        "id": ("id",),
+        "restaurant": ("restaurant",),
+    }
+    catalog_filters = (
+        MembershipFilter("restaurant"),
+        ExistsFilter("dish", models.Menu.dishes.through, "menu", "dish"),
+        ExistsFilter(
+            "cuisine", models.Menu.cuisines.through, "menu", "cuisine",
+        ),
+        DietFilter(
+            "diet", "dish__diet", models.Menu.dishes.through, "menu"
+        ),
     )
-    search_fields = "__all__"
-    ordering_fields = "__all__"
+
+    @action(detail=True, methods=["get", "post", "delete"])
+    def dishes(self, request, pk=None):
+        """Page through, add or remove the dishes on a menu"""
+        return self.manage_links(request, "dishes")
+
+    def filter_links(self, links, field):
+        """List only the dishes with the ``diet`` flags asked for"""
+        params = self.request.query_params
+        if field.name == "dishes" and "diet" in params:
+            mask = parse_diet("diet", params["diet"])
+            links = links.filter(dish__diet__in=diet.supersets(mask))
+        return links
+
+    @action(detail=True, methods=["get", "post", "delete"])
+    def cuisines(self, request, pk=None):
+        """Page through, add or remove the cuisines of a menu"""
+        return self.manage_links(request, "cuisines")
+
+
+class AutocompleteView(APIView):
+    """Typeahead suggestions for catalog names from an in-memory index
+
+    ``?q=`` is matched against the start of any word of the names, and
+    ``?types=dish,ingredient`` limits the models searched. Up to ``?k=``
+    suggestions per model are ranked by popularity, then by name.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+    renderer_classes = CATALOG_RENDERER_CLASSES
+
+    def get(self, request):
+        params = request.query_params
+        allowed = list(name_index.MODELS)
+        model_names = allowed
+        if "types" in params:
+            raw = params["types"].split(",")
+            model_names = [value.strip() for value in raw if value.strip()]
+            if not model_names or set(model_names) - set(allowed):
+                msg = _("Expected a comma separated list of %s.")
+                raise exceptions.ValidationError(
+                    {"types": [msg % ", ".join(allowed)]}
+                )
+        limit = parse_number("k", params.get("k", 10), 1, MAX_SUGGESTIONS)
+        found = name_index.suggest(params.get("q", ""), model_names, limit)
+        return Response(
+            {
+                model_name: [
+                    {"id": pk, "name": name} for pk, name in suggestions
+                ]
+                for model_name, suggestions in found.items()
+            }
+        )
+
+
+class AnalyticsView(APIView):
+    """Dish counts, average prices and ingredient usage from rollups
+
+    Each section lists the ``?limit=`` (default 20) entries with the most
+    dishes.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+    renderer_classes = CATALOG_RENDERER_CLASSES
+
+    def get(self, request):
+        limit = parse_number(
+            "limit",
+            request.query_params.get("limit", 20),
+            1,
+            MAX_ANALYTICS_ROWS,
+        )
+        return Response(rollups.summary(limit))
+
+
+class ChangesView(APIView):
+    """Catalog objects changed since a version of the change log
+
+    Without ``since`` only the current version is returned, for clients to
+    store before downloading the catalog in full. Objects changed several
+    times are sent once, as their current state or in the list of deleted
+    ids. Versions follow commit order, so no change committed late is
+    skipped. A ``410 Gone`` asks clients whose version predates compacted
+    deletes to download the catalog again.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+    renderer_classes = CATALOG_RENDERER_CLASSES
+    serializer_classes = {
+        "ingredient": serializers.IngredientSerializer,
+        "cuisine": serializers.CuisineSerializer,
+        "dish": serializers.DishSerializer,
+        "restaurant": serializers.RestaurantSerializer,
+        "menu": serializers.MenuSerializer,
+    }
+
+    def get(self, request):
+        if "since" not in request.query_params:
+            return Response({"version": changes.current_version()})
+        params = request.query_params
+        since = parse_number("since", params.get("since"), 0)
+        limit = parse_number(
+            "limit", params.get("limit", MAX_CHANGES), 1, MAX_CHANGES
+        )
+        if since < changes.horizon():
+            return Response(
+                {
+                    "detail": _("Changes since this version were compacted."),
+                    "version": changes.current_version(),
+                },
+                status=status.HTTP_410_GONE,
+            )
+
+        until = changes.current_version()
+        entries = changes.changes_since(since, limit, until)
+        latest = {}
+        for version, model, object_id, operation in entries:
+            latest[model, object_id] = operation
+        grouped = {}
+        for (model, object_id), operation in latest.items():
+            upserted, deleted = grouped.setdefault(model, ([], []))
+            if operation == models.CatalogChange.DELETE:
+                deleted.append(object_id)
+            else:
+                upserted.append(object_id)
+        result = {
+            model: {
+                "upserted": self.serialize(
+                    self.serializer_classes[model], upserted
+                ),
+                "deleted": deleted,
+            }
+            for model, (upserted, deleted) in grouped.items()
+        }
+        return Response(
+            {
+                "version": (
+                    entries[-1][0]
+                    if len(entries) == limit
+                    else max(since, until)
+                ),
+                "more": len(entries) == limit,
+                "changes": result,
+            }
+        )
+
+    def serialize(self, serializer_class, ids):
+        model = serializer_class.Meta.model
+        queryset = model.objects.filter(pk__in=ids).prefetch_related(
+            *(field.name for field in model._meta.many_to_many)
+        )
+        return serializer_class(queryset.order_by("pk"), many=True).data
+
+
+class EventTicketView(APIView):
+    """Short-lived ticket for opening a change stream from a browser"""
+
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+
+    def post(self, request):
+        return Response(
+            {
+                "ticket": issue_stream_ticket(request.user, request.auth),
+                "expires_in": settings.EVENTS_TICKET_TTL,
+            }
+        )
+
+
+class DeletionView(generics.RetrieveAPIView):
+    """Progress of deleting a restaurant or cuisine in the background"""
+
+    serializer_class = serializers.DeletionSerializer
+    queryset = models.Deletion.objects.all()
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (CatalogThrottle,)
+
+
+class BatchView(APIView):
+    """Several catalog GET requests answered in one round trip
+
+    Takes ``{"requests": ["/api/dishes/1/", ...], "parallel": false}`` and
+    returns ``{"responses": [{"status": ..., "body": ...}, ...]}`` in the
+    same order. The batch is authenticated once and its user is used for
+    every sub-request. Paths outside the catalog viewsets get a 404 entry
+    and a sub-request that fails gets a 500 entry of its own.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = (
+        AccessTokenAuthentication,
+        ExpiringTokenAuthentication,
+    )
+    throttle_classes = (BatchThrottle,)
+    renderer_classes = CATALOG_RENDERER_CLASSES
+    # Sub-requests may only reach these viewsets, which the URLconf sets
+    # to the ones registered on the API router.
+    viewsets = ()
+
+    def post(self, request):
+        data = request.data if hasattr(request.data, "get") else {}
+        paths = data.get("requests")
+        if (
+            not isinstance(paths, list)
+            or not 0 < len(paths) <= MAX_BATCH
+            or not all(isinstance(path, str) for path in paths)
+        ):
+            msg = _("Expected a list of 1 to %d paths.") % MAX_BATCH
+            raise exceptions.ValidationError({"requests": [msg]})
+        parallel = bool(data.get("parallel"))
+        return Response(
+            {
+                "responses": batch.execute(
+                    request, paths, self.viewsets, parallel
+                )
+            }
+        )
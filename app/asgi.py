@@ -9,8 +9,18 @@ https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from core.streams import EventStreamApp  # noqa: E402
+
+application = EventStreamApp(django_application)
+
+if settings.WARMUP_ON_BOOT:
+    from core.warmup import state
+
+    state.run()
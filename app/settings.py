@@ -11,15 +11,20 @@ https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
 import os
+from datetime import timedelta
 from pathlib import Path
 
-from dotenv import load_dotenv, find_dotenv
-
-load_dotenv(find_dotenv())
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Load a .env file from a known location rather than searching parent
+# directories for one, and skip importing dotenv when there is none.
+DOTENV_PATH = Path(os.getenv("DOTENV_PATH", BASE_DIR / ".env"))
+if DOTENV_PATH.is_file():
+    from dotenv import load_dotenv
+
+    load_dotenv(DOTENV_PATH)
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.1/howto/deployment/checklist/
@@ -44,11 +49,12 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "rest_framework.authtoken",
-    "core",
+    "core.apps.CoreConfig",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -77,6 +83,40 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "app.wsgi.application"
 
+# Lean serving profile for API-only workers: drops the admin, sessions,
+# messages and static files apps with their middleware, and renders JSON
+# only so the browsable API templates are never loaded.
+API_ONLY = bool(os.getenv("API_ONLY"))
+
+if API_ONLY:
+    INSTALLED_APPS = [
+        app
+        for app in INSTALLED_APPS
+        if app
+        not in (
+            "django.contrib.admin",
+            "django.contrib.sessions",
+            "django.contrib.messages",
+            "django.contrib.staticfiles",
+        )
+    ]
+    MIDDLEWARE = [
+        middleware
+        for middleware in MIDDLEWARE
+        if middleware
+        not in (
+            "django.contrib.sessions.middleware.SessionMiddleware",
+            "django.contrib.auth.middleware.AuthenticationMiddleware",
+            "django.contrib.messages.middleware.MessageMiddleware",
+        )
+    ]
+    TEMPLATES[0]["OPTIONS"]["context_processors"].remove(
+        "django.contrib.messages.context_processors.messages"
+    )
+    REST_FRAMEWORK = {
+        "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    }
+
 
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
@@ -134,6 +174,164 @@ STATIC_URL = "/static/"
 
 AUTH_USER_MODEL = "core.User"
 
+# Authentication tokens
+
+# Tokens expire after this much inactivity; use slides the expiry forward.
+TOKEN_TTL = timedelta(seconds=int(os.getenv("TOKEN_TTL", 60 * 60 * 24 * 7)))
+
+# Issue short-lived signed access tokens verified without a database hit.
+STATELESS_AUTH = bool(os.getenv("STATELESS_AUTH"))
+
+ACCESS_TOKEN_TTL = timedelta(
+    seconds=int(os.getenv("ACCESS_TOKEN_TTL", 60 * 5))
+)
+
+# How often each worker re-reads the shared token revocation list.
+TOKEN_REVOCATION_SYNC_INTERVAL = int(
+    os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", 5)
+)
+
+# Cache alias holding the revocation list. It must be shared by every
+# worker, e.g. Redis or Memcached; ``check --deploy`` reports one that is
+# not.
+TOKEN_REVOCATION_CACHE = os.getenv("TOKEN_REVOCATION_CACHE", "default")
+
+# Rate limiting
+
+# Requests allowed per client and route, as "<count>/<s|min|hour|day>".
+RATE_LIMITS = {
+    "catalog": os.getenv("CATALOG_RATE_LIMIT", "1200/min"),
+    "auth": os.getenv("AUTH_RATE_LIMIT", "60/min"),
+}
+
+# How many requests a list, and a search on top of it, count as.
+RATE_LIMIT_COSTS = {"list": 2, "search": 5}
+
+# Cache alias to share counters between workers; per-process if unset.
+RATE_LIMIT_CACHE = os.getenv("RATE_LIMIT_CACHE")
+
+# Response compression
+
+# Encodings in order of preference; br and zstd are used when the brotli
+# and zstandard packages are installed.
+COMPRESSION_ENCODINGS = ["br", "zstd", "gzip"]
+
+COMPRESSION_LEVELS = {"br": 5, "zstd": 3, "gzip": 6}
+
+# Responses smaller than this many bytes are not worth compressing.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+
+# Number of compressed response bodies kept for reuse per worker.
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", 256))
+
+# Recommendations
+
+# Seconds before a worker rebuilds its dish/ingredient similarity index.
+RECOMMENDATION_INDEX_TTL = int(os.getenv("RECOMMENDATION_INDEX_TTL", 60 * 15))
+
+# Autocomplete
+
+# Seconds before a worker rebuilds its in-memory index of catalog names,
+# picking up other workers' writes and current popularity.
+AUTOCOMPLETE_INDEX_TTL = int(os.getenv("AUTOCOMPLETE_INDEX_TTL", 60 * 15))
+
+# Optimistic concurrency
+
+# Reject catalog updates and deletes without an If-Match header with 428.
+REQUIRE_IF_MATCH = bool(os.getenv("REQUIRE_IF_MATCH"))
+
+# Admin
+
+# Unfiltered admin lists of PostgreSQL tables estimated to hold more rows
+# than this show the estimate instead of counting every row.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(
+    os.getenv("ADMIN_ESTIMATED_COUNT_THRESHOLD", 100000)
+)
+
+# Batch requests
+
+# Threads running the sub-requests of a batch asked to run in parallel.
+# Each may hold its own database connection while it runs.
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 4))
+
+# Change feed
+
+# Days deletes stay in the change log when it is compacted. Clients that
+# have not synced for longer must download the catalog again.
+CHANGE_LOG_RETENTION_DAYS = int(os.getenv("CHANGE_LOG_RETENTION_DAYS", 30))
+
+# Admin bulk actions
+
+# Dishes changed per transaction, bounding how long locks are held.
+BULK_UPDATE_CHUNK_SIZE = int(os.getenv("BULK_UPDATE_CHUNK_SIZE", 1000))
+
+# Deletions
+
+# Restaurants and cuisines with more menus or dishes than this are deleted
+# in the background; the API answers 202 with a progress resource.
+DELETION_ASYNC_THRESHOLD = int(os.getenv("DELETION_ASYNC_THRESHOLD", 1000))
+
+# Menus or dishes deleted per transaction, bounding how long locks are held.
+DELETION_CHUNK_SIZE = int(os.getenv("DELETION_CHUNK_SIZE", 500))
+
+# Seconds a background deletion may go without finishing a chunk before it
+# is taken to be cut short and resumed; longer than a chunk takes.
+DELETION_LEASE_SECONDS = int(os.getenv("DELETION_LEASE_SECONDS", 300))
+
+# Change streams
+
+# Path served by the ASGI application with server-sent events or WebSocket
+# messages of catalog changes.
+EVENTS_PATH = os.getenv("EVENTS_PATH", "/api/events/")
+
+# Seconds changes are collected before being sent, so bursts arrive as one
+# message.
+EVENTS_COALESCE_WINDOW = float(os.getenv("EVENTS_COALESCE_WINDOW", 0.5))
+
+# Seconds between keepalive messages on idle connections.
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", 20))
+
+# Streaming connections accepted per worker before answering 503.
+EVENTS_MAX_CONNECTIONS = int(os.getenv("EVENTS_MAX_CONNECTIONS", 10000))
+
+# Seconds between reads of the change log by a worker with subscribers.
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", 1))
+
+# Seconds a ticket from /api/events/ticket/ may be used to open a stream.
+EVENTS_TICKET_TTL = int(os.getenv("EVENTS_TICKET_TTL", 30))
+
+# Catalog read coalescing
+
+# Cache alias holding catalog list results. Use one shared by every worker
+# to coalesce and invalidate reads across processes.
+CATALOG_CACHE = os.getenv("CATALOG_CACHE", "default")
+
+# Seconds catalog list results are cached; with 0 only concurrent
+# identical requests share a query.
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", 0))
+
+# Seconds past expiry an entry is still served while one request
+# refreshes it.
+CATALOG_CACHE_STALE = float(os.getenv("CATALOG_CACHE_STALE", 30))
+
+# Let a single process compute a missing entry, through a lock in the
+# catalog cache.
+CATALOG_CACHE_LOCK = bool(os.getenv("CATALOG_CACHE_LOCK"))
+
+# Worker warmup
+
+# Run the warmup steps when the WSGI/ASGI application is loaded instead of
+# on the first readiness probe.
+WARMUP_ON_BOOT = bool(os.getenv("WARMUP_ON_BOOT"))
+
+WARMUP_STEPS = [
+    "core.warmup.load_urls",
+    "core.warmup.build_serializers",
+    "core.warmup.open_connections",
+    "core.warmup.build_recommendation_index",
+    "core.warmup.build_autocomplete_index",
+]
+
 # # Caching
 #
 # CACHES = {
@@ -1,8 +1,102 @@
-from django.contrib import admin
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 
-from core import models
+from core import bulk, deletion, diet, models
+
+# Bounds of the percentage the price action takes: prices can neither
+# drop to zero nor grow past what a typo would make them.
+MIN_PRICE_PERCENT = -99
+MAX_PRICE_PERCENT = 1000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator using the planner's row estimate for whole large tables
+
+    Counting every row of a large PostgreSQL table is a sequential scan,
+    so unfiltered change lists show ``pg_class.reltuples`` once it is above
+    ``ADMIN_ESTIMATED_COUNT_THRESHOLD``. Filtered lists count exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[getattr(queryset, "db", "default")]
+        if (
+            connection.vendor == "postgresql"
+            and hasattr(queryset, "query")
+            and not queryset.query.where
+        ):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE relname = %s",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+class CatalogAdmin(admin.ModelAdmin):
+    """Base admin for catalog tables too large to count or list whole"""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_fields = ("^name",)
+    list_per_page = 50
+
+
+class ChunkedDeleteAdmin(CatalogAdmin):
+    """Deletes objects through ``core.deletion`` like the API does
+
+    The version is bumped first so writers holding an older one fail
+    their compare-and-swap, then large objects are deleted in the
+    background. The confirmation page counts the dependents instead of
+    collecting them, and the bulk delete action is off since each object
+    may need a background deletion of its own.
+    """
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        purge, dependent, field = deletion.PURGES[self.opts.model_name]
+        plural = dependent._meta.verbose_name_plural
+        deleted = []
+        counts = {self.opts.verbose_name_plural: 0, plural: 0}
+        for obj in objs:
+            count = dependent.objects.filter(**{field: obj.pk}).count()
+            deleted.append("%s (%d %s)" % (obj, count, plural))
+            counts[self.opts.verbose_name_plural] += 1
+            counts[plural] += count
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        return deleted, counts, perms_needed, []
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            type(obj).objects.filter(pk=obj.pk).update(
+                version=F("version") + 1
+            )
+            job = deletion.schedule(obj)
+        if job is not None:
+            self.message_user(
+                request,
+                _("%s is being deleted in the background.") % obj,
+                messages.WARNING,
+            )
 
 
 class UserAdmin(BaseUserAdmin):
@@ -25,8 +119,92 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class IngredientAdmin(CatalogAdmin):
+    list_display = ("name", "price")
+    list_filter = diet.FLAGS
+
+
+class CuisineAdmin(ChunkedDeleteAdmin):
+    list_display = ("name", "origin")
+    autocomplete_fields = ("popular_ingredients",)
+
+
+class DishActionForm(ActionForm):
+    percent = forms.DecimalField(
+        label=_("Percent"),
+        required=False,
+        max_digits=6,
+        decimal_places=2,
+    )
+    cuisine = forms.IntegerField(label=_("Cuisine id"), required=False)
+
+
+class DishAdmin(CatalogAdmin):
+    list_display = ("name", "price", "serves", "cuisine")
+    list_select_related = ("cuisine",)
+    autocomplete_fields = ("ingredients", "cuisine")
+    action_form = DishActionForm
+    actions = ("adjust_prices", "reassign_cuisine")
+
+    def adjust_prices(self, request, queryset):
+        """Change prices by the given percentage in one UPDATE"""
+        field = DishActionForm.base_fields["percent"]
+        try:
+            percent = field.clean(request.POST.get("percent"))
+        except ValidationError:
+            percent = None
+        if percent is None or not (
+            MIN_PRICE_PERCENT <= percent <= MAX_PRICE_PERCENT
+        ):
+            self.message_user(
+                request,
+                _("Enter a percentage from %d to %d.")
+                % (MIN_PRICE_PERCENT, MAX_PRICE_PERCENT),
+                messages.ERROR,
+            )
+            return
+        try:
+            count = bulk.adjust_prices(queryset, percent)
+        except ValueError as error:
+            self.message_user(request, str(error), messages.ERROR)
+            return
+        self.message_user(request, _("Updated %d dishes.") % count)
+
+    adjust_prices.short_description = _("Adjust price by percent")
+
+    def reassign_cuisine(self, request, queryset):
+        """Move dishes to the given cuisine in one UPDATE"""
+        field = DishActionForm.base_fields["cuisine"]
+        try:
+            cuisine_id = field.clean(request.POST.get("cuisine"))
+        except ValidationError:
+            cuisine_id = None
+        cuisine = models.Cuisine.objects.filter(pk=cuisine_id).first()
+        if cuisine is None:
+            self.message_user(
+                request, _("Enter an existing cuisine id."), messages.ERROR
+            )
+            return
+        count = bulk.reassign_cuisine(queryset, cuisine)
+        self.message_user(request, _("Updated %d dishes.") % count)
+
+    reassign_cuisine.short_description = _("Reassign cuisine")
+
+
+class RestaurantAdmin(ChunkedDeleteAdmin):
+    list_display = ("name", "owner", "location", "established")
+
+
+class MenuAdmin(CatalogAdmin):
+    list_display = ("id", "restaurant")
+    list_select_related = ("restaurant",)
+    search_fields = ("^restaurant__name",)
+    autocomplete_fields = ("dishes", "cuisines", "restaurant")
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Ingredient)
-admin.site.register(models.Dish)
-admin.site.register(models.Menu)
-admin.site.register(models.Restaurant)
+admin.site.register(models.Ingredient, IngredientAdmin)
+admin.site.register(models.Cuisine, CuisineAdmin)
+admin.site.register(models.Dish, DishAdmin)
+admin.site.register(models.Menu, MenuAdmin)
+admin.site.register(models.Restaurant, RestaurantAdmin)
@@ -0,0 +1,118 @@
+from decimal import Decimal
+
+from django.db import NotSupportedError, connection
+from django.db.models import Aggregate, Avg, Count, DecimalField, Max, Min
+
+from core.models import CuisineRollup, Dish, Menu, RestaurantRollup
+
+CENT = Decimal("0.01")
+
+# The rows priced for each grouping, their group and price columns, and
+# the rollup ranking the groups by dish count.
+GROUPS = {
+    "cuisine": (Dish, "cuisine", "price", CuisineRollup),
+    "restaurant": (
+        Menu.dishes.through,
+        "menu__restaurant",
+        "dish__price",
+        RestaurantRollup,
+    ),
+}
+
+
+class Percentile(Aggregate):
+    """Continuous percentile of a column, 0 < fraction < 1
+
+    Only PostgreSQL implements ``percentile_cont``; other databases raise
+    ``NotSupportedError`` and callers fall back to computing it in Python.
+    """
+
+    function = "PERCENTILE_CONT"
+    name = "Percentile"
+    template = (
+        "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    )
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(
+            expression,
+            fraction=float(fraction),
+            output_field=DecimalField(max_digits=12, decimal_places=4),
+            **extra
+        )
+
+    def as_sql(self, compiler, connection, **extra_context):
+        if connection.vendor != "postgresql":
+            raise NotSupportedError("Percentile requires PostgreSQL")
+        return super().as_sql(compiler, connection, **extra_context)
+
+
+def interpolate(values, fraction):
+    """Return the percentile of sorted values as ``percentile_cont`` does"""
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * Decimal(
+        position - lower
+    )
+
+
+def price_stats(group, percentiles=(50, 90), limit=20):
+    """Aggregate dish prices of the largest cuisines or restaurants
+
+    Returns one dict per group with the count, min, max and average price
+    and a ``p<N>`` entry for each requested percentile, for the ``limit``
+    groups with the most dishes. Those are read in order from the
+    ``(-dish_count, id)`` index of the group's rollup table, and only
+    their rows are aggregated, in one query. On databases without
+    ``percentile_cont`` the percentiles come from a second, sorted query
+    over the same rows.
+    """
+    model, key, price, rollup = GROUPS[group]
+    top = list(
+        rollup.objects.filter(dish_count__gt=0)
+        .order_by("-dish_count", group)
+        .values_list(group, flat=True)[:limit]
+    )
+    fractions = {"p%s" % p: Decimal(str(p)) / 100 for p in percentiles}
+    selected = model.objects.filter(**{key + "__in": top})
+    aggregates = {
+        "count": Count(price),
+        "min": Min(price),
+        "max": Max(price),
+        "avg": Avg(price),
+    }
+    native = connection.vendor == "postgresql"
+    if native:
+        for name, fraction in fractions.items():
+            aggregates[name] = Percentile(price, fraction)
+
+    rows = {
+        row[key]: row
+        for row in selected.values(key).order_by(key).annotate(**aggregates)
+    }
+    if not native and fractions:
+        prices = {}
+        for group_id, value in (
+            selected.exclude(**{price: None})
+            .order_by(key, price)
+            .values_list(key, price)
+        ):
+            prices.setdefault(group_id, []).append(value)
+        for group_id, row in rows.items():
+            values = prices.get(group_id)
+            for name, fraction in fractions.items():
+                row[name] = interpolate(values, fraction) if values else None
+
+    results = []
+    for group_id in top:
+        if group_id not in rows:
+            continue
+        row = rows[group_id]
+        result = {group: row.pop(key)}
+        for name, value in row.items():
+            if isinstance(value, (Decimal, float)) and name != "count":
+                value = Decimal(value).quantize(CENT)
+            result[name] = value
+        results.append(result)
+    return results
@@ -0,0 +1,151 @@
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from core import models
+from core.revocation import fingerprint, revoked_tokens
+
+ACCESS_TOKEN_SALT = "core.access-token"
+STREAM_TICKET_SALT = "core.stream-ticket"
+
+
+def issue_access_token(token):
+    """Sign a short-lived access token derived from an expiring token"""
+    payload = {
+        "u": token.user_id,
+        "s": token.user.is_staff,
+        "r": fingerprint(token.key),
+    }
+    return signing.dumps(payload, salt=ACCESS_TOKEN_SALT, compress=True)
+
+
+class TokenUser:
+    """User built from a verified access token without a database lookup
+
+    Only carries what the catalog permissions need. Views that work on the
+    user record itself should keep using ``ExpiringTokenAuthentication``.
+    """
+
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+    is_superuser = False
+
+    def __init__(self, pk, is_staff):
+        self.pk = self.id = pk
+        self.is_staff = is_staff
+
+    def __eq__(self, other):
+        return getattr(other, "pk", None) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return "TokenUser %s" % self.pk
+
+
+def issue_stream_ticket(user, auth):
+    """Sign a ticket opening event streams for ``EVENTS_TICKET_TTL`` seconds
+
+    Browsers cannot set headers on ``EventSource`` or WebSocket requests,
+    so they pass this in the query string instead of a token, which would
+    otherwise end up in access logs for as long as it is valid. ``auth``
+    is the expiring token or access token payload the request carried.
+    """
+    revocation = auth["r"] if isinstance(auth, dict) else fingerprint(auth.key)
+    payload = {"u": user.pk, "s": user.is_staff, "r": revocation}
+    return signing.dumps(payload, salt=STREAM_TICKET_SALT)
+
+
+def read_stream_ticket(ticket):
+    """Return the user of a valid stream ticket, or None"""
+    try:
+        payload = signing.loads(
+            ticket, salt=STREAM_TICKET_SALT, max_age=settings.EVENTS_TICKET_TTL
+        )
+    except signing.BadSignature:
+        return None
+    if payload["r"] in revoked_tokens:
+        return None
+    return TokenUser(payload["u"], payload["s"])
+
+
+class ExpiringTokenAuthentication(TokenAuthentication):
+    """Token authentication with sliding expiry and revocation"""
+
+    model = models.ExpiringToken
+
+    def authenticate_credentials(self, key):
+        """Reject revoked and expired tokens, then slide the expiry"""
+        if revoked_tokens.is_revoked(key):
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        try:
+            token = self.model.objects.select_related("user").get(key=key)
+        except self.model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        if not token.user.is_active:
+            msg = _("User inactive or deleted.")
+            raise exceptions.AuthenticationFailed(msg)
+
+        now = timezone.now()
+        if token.is_expired(now):
+            raise exceptions.AuthenticationFailed(_("Token has expired."))
+        token.touch(now)
+
+        return (token.user, token)
+
+
+class AccessTokenAuthentication(BaseAuthentication):
+    """Stateless authentication with signed access tokens
+
+    Clients send ``Authorization: Bearer <access token>``. The signature and
+    age are verified in-process, so no database or cache round trip is made;
+    revocation of the expiring token it was issued from is checked against
+    the in-memory revocation list.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        if not settings.STATELESS_AUTH:
+            return None
+
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            msg = _("Invalid token header.")
+            raise exceptions.AuthenticationFailed(msg)
+
+        return self.authenticate_credentials(auth[1].decode("latin-1"))
+
+    def authenticate_credentials(self, access):
+        """Verify the signature and age of an access token"""
+        try:
+            payload = signing.loads(
+                access,
+                salt=ACCESS_TOKEN_SALT,
+                max_age=settings.ACCESS_TOKEN_TTL,
+            )
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed(_("Token has expired."))
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        if payload["r"] in revoked_tokens:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        return (TokenUser(payload["u"], payload["s"]), payload)
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,212 @@
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count
+
+from core.models import Cuisine, Dish, Ingredient, Restaurant
+
+MAX_SUGGESTIONS = 20
+
+# Prefixes up to this long have their suggestions ranked in advance, as
+# they match too many names to rank on each keystroke.
+RANKED_PREFIX_LENGTH = 3
+
+WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Return text lowercased and without accents for prefix matching"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+
+def keys(name):
+    """Return the keys a name is found under, one per word it starts
+
+    "Paneer Tikka" is found under "paneer tikka" and "tikka", so typing
+    the start of any of its words suggests it.
+    """
+    text = " ".join(WORD.findall(normalize(name)))
+    starts = [match.start() for match in WORD.finditer(text)]
+    return {text[start:] for start in starts}
+
+
+def popularity(model):
+    """Return (id, name, score) rows, the score ranking suggestions"""
+    if model is Dish:
+        return Dish.objects.annotate(score=Count("menu")).values_list(
+            "pk", "name", "score"
+        )
+    rollup = {
+        Ingredient: "ingredientrollup",
+        Cuisine: "cuisinerollup",
+        Restaurant: "restaurantrollup",
+    }[model]
+    return model.objects.values_list("pk", "name", rollup + "__dish_count")
+
+
+class NameIndex:
+    """Names of one model kept sorted in memory for prefix lookups
+
+    ``_keys`` is a sorted list of (key, id); the names under a prefix are a
+    contiguous run found by bisection. Short prefixes also keep their top
+    ``MAX_SUGGESTIONS`` ids ranked, so every lookup reads a few entries.
+    Objects rank by score (how many dishes or listings they have, as of
+    the last build) then by name.
+    """
+
+    def __init__(self):
+        self._names = {}
+        self._keys = []
+        self._ranked = {}
+
+    def rank(self, pk):
+        return self._names[pk][1]
+
+    def load(self, rows):
+        ranked = defaultdict(set)
+        for pk, name, score in rows:
+            self._names[pk] = (name, (-(score or 0), normalize(name), pk))
+            for key in keys(name):
+                self._keys.append((key, pk))
+                for length in range(1, RANKED_PREFIX_LENGTH + 1):
+                    if len(key) >= length:
+                        ranked[key[:length]].add(pk)
+        self._keys.sort()
+        for prefix, pks in ranked.items():
+            self._ranked[prefix] = heapq.nsmallest(
+                MAX_SUGGESTIONS, pks, key=self.rank
+            )
+
+    def scan(self, prefix):
+        """Return the ids of every name with a word starting with prefix"""
+        found = set()
+        position = bisect_left(self._keys, (prefix,))
+        while position < len(self._keys):
+            key, pk = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            found.add(pk)
+            position += 1
+        return found
+
+    def suggest(self, prefix, k):
+        if len(prefix) <= RANKED_PREFIX_LENGTH:
+            pks = self._ranked.get(prefix, ())[:k]
+        else:
+            pks = heapq.nsmallest(k, self.scan(prefix), key=self.rank)
+        return [(pk, self._names[pk][0]) for pk in pks]
+
+    def put(self, pk, name):
+        """Add an object, or move it to its new name"""
+        score = 0
+        if pk in self._names:
+            if self._names[pk][0] == name:
+                return
+            score = -self._names[pk][1][0]
+            self.discard(pk)
+        self._names[pk] = (name, (-score, normalize(name), pk))
+        for key in keys(name):
+            insort(self._keys, (key, pk))
+            for length in range(1, min(len(key), RANKED_PREFIX_LENGTH) + 1):
+                top = self._ranked.setdefault(key[:length], [])
+                if pk not in top:
+                    top.append(pk)
+                    top.sort(key=self.rank)
+                    del top[MAX_SUGGESTIONS:]
+
+    def discard(self, pk):
+        if pk not in self._names:
+            return
+        name, _ = self._names[pk]
+        for key in keys(name):
+            entry = (key, pk)
+            position = bisect_left(self._keys, entry)
+            if position < len(self._keys) and self._keys[position] == entry:
+                del self._keys[position]
+        del self._names[pk]
+        for key in keys(name):
+            for length in range(1, min(len(key), RANKED_PREFIX_LENGTH) + 1):
+                prefix = key[:length]
+                if pk in self._ranked.get(prefix, ()):
+                    self._ranked[prefix] = heapq.nsmallest(
+                        MAX_SUGGESTIONS, self.scan(prefix), key=self.rank
+                    )
+
+
+class AutocompleteIndex:
+    """Per-model prefix indexes of catalog names for typeahead suggestions
+
+    Built in a few queries when a worker warms up, kept up to date from
+    model signals in this process and rebuilt once older than
+    ``AUTOCOMPLETE_INDEX_TTL`` to pick up other workers' writes and new
+    scores.
+    """
+
+    MODELS = {
+        "dish": Dish,
+        "ingredient": Ingredient,
+        "cuisine": Cuisine,
+        "restaurant": Restaurant,
+    }
+
+    def __init__(self):
+        self._indexes = {}
+        self._built_at = None
+        self._lock = threading.RLock()
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def build(self):
+        indexes = {}
+        for model_name, model in self.MODELS.items():
+            indexes[model_name] = NameIndex()
+            indexes[model_name].load(popularity(model).iterator())
+        with self._lock:
+            self._indexes = indexes
+            self._built_at = time.monotonic()
+
+    def ensure_built(self):
+        ttl = settings.AUTOCOMPLETE_INDEX_TTL
+        if not self.is_built or time.monotonic() - self._built_at > ttl:
+            self.build()
+
+    def clear(self):
+        with self._lock:
+            self._indexes = {}
+            self._built_at = None
+
+    def put(self, model_name, pk, name):
+        with self._lock:
+            if model_name in self._indexes:
+                self._indexes[model_name].put(pk, name)
+
+    def discard(self, model_name, pk):
+        with self._lock:
+            if model_name in self._indexes:
+                self._indexes[model_name].discard(pk)
+
+    def suggest(self, text, model_names, k=10):
+        """Return the top ``k`` (id, name) pairs per model for a prefix"""
+        self.ensure_built()
+        prefix = " ".join(WORD.findall(normalize(text)))
+        if not prefix:
+            return {model_name: [] for model_name in model_names}
+        with self._lock:
+            return {
+                model_name: self._indexes[model_name].suggest(prefix, k)
+                for model_name in model_names
+            }
+
+
+name_index = AutocompleteIndex()
@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils.translation import gettext as _
+
+from core import changes, rollups
+from core.deletion import chunks
+from core.models import CatalogChange, Dish, Menu
+
+MenuDish = Menu.dishes.through
+
+# The largest price a DecimalField(10, 2) holds.
+MAX_PRICE = Decimal("99999999.99")
+
+
+def update_dishes(dishes, check=None, **updates):
+    """Apply updates to dishes in chunks and keep derived data current
+
+    ``dishes`` is a queryset worked through in chunks of
+    ``BULK_UPDATE_CHUNK_SIZE``, each locked and changed with one UPDATE in
+    its own short transaction, so neither memory nor lock times grow with
+    the selection. ``check`` is called with each locked chunk first and
+    may raise to stop, leaving earlier chunks updated. Bulk UPDATEs skip
+    model signals, so this bumps each dish's version, logs the changes
+    and refreshes the rollups of every cuisine and restaurant the dishes
+    were or are now in.
+    """
+    cuisines = set()
+    restaurants = set()
+    updated = 0
+    try:
+        for ids in chunks(dishes, settings.BULK_UPDATE_CHUNK_SIZE):
+            chunk = Dish.objects.filter(pk__in=ids)
+            with transaction.atomic():
+                cuisines.update(
+                    chunk.select_for_update().values_list("cuisine", flat=True)
+                )
+                if check is not None:
+                    check(chunk)
+                updated += chunk.update(version=F("version") + 1, **updates)
+                cuisines.update(chunk.values_list("cuisine", flat=True))
+                restaurants.update(
+                    MenuDish.objects.filter(dish__in=ids)
+                    .exclude(menu__restaurant=None)
+                    .values_list("menu__restaurant", flat=True)
+                )
+                changes.record(Dish, ids, CatalogChange.UPDATE)
+    finally:
+        if cuisines or restaurants:
+            rollups.refresh(cuisines - {None}, restaurants)
+    return updated
+
+
+def adjust_prices(dishes, percent):
+    """Change the price of dishes by a percentage, e.g. 10 or -5
+
+    Raises ``ValueError`` if a price would become negative or too large
+    to store. The whole selection is checked before any price changes,
+    and each chunk again once locked, in case prices rose meanwhile.
+    """
+    factor = 1 + Decimal(percent) / 100
+
+    def check(selected):
+        highest = selected.aggregate(Max("price"))["price__max"]
+        if factor < 0 or (highest or 0) * factor > MAX_PRICE:
+            raise ValueError(_("The adjusted prices would be out of range."))
+
+    check(dishes)
+    return update_dishes(dishes, check, price=F("price") * factor)
+
+
+def reassign_cuisine(ids, cuisine):
+    return update_dishes(ids, cuisine=cuisine)
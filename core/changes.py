@@ -0,0 +1,167 @@
+from django.db import transaction
+from django.db.models import Exists, F, Max, Min, OuterRef
+
+from core import coalescing
+from core.models import (
+    CatalogChange,
+    ChangeSequence,
+    Cuisine,
+    Dish,
+    Ingredient,
+    Menu,
+    Restaurant,
+)
+
+TRACKED_MODELS = (Ingredient, Cuisine, Dish, Restaurant, Menu)
+
+# Each link table with the model owning the field and the linked model.
+# Only the owner's serialized form lists the links, so link changes are
+# logged as updates of the owner.
+LINKS = {
+    field.remote_field.through: (model, field.related_model, field)
+    for model in TRACKED_MODELS
+    for field in model._meta.many_to_many
+}
+
+
+def name(model):
+    return model._meta.model_name
+
+
+def record(model, ids, operation):
+    """Append one change per object id to the log
+
+    Streaming subscribers read it from there, and cached catalog reads are
+    retired. The entries get their versions once the transaction commits.
+    """
+    ids = list(ids)
+    CatalogChange.objects.bulk_create(
+        CatalogChange(model=name(model), object_id=pk, operation=operation)
+        for pk in ids
+    )
+    coalescing.invalidate()
+    transaction.on_commit(sequence)
+
+
+def record_link_owners(model, pk):
+    """Log updates for the objects linking to one about to be deleted
+
+    Deleting a linked object drops its link rows without ``m2m_changed``,
+    but still changes how the owners are serialized.
+    """
+    for through, (owner, linked, field) in LINKS.items():
+        if linked is model:
+            owners = through.objects.filter(
+                **{field.m2m_reverse_field_name(): pk}
+            ).values_list(field.m2m_field_name(), flat=True)
+            record(owner, set(owners), CatalogChange.UPDATE)
+
+
+def lock_sequence():
+    """Lock the sequence row and return the last version assigned
+
+    Writing the row first takes the lock on every database, and reads made
+    after it see everything committed before it was released.
+    """
+    locked = ChangeSequence.objects.filter(pk=1)
+    if not locked.update(last=F("last")):
+        ChangeSequence.objects.get_or_create(pk=1)
+        locked.update(last=F("last"))
+    return locked.values_list("last", flat=True).get()
+
+
+def sequence():
+    """Assign versions to the committed log entries still without one
+
+    Ids come from a sequence and are taken before commit, so a transaction
+    still open may commit entries below ids already visible. Versions are
+    instead assigned under a lock after commit, each run above every
+    version before it, so clients reading up to a version never skip an
+    entry committed later. Within a run entries keep their id order.
+    """
+    pending = CatalogChange.objects.filter(version=None)
+    if not pending.exists():
+        return
+    with transaction.atomic():
+        last = lock_sequence()
+        bounds = pending.aggregate(first=Min("id"), last=Max("id"))
+        if bounds["first"] is None:
+            return
+        offset = max(0, last + 1 - bounds["first"])
+        pending.filter(id__range=(bounds["first"], bounds["last"])).update(
+            version=F("id") + offset
+        )
+        ChangeSequence.objects.filter(pk=1).update(
+            last=bounds["last"] + offset
+        )
+
+
+def current_version():
+    """Return the latest version, every entry up to it committed
+
+    Entries committed but not yet versioned, e.g. by a process stopped
+    before its commit hook ran, are versioned first.
+    """
+    sequence()
+    return (
+        ChangeSequence.objects.filter(pk=1)
+        .values_list("last", flat=True)
+        .first()
+        or 0
+    )
+
+
+def horizon():
+    """Return the version before which compaction may have dropped deletes"""
+    return (
+        CatalogChange.objects.filter(
+            operation=CatalogChange.TRUNCATE
+        ).aggregate(version=Max("object_id"))["version"]
+        or 0
+    )
+
+
+def changes_since(version, limit, until):
+    """Return up to ``limit`` log entries after ``version`` in order
+
+    Entries after ``until``, normally ``current_version()``, are left for
+    later, as ones versioned since may not be visible yet.
+    """
+    return list(
+        CatalogChange.objects.filter(version__gt=version, version__lte=until)
+        .exclude(operation=CatalogChange.TRUNCATE)
+        .order_by("version")
+        .values_list("version", "model", "object_id", "operation")[:limit]
+    )
+
+
+def compact(before):
+    """Shrink the log and return the number of entries removed
+
+    Entries superseded by a later one for the same object are dropped, as
+    every client reading the older one reads the newer one as well. Delete
+    entries written before ``before`` are dropped too; a truncate marker
+    keeps the highest version removed so clients that have not synced
+    since are told to start over.
+    """
+    sequence()
+    newer = CatalogChange.objects.filter(
+        model=OuterRef("model"),
+        object_id=OuterRef("object_id"),
+        version__gt=OuterRef("version"),
+    )
+    removed, _ = CatalogChange.objects.filter(Exists(newer)).delete()
+
+    expired = CatalogChange.objects.filter(
+        operation=CatalogChange.DELETE, created__lt=before
+    ).exclude(version=None)
+    truncated = expired.aggregate(version=Max("version"))["version"]
+    if truncated is not None:
+        truncated = max(truncated, horizon())
+        count, _ = expired.delete()
+        removed += count
+        CatalogChange.objects.filter(operation=CatalogChange.TRUNCATE).delete()
+        CatalogChange.objects.create(
+            model="", object_id=truncated, operation=CatalogChange.TRUNCATE
+        )
+    return removed
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Cache backends that keep their data in each process.
+LOCAL_CACHES = (
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_revocation_cache(app_configs, **kwargs):
+    """Report a revocation cache that workers do not share"""
+    alias = settings.TOKEN_REVOCATION_CACHE
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if alias not in settings.CACHES or backend in LOCAL_CACHES:
+        return [
+            Error(
+                "TOKEN_REVOCATION_CACHE must name a cache shared by every "
+                "worker, or tokens revoked in one stay valid in the others.",
+                hint="Point it at a Redis or Memcached cache in CACHES.",
+                id="core.E001",
+            )
+        ]
+    return []
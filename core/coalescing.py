@@ -0,0 +1,186 @@
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+GENERATION_KEY = "catalog:generation"
+
+# Weight of the recompute time in probabilistic early expiry; above 1
+# favours refreshing earlier.
+BETA = 1.0
+
+# Seconds a process waits for another one computing the same entry
+# before computing it as well.
+LOCK_WAIT = 5.0
+POLL_INTERVAL = 0.05
+
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Shares one computation among concurrent callers with the same key
+
+    The first caller runs the function; callers arriving while it runs
+    wait for it and get its result, or its exception. Nothing is kept
+    once the call returns.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+flight = SingleFlight()
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE]
+
+
+def generation():
+    """Return the counter keying cached reads, bumped by catalog writes"""
+    return get_cache().get(GENERATION_KEY, 0)
+
+
+def bump_generation():
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 0, None)
+        cache.incr(GENERATION_KEY)
+
+
+def invalidate():
+    """Retire cached reads now and again once the transaction commits
+
+    The second bump drops entries cached from data read between the
+    write and its commit.
+    """
+    if settings.CATALOG_CACHE_TTL:
+        bump_generation()
+        transaction.on_commit(bump_generation)
+
+
+def is_fresh(expires, delta, now):
+    """Check an entry can be served without refreshing it
+
+    Entries expire a little early at random, more likely the closer they
+    are to expiring and the longer they took to compute, so one request
+    refreshes a popular entry before every request misses it at once.
+    """
+    early = delta * BETA * math.log(1 - random.random())
+    return now - early < expires
+
+
+def compute(cache, key, func, ttl):
+    started = time.time()
+    value = func()
+    delta = time.time() - started
+    cache.set(
+        key,
+        (value, started + ttl, delta),
+        ttl + settings.CATALOG_CACHE_STALE,
+    )
+    return value
+
+
+def claim(cache, key):
+    """Take the cross-process lock for computing an entry, if enabled"""
+    if not settings.CATALOG_CACHE_LOCK:
+        return True
+    return cache.add("%s:lock" % key, 1, LOCK_WAIT)
+
+
+def release(cache, key):
+    if settings.CATALOG_CACHE_LOCK:
+        cache.delete("%s:lock" % key)
+
+
+def wait_for(cache, key):
+    """Return an entry another process is computing, or None on timeout"""
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def refresh(cache, key, func, ttl):
+    try:
+        return compute(cache, key, func, ttl)
+    finally:
+        release(cache, key)
+
+
+def get_or_compute(key, func):
+    """Return a catalog read for key, computing it at most once at a time
+
+    Without ``CATALOG_CACHE_TTL`` only concurrent calls are coalesced.
+    Otherwise results are cached for that many seconds under the current
+    generation. For ``CATALOG_CACHE_STALE`` seconds more an expired entry
+    is still served while a single request refreshes it.
+    ``CATALOG_CACHE_LOCK`` extends that single request across processes
+    sharing the cache.
+    """
+    ttl = settings.CATALOG_CACHE_TTL
+    if not ttl:
+        return flight.do(key, func)
+
+    cache = get_cache()
+    key = "catalog:%s:%s" % (generation(), key)
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires, delta = entry
+        if is_fresh(expires, delta, time.time()):
+            return value
+        if flight.in_flight(key) or not claim(cache, key):
+            return value
+        return flight.do(key, lambda: refresh(cache, key, func, ttl))
+
+    def fill():
+        if claim(cache, key):
+            return refresh(cache, key, func, ttl)
+        entry = wait_for(cache, key)
+        if entry is not None:
+            return entry[0]
+        return compute(cache, key, func, ttl)
+
+    return flight.do(key, fill)
@@ -0,0 +1,212 @@
+import hashlib
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPRESSIBLE_TYPES = re.compile(
+    r"^(text/|application/(json|javascript|xml|msgpack)|[^;]*\+json)"
+)
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        compressor = self.compressor()
+        return compressor.compress(data) + compressor.flush()
+
+    def compressor(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def stream(self, chunks):
+        compressor = self.compressor()
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self, chunks):
+        compressor = brotli.Compressor(quality=self.level)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self, chunks):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def parse_accept_encoding(header):
+    """Return the encodings a client accepts mapped to their quality"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+class CompressedCache:
+    """LRU of compressed bodies keyed by content digest and encoding
+
+    Identical responses, such as the same catalog list served to many
+    clients, are compressed once; later hits only pay for hashing the body.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, encoder, content):
+        if not self.max_entries:
+            return encoder.compress(content)
+        key = (hashlib.sha1(content).digest(), encoder.name)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        compressed = encoder.compress(content)
+        with self._lock:
+            self._entries[key] = compressed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+compressed_cache = CompressedCache(settings.COMPRESSION_CACHE_SIZE)
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts
+
+    Tries ``COMPRESSION_ENCODINGS`` in order of server preference, skipping
+    encodings whose library is not installed. Bodies smaller than
+    ``COMPRESSION_MIN_SIZE`` and non-textual content types are sent as is;
+    streaming responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.encoders = [
+            ENCODERS[name](settings.COMPRESSION_LEVELS.get(name, 6))
+            for name in settings.COMPRESSION_ENCODINGS
+            if name in ENCODERS
+        ]
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def choose_encoder(self, request):
+        accepted = parse_accept_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        wildcard = accepted.get("*", 0)
+        for encoder in self.encoders:
+            if accepted.get(encoder.name, wildcard) > 0:
+                return encoder
+        return None
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not COMPRESSIBLE_TYPES.match(response.get("Content-Type", "")):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoder = self.choose_encoder(request)
+        if encoder is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = encoder.stream(
+                response.streaming_content
+            )
+            del response["Content-Length"]
+        else:
+            compressed = compressed_cache.get_or_compress(
+                encoder, response.content
+            )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoder.name
+        return response
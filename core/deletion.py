@@ -0,0 +1,227 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core import changes, rollups
+from core.models import (
+    CatalogChange,
+    Cuisine,
+    CuisineRollup,
+    Deletion,
+    Dish,
+    Menu,
+    Restaurant,
+    RestaurantRollup,
+)
+from core.autocomplete import name_index
+from core.fuzzy import trigram_index
+from core.recommendations import dish_index
+
+logger = logging.getLogger(__name__)
+
+CuisineIngredient = Cuisine.popular_ingredients.through
+DishIngredient = Dish.ingredients.through
+MenuCuisine = Menu.cuisines.through
+MenuDish = Menu.dishes.through
+
+
+def raw_delete(queryset):
+    """Delete the rows of a single-table queryset with one DELETE
+
+    No objects are loaded and no signals or Django-side cascades run, so
+    callers delete dependent rows first and keep derived data current.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def chunks(queryset, size):
+    """Yield the primary keys of a queryset in lists of up to ``size``"""
+    last = None
+    queryset = queryset.order_by("pk").values_list("pk", flat=True)
+    while True:
+        page = queryset if last is None else queryset.filter(pk__gt=last)
+        ids = list(page[:size])
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+
+def delete_menus(ids):
+    """Delete menus and their links, logging the deletes"""
+    with transaction.atomic():
+        rollups.add_listings(rollups.listings(menu_ids=ids), -1)
+        raw_delete(MenuDish.objects.filter(menu_id__in=ids))
+        raw_delete(MenuCuisine.objects.filter(menu_id__in=ids))
+        count = raw_delete(Menu.objects.filter(pk__in=ids))
+        changes.record(Menu, ids, CatalogChange.DELETE)
+    return count
+
+
+def delete_dishes(ids):
+    """Delete dishes and their links, logging the changes"""
+    with transaction.atomic():
+        menus = set(
+            MenuDish.objects.filter(dish_id__in=ids).values_list(
+                "menu", flat=True
+            )
+        )
+        rollups.dishes_deleting(ids)
+        raw_delete(DishIngredient.objects.filter(dish_id__in=ids))
+        raw_delete(MenuDish.objects.filter(dish_id__in=ids))
+        count = raw_delete(Dish.objects.filter(pk__in=ids))
+        changes.record(Menu, menus, CatalogChange.UPDATE)
+        changes.record(Dish, ids, CatalogChange.DELETE)
+    for pk in ids:
+        name_index.discard("dish", pk)
+        trigram_index.discard("dish", pk)
+        if dish_index.is_built:
+            dish_index.discard(pk)
+    return count
+
+
+def purge_restaurant(pk, size):
+    """Delete a restaurant and its menus, yielding the rows deleted per step
+
+    Menus go in chunks of ``size``, each in its own short transaction. The
+    restaurant row is locked while any menus added since are deleted with
+    it, so nothing can reference it once it is gone.
+    """
+    menus = Menu.objects.filter(restaurant=pk)
+    for ids in chunks(menus, size):
+        yield delete_menus(ids)
+    with transaction.atomic():
+        if not Restaurant.objects.select_for_update().filter(pk=pk).exists():
+            return
+        count = sum(delete_menus(ids) for ids in chunks(menus, size))
+        raw_delete(RestaurantRollup.objects.filter(restaurant=pk))
+        count += raw_delete(Restaurant.objects.filter(pk=pk))
+        changes.record(Restaurant, [pk], CatalogChange.DELETE)
+    name_index.discard("restaurant", pk)
+    yield count
+
+
+def purge_cuisine(pk, size):
+    """Delete a cuisine and its dishes, yielding the rows deleted per step
+
+    Dishes go in chunks of ``size`` like the menus of a restaurant; the
+    menus listing the cuisine are logged as updated.
+    """
+    dishes = Dish.objects.filter(cuisine=pk)
+    for ids in chunks(dishes, size):
+        yield delete_dishes(ids)
+    with transaction.atomic():
+        if not Cuisine.objects.select_for_update().filter(pk=pk).exists():
+            return
+        count = sum(delete_dishes(ids) for ids in chunks(dishes, size))
+        changes.record_link_owners(Cuisine, pk)
+        raw_delete(MenuCuisine.objects.filter(cuisine_id=pk))
+        raw_delete(CuisineIngredient.objects.filter(cuisine_id=pk))
+        raw_delete(CuisineRollup.objects.filter(cuisine=pk))
+        count += raw_delete(Cuisine.objects.filter(pk=pk))
+        changes.record(Cuisine, [pk], CatalogChange.DELETE)
+    name_index.discard("cuisine", pk)
+    trigram_index.discard("cuisine", pk)
+    yield count
+
+
+# The purge of each model and the dependents counted to size a deletion.
+PURGES = {
+    "restaurant": (purge_restaurant, Menu, "restaurant"),
+    "cuisine": (purge_cuisine, Dish, "cuisine"),
+}
+
+
+def unfinished():
+    return Deletion.objects.filter(
+        status__in=(Deletion.PENDING, Deletion.RUNNING)
+    )
+
+
+def abandoned():
+    """Return the unfinished deletions no thread has reported on lately
+
+    Running deletions save their progress after every chunk; one silent
+    for ``DELETION_LEASE_SECONDS`` was cut short, e.g. by its worker being
+    recycled, or its thread never started.
+    """
+    expired = timezone.now() - timedelta(
+        seconds=settings.DELETION_LEASE_SECONDS
+    )
+    return unfinished().filter(updated__lt=expired)
+
+
+def claim(deletion):
+    """Take over an abandoned deletion, False if another process did first"""
+    return bool(
+        abandoned()
+        .filter(pk=deletion.pk, updated=deletion.updated)
+        .update(updated=timezone.now())
+    )
+
+
+def schedule(instance):
+    """Delete a restaurant or cuisine now, or return a background Deletion
+
+    Objects with up to ``DELETION_ASYNC_THRESHOLD`` dependents are deleted
+    before returning. Larger ones get a Deletion that a thread started
+    once the transaction commits works through. An unfinished deletion of
+    the same object is returned instead of starting another, and resumed
+    in a new thread if abandoned.
+    """
+    model = changes.name(type(instance))
+    purge, dependent, field = PURGES[model]
+    total = dependent.objects.filter(**{field: instance.pk}).count()
+    if total <= settings.DELETION_ASYNC_THRESHOLD:
+        for _ in purge(instance.pk, settings.DELETION_CHUNK_SIZE):
+            pass
+        return None
+    active = unfinished().filter(model=model, object_id=instance.pk).first()
+    if active is not None:
+        if claim(active):
+            transaction.on_commit(lambda: start(active.pk))
+        return active
+    deletion = Deletion.objects.create(
+        model=model, object_id=instance.pk, total=total + 1
+    )
+    transaction.on_commit(lambda: start(deletion.pk))
+    return deletion
+
+
+def run(deletion):
+    """Work through a deletion, saving its progress after every chunk
+
+    Each save renews the deletion's lease, so it is not taken over while
+    it makes progress.
+    """
+    progress = Deletion.objects.filter(pk=deletion.pk)
+    progress.update(status=Deletion.RUNNING, updated=timezone.now())
+    purge = PURGES[deletion.model][0]
+    try:
+        for count in purge(deletion.object_id, settings.DELETION_CHUNK_SIZE):
+            progress.update(
+                deleted=F("deleted") + count, updated=timezone.now()
+            )
+    except Exception as error:
+        logger.exception("Deletion %s failed", deletion.pk)
+        progress.update(status=Deletion.FAILED, error=str(error))
+        return
+    progress.update(status=Deletion.DONE)
+
+
+def run_in_thread(pk):
+    try:
+        deletion = Deletion.objects.filter(pk=pk).first()
+        if deletion is not None:
+            run(deletion)
+    finally:
+        connections.close_all()
+
+
+def start(pk):
+    threading.Thread(target=run_in_thread, args=(pk,), daemon=True).start()
@@ -0,0 +1,91 @@
+from collections import defaultdict
+
+from django.db.models import F
+
+from core.models import Dish
+
+DishIngredient = Dish.ingredients.through
+
+# Ingredient flags, in the order of their bits in ``Dish.diet``.
+FLAGS = ("vegetarian", "vegan", "gluten_free", "nut_free", "dairy_free")
+BITS = {flag: 1 << position for position, flag in enumerate(FLAGS)}
+ALL = (1 << len(FLAGS)) - 1
+
+# Dishes recomputed per query when an ingredient used widely changes.
+CHUNK_SIZE = 1000
+
+
+def mask(flags):
+    """Return the bits of some flag names"""
+    value = 0
+    for flag in flags:
+        value |= BITS[flag]
+    return value
+
+
+def flags(value):
+    """Return the flag names set in a bitmask"""
+    return [flag for flag in FLAGS if value & BITS[flag]]
+
+
+def supersets(value):
+    """Return every bitmask holding at least the bits of ``value``
+
+    A dish matches a filter when its ``diet`` is one of these, which an
+    index on the column serves as a single ``IN`` lookup.
+    """
+    return [other for other in range(ALL + 1) if other & value == value]
+
+
+def dish_masks(dish_ids):
+    """Return the diet of each dish, the flags all its ingredients have
+
+    Dishes without ingredients make no dietary claims.
+    """
+    masks = dict.fromkeys(dish_ids, 0)
+    seen = set()
+    rows = DishIngredient.objects.filter(dish_id__in=dish_ids).values_list(
+        "dish_id", *("ingredient__" + flag for flag in FLAGS)
+    )
+    for dish_id, *values in rows:
+        value = mask(flag for flag, on in zip(FLAGS, values) if on)
+        if dish_id in seen:
+            masks[dish_id] &= value
+        else:
+            masks[dish_id] = value
+            seen.add(dish_id)
+    return masks
+
+
+def refresh(dish_ids, bump=False):
+    """Store the diet of dishes and return the new diet of those changed
+
+    Changed dishes are updated with one UPDATE per distinct diet. ``bump``
+    also increments their version, for changes made through ingredients
+    rather than through the dish itself.
+    """
+    dish_ids = list(dish_ids)
+    changed = {}
+    while dish_ids:
+        chunk, dish_ids = dish_ids[:CHUNK_SIZE], dish_ids[CHUNK_SIZE:]
+        masks = dish_masks(chunk)
+        stored = Dish.objects.filter(pk__in=chunk).values_list("pk", "diet")
+        by_mask = defaultdict(list)
+        for pk, value in stored:
+            if masks[pk] != value:
+                by_mask[masks[pk]].append(pk)
+        for value, ids in by_mask.items():
+            updates = {"diet": value}
+            if bump:
+                updates["version"] = F("version") + 1
+            Dish.objects.filter(pk__in=ids).update(**updates)
+            changed.update(dict.fromkeys(ids, value))
+    return changed
+
+
+def dishes_with(ingredient_id):
+    return list(
+        DishIngredient.objects.filter(ingredient_id=ingredient_id)
+        .values_list("dish_id", flat=True)
+        .distinct()
+    )
@@ -0,0 +1,252 @@
+import asyncio
+import functools
+import logging
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from core import changes
+from core.models import CatalogChange, Menu
+
+logger = logging.getLogger(__name__)
+
+MenuDish = Menu.dishes.through
+MenuCuisine = Menu.cuisines.through
+
+# Log entries read from the change log per poll.
+TAIL_BATCH = 1000
+
+# How to find the restaurants listing changed objects of each model.
+RESTAURANT_LOOKUPS = {
+    "menu": (Menu, "pk", "restaurant"),
+    "dish": (MenuDish, "dish", "menu__restaurant"),
+    "cuisine": (MenuCuisine, "cuisine", "menu__restaurant"),
+    "ingredient": (MenuDish, "dish__ingredients", "menu__restaurant"),
+}
+
+
+class Subscription:
+    """Changes waiting to be sent to one connection
+
+    Pending events are keyed by object, so a burst of changes to the same
+    dish is sent once with its latest operation. Idle subscriptions only
+    hold an ``asyncio.Event``; they cost no thread and no polling.
+    """
+
+    def __init__(self, restaurants, loop):
+        self.restaurants = restaurants
+        self.loop = loop
+        self.pending = {}
+        self.ready = asyncio.Event()
+
+    def push(self, event):
+        self.pending[event["model"], event["id"]] = event
+        self.ready.set()
+
+    async def next_batch(self, timeout):
+        """Return the changes after a burst settles, or [] on timeout"""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        await asyncio.sleep(settings.EVENTS_COALESCE_WINDOW)
+        self.ready.clear()
+        batch = list(self.pending.values())
+        self.pending = {}
+        return batch
+
+
+class Broker:
+    """In-process fan-out of catalog changes to streaming connections
+
+    Subscriptions are indexed by restaurant, ``None`` standing for every
+    restaurant. Changes are published from the thread reading the change
+    log and handed to each event loop with one callback, which then pushes
+    to all of its subscriptions.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def __len__(self):
+        return self._count
+
+    def subscribe(self, restaurants=None):
+        """Return a subscription to some restaurants, or all of them"""
+        subscription = Subscription(restaurants, asyncio.get_event_loop())
+        with self._lock:
+            self._count += 1
+            for restaurant in restaurants or (None,):
+                self._subscriptions[restaurant].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._count -= 1
+            for restaurant in subscription.restaurants or (None,):
+                subscriptions = self._subscriptions.get(restaurant, set())
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    self._subscriptions.pop(restaurant, None)
+
+    def publish(self, event, restaurants):
+        """Send an event to subscribers of its restaurants and of all
+
+        With ``restaurants`` of ``None`` every subscriber gets the event.
+        """
+        with self._lock:
+            if restaurants is None:
+                targets = set().union(*self._subscriptions.values())
+            else:
+                targets = set(self._subscriptions.get(None, ()))
+                for restaurant in restaurants:
+                    targets.update(self._subscriptions.get(restaurant, ()))
+        by_loop = defaultdict(list)
+        for subscription in targets:
+            by_loop[subscription.loop].append(subscription)
+        for loop, subscriptions in by_loop.items():
+            loop.call_soon_threadsafe(deliver, subscriptions, event)
+
+    def clear(self):
+        with self._lock:
+            self._subscriptions.clear()
+            self._count = 0
+
+
+def deliver(subscriptions, event):
+    for subscription in subscriptions:
+        subscription.push(event)
+
+
+def restaurants_for(model, ids):
+    """Return the ids of restaurants listing each of the objects"""
+    if model == "restaurant":
+        return {pk: {pk} for pk in ids}
+    found = defaultdict(set)
+    if model not in RESTAURANT_LOOKUPS:
+        return found
+    source, field, restaurant = RESTAURANT_LOOKUPS[model]
+    rows = (
+        source.objects.filter(**{field + "__in": ids})
+        .exclude(**{restaurant: None})
+        .values_list(field, restaurant)
+        .distinct()
+    )
+    for pk, restaurant_id in rows:
+        found[pk].add(restaurant_id)
+    return found
+
+
+def with_fresh_connections(func):
+    """Close unusable or expired connections around func, as per request
+
+    Otherwise a connection lost to a database restart would fail every
+    call after it until the worker restarts.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return wrapper
+
+
+def is_routed(model, operation):
+    """Check a change can be sent to just the restaurants listing it"""
+    return operation != CatalogChange.DELETE or model == "restaurant"
+
+
+class Tailer:
+    """Feeds the broker from the change log shared by every worker
+
+    Writes in any process, WSGI or ASGI, reach subscribers here: while this
+    worker has any, one task polls the log every ``EVENTS_POLL_INTERVAL``
+    seconds for entries versioned after the last one seen. Versions follow
+    commit order, so entries are published as soon as they commit and
+    none committed late is skipped. Idle workers do not poll.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.last = None
+        self._task = None
+        self._loop = None
+
+    def ensure_running(self):
+        """Start tailing in the running event loop unless already tailing"""
+        loop = asyncio.get_event_loop()
+        task = self._task
+        if task is None or task.done() or self._loop is not loop:
+            self._task = loop.create_task(self.run())
+            self._loop = loop
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._loop = None
+
+    async def run(self):
+        try:
+            self.last = await sync_to_async(
+                with_fresh_connections(changes.current_version)
+            )()
+            while self.broker.has_subscribers:
+                await asyncio.sleep(settings.EVENTS_POLL_INTERVAL)
+                try:
+                    await sync_to_async(self.poll)()
+                except Exception:
+                    logger.exception("Reading the change log failed")
+        finally:
+            self.last = None
+
+    @with_fresh_connections
+    def poll(self):
+        """Publish the entries versioned after the last one seen"""
+        until = changes.current_version()
+        entries = changes.changes_since(self.last, TAIL_BATCH, until)
+        self.publish(entries)
+        if len(entries) == TAIL_BATCH:
+            self.last = entries[-1][0]
+        else:
+            self.last = max(self.last, until)
+
+    def publish(self, entries):
+        """Publish change log entries to the subscribers they concern
+
+        Deletes go to every subscriber: the rows linking a deleted object
+        to its restaurants are gone by the time the entry is read.
+        """
+        ids = defaultdict(set)
+        for version, model, object_id, operation in entries:
+            if is_routed(model, operation):
+                ids[model].add(object_id)
+        restaurants = {
+            model: restaurants_for(model, model_ids)
+            for model, model_ids in ids.items()
+        }
+        for version, model, object_id, operation in entries:
+            targets = None
+            if is_routed(model, operation):
+                targets = restaurants[model].get(object_id, set())
+            self.broker.publish(
+                {"model": model, "id": object_id, "operation": operation},
+                targets,
+            )
+
+
+broker = Broker()
+tailer = Tailer(broker)
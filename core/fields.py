@@ -0,0 +1,61 @@
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """Many related field resolving every submitted id in one query
+
+    The default field looks each id up with its own ``get``. This one
+    fetches them all with a single ``pk__in`` query and reports every
+    missing id in one error. The objects it returns are the fetched
+    instances, so writing the links needs no further lookups.
+    """
+
+    default_error_messages = {
+        "does_not_exist": _(
+            'Invalid pks "{pk_values}" - objects do not exist.'
+        )
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pks = [self.to_pk(queryset, item) for item in data]
+        objects = queryset.in_bulk(set(pks))
+        missing = [pk for pk in dict.fromkeys(pks) if pk not in objects]
+        if missing:
+            self.fail(
+                "does_not_exist",
+                pk_values=", ".join(str(pk) for pk in missing),
+            )
+        return [objects[pk] for pk in pks]
+
+    def to_pk(self, queryset, item):
+        child = self.child_relation
+        if child.pk_field is not None:
+            item = child.pk_field.to_internal_value(item)
+        try:
+            if isinstance(item, bool):
+                raise TypeError
+            return queryset.model._meta.pk.to_python(item)
+        except (TypeError, ValueError, ValidationError):
+            child.fail("incorrect_type", data_type=type(item).__name__)
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key related field whose ``many=True`` form validates in bulk"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
@@ -0,0 +1,167 @@
+import heapq
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import (
+    BooleanField,
+    Case,
+    F,
+    FloatField,
+    Func,
+    Value,
+    When,
+)
+
+from core.autocomplete import WORD, normalize
+from core.models import Cuisine, Dish, Ingredient
+
+# Least similarity of a match, the default of pg_trgm's ``%`` operator.
+THRESHOLD = 0.3
+
+# Matches ranked by the in-memory index before the other filters apply,
+# few enough for their ids and scores to stay within SQLite's 999 query
+# parameters.
+MAX_CANDIDATES = 300
+
+
+def trigrams(text):
+    """Return the trigrams of a text the way pg_trgm extracts them"""
+    grams = set()
+    for word in WORD.findall(normalize(text)):
+        padded = "  %s " % word
+        grams.update(map("".join, zip(padded, padded[1:], padded[2:])))
+    return frozenset(grams)
+
+
+class TrigramMatch(Func):
+    """``field % text``, which GIN trigram indexes serve"""
+
+    arg_joiner = " %% "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+class Similarity(Func):
+    function = "SIMILARITY"
+    output_field = FloatField()
+
+
+class TrigramIndex:
+    """In-memory trigram postings of catalog names for fuzzy search
+
+    Stands in for pg_trgm on other databases. A query scores only the
+    names sharing a trigram with it, with the similarity pg_trgm uses:
+    shared trigrams over the trigrams of both. Kept current from model
+    signals and rebuilt after ``AUTOCOMPLETE_INDEX_TTL`` like the
+    autocomplete index.
+    """
+
+    MODELS = {"dish": Dish, "ingredient": Ingredient, "cuisine": Cuisine}
+
+    def __init__(self):
+        self._grams = {}
+        self._postings = {}
+        self._built_at = None
+        self._lock = threading.RLock()
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def build(self):
+        grams = {}
+        postings = {}
+        for model_name, model in self.MODELS.items():
+            grams[model_name] = {}
+            postings[model_name] = defaultdict(set)
+            names = model.objects.values_list("pk", "name")
+            for pk, name in names.iterator():
+                grams[model_name][pk] = trigrams(name)
+                for gram in grams[model_name][pk]:
+                    postings[model_name][gram].add(pk)
+        with self._lock:
+            self._grams = grams
+            self._postings = postings
+            self._built_at = time.monotonic()
+
+    def ensure_built(self):
+        ttl = settings.AUTOCOMPLETE_INDEX_TTL
+        if not self.is_built or time.monotonic() - self._built_at > ttl:
+            self.build()
+
+    def clear(self):
+        with self._lock:
+            self._grams = {}
+            self._postings = {}
+            self._built_at = None
+
+    def put(self, model_name, pk, name):
+        with self._lock:
+            if model_name not in self._grams:
+                return
+            self.discard(model_name, pk)
+            self._grams[model_name][pk] = trigrams(name)
+            for gram in self._grams[model_name][pk]:
+                self._postings[model_name][gram].add(pk)
+
+    def discard(self, model_name, pk):
+        with self._lock:
+            if model_name not in self._grams:
+                return
+            for gram in self._grams[model_name].pop(pk, ()):
+                self._postings[model_name][gram].discard(pk)
+
+    def search(self, model_name, text, limit):
+        """Return up to ``limit`` (id, similarity) pairs, most similar first"""
+        self.ensure_built()
+        query = trigrams(text)
+        with self._lock:
+            grams = self._grams[model_name]
+            postings = self._postings[model_name]
+            shared = Counter()
+            for gram in query:
+                shared.update(postings.get(gram, ()))
+            scores = (
+                (pk, count / (len(query) + len(grams[pk]) - count))
+                for pk, count in shared.items()
+            )
+            return heapq.nsmallest(
+                limit,
+                (entry for entry in scores if entry[1] >= THRESHOLD),
+                key=lambda entry: (-entry[1], entry[0]),
+            )
+
+
+trigram_index = TrigramIndex()
+
+
+def search(queryset, text, limit, field="name"):
+    """Return the objects whose field is most similar to text, ranked
+
+    PostgreSQL matches with pg_trgm's ``%`` operator, which the GIN
+    trigram indexes serve, and ranks by ``similarity()``. Elsewhere the
+    in-memory index ranks the candidates. The top ``limit`` are picked in
+    a subquery rather than by slicing, so the result can still be
+    filtered, e.g. down to one object by ``get_object()``.
+    """
+    text = text.strip()
+    if connections[queryset.db].vendor == "postgresql":
+        queryset = queryset.filter(
+            TrigramMatch(F(field), Value(text))
+        ).annotate(similarity=Similarity(F(field), Value(text)))
+    else:
+        model_name = queryset.model._meta.model_name
+        found = trigram_index.search(model_name, text, MAX_CANDIDATES)
+        queryset = queryset.filter(pk__in=[pk for pk, score in found])
+        queryset = queryset.annotate(
+            similarity=Case(
+                *(When(pk=pk, then=Value(score)) for pk, score in found),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+    ranked = queryset.order_by("-similarity", "pk")
+    return ranked.filter(pk__in=ranked.values("pk")[:limit])
@@ -0,0 +1,123 @@
+import heapq
+import math
+
+from django.db.models import Q
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+PRECISION = 12
+
+# Cells of about 150m searched first for the nearest objects.
+START_PRECISION = 7
+
+# The coarsest cells searched, whose 3x3 block reaches at least ~600km
+# from the point; objects farther than that are never scanned for.
+MIN_PRECISION = 2
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Return the geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (
+            (lng_range, longitude) if even else (lat_range, latitude)
+        )
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Return the (latitude, longitude) size in degrees of a geohash cell"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def cell_block(latitude, longitude, precision):
+    """Return the geohashes of the cell holding a point and its neighbours"""
+    height, width = cell_size(precision)
+    cells = set()
+    for dlat in (-1, 0, 1):
+        lat = latitude + dlat * height
+        if not -90 <= lat <= 90:
+            continue
+        for dlng in (-1, 0, 1):
+            lng = (longitude + dlng * width + 180) % 360 - 180
+            cells.add(encode(lat, lng, precision))
+    return cells
+
+
+def covered_radius(latitude, precision):
+    """Return the km around any point its 3x3 cell block is sure to cover"""
+    height, width = cell_size(precision)
+    shrink = math.cos(math.radians(min(abs(latitude) + height, 90)))
+    return min(height, width * shrink) * KM_PER_DEGREE
+
+
+def distance(lat1, lng1, lat2, lng2):
+    """Return the great-circle distance in km between two points"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def candidates(queryset, latitude, longitude, precision):
+    """Return (distance, id) for the objects in the cells around a point
+
+    Only ids and positions are read, so no object is built for the many
+    candidates that are not returned.
+    """
+    lookup = Q()
+    for cell in cell_block(latitude, longitude, precision):
+        lookup |= Q(geohash__startswith=cell)
+    rows = queryset.filter(lookup).values_list("pk", "latitude", "longitude")
+    return [
+        (distance(latitude, longitude, lat, lng), pk)
+        for pk, lat, lng in rows.iterator()
+    ]
+
+
+def nearby(queryset, latitude, longitude, k, radius=None):
+    """Return up to ``k`` (distance, object) pairs nearest to a point
+
+    Candidates come from a geohash prefix lookup of the 3x3 block of cells
+    around the point, which the ``geohash`` index serves as a few range
+    scans; exact distances are then computed in Python and only the ``k``
+    nearest objects are loaded. The search starts with small cells and
+    moves to coarser ones until ``k`` objects lie within the distance the
+    block surely covers, or that distance reaches ``radius``, stopping at
+    ``MIN_PRECISION``. A radius thus only narrows the search, so a dense
+    area does not read every object within a wide radius to return ``k``.
+    """
+    limit = math.inf if radius is None else radius
+    precision = START_PRECISION
+    while True:
+        found = candidates(queryset, latitude, longitude, precision)
+        reach = min(covered_radius(latitude, precision), limit)
+        within = [entry for entry in found if entry[0] <= reach]
+        if len(within) >= k or reach == limit or precision == MIN_PRECISION:
+            break
+        precision -= 1
+    nearest = heapq.nsmallest(k, within)
+    objects = queryset.in_bulk([pk for _, pk in nearest])
+    return [(dist, objects[pk]) for dist, pk in nearest if pk in objects]
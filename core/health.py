@@ -0,0 +1,33 @@
+from django.db import connections
+from django.db.utils import OperationalError
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+
+from core.warmup import state
+
+
+@never_cache
+def live(request):
+    """Report the worker process is up"""
+    return JsonResponse({"status": "ok"})
+
+
+@never_cache
+def ready(request):
+    """Report the worker is warmed up and can reach the database"""
+    if not state.run():
+        return JsonResponse({"status": "warming up"}, status=503)
+    try:
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except OperationalError:
+        return JsonResponse({"status": "database unavailable"}, status=503)
+    return JsonResponse(
+        {
+            "status": "ok",
+            "warmup": {
+                step: round(seconds, 4)
+                for step, seconds in state.timings.items()
+            },
+        }
+    )
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import changes
+
+
+class Command(BaseCommand):
+    """Django command to compact the catalog change log"""
+
+    help = "Drop superseded change log entries and expired deletes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.CHANGE_LOG_RETENTION_DAYS,
+            help="Days to keep entries for deleted objects",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["retention_days"])
+        removed = changes.compact(before)
+        self.stdout.write(
+            self.style.SUCCESS("Removed %d change log entries" % removed)
+        )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ordering import ordering_terms, plan_sorts
+from api.urls import router
+
+
+class Command(BaseCommand):
+    """Django command to report orderings the database has to sort for"""
+
+    help = "EXPLAIN every declared API ordering and report explicit sorts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Exit with an error if any ordering needs a sort",
+        )
+
+    def handle(self, *args, **options):
+        sorting = []
+        for prefix, viewset, basename in router.registry:
+            queryset = viewset.queryset
+            for name, keys in getattr(viewset, "orderings", {}).items():
+                for descending in (False, True):
+                    terms = ordering_terms(keys, descending)
+                    plan = queryset.order_by(*terms).explain()
+                    sorts = plan_sorts(plan)
+                    label = "%s ?ordering=%s%s" % (
+                        prefix,
+                        "-" if descending else "",
+                        name,
+                    )
+                    if sorts:
+                        sorting.append(label)
+                        self.stdout.write(
+                            self.style.WARNING(
+                                "%s sorts: %s" % (label, "; ".join(sorts))
+                            )
+                        )
+                    elif options["verbosity"] > 1:
+                        self.stdout.write("%s uses an index" % label)
+
+        if sorting and options["fail"]:
+            raise CommandError("%d orderings need a sort" % len(sorting))
+        if not sorting:
+            self.stdout.write(
+                self.style.SUCCESS("All orderings are served by indexes")
+            )
@@ -0,0 +1,94 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from core import changes
+from core.models import CatalogChange, Restaurant
+
+
+def normalize(location):
+    return " ".join(location.casefold().split())
+
+
+def load_places(path):
+    """Read ``location,latitude,longitude`` rows into a lookup table"""
+    places = {}
+    try:
+        with open(path, newline="") as places_file:
+            for row in csv.DictReader(places_file):
+                try:
+                    point = float(row["latitude"]), float(row["longitude"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if -90 <= point[0] <= 90 and -180 <= point[1] <= 180:
+                    places[normalize(row.get("location") or "")] = point
+    except OSError as error:
+        raise CommandError("Cannot read %s: %s" % (path, error))
+    return places
+
+
+class Command(BaseCommand):
+    """Django command to fill in restaurant positions from a lookup file"""
+
+    help = "Geocode restaurants without a position from an offline CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "file",
+            help="CSV file with location, latitude and longitude columns",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of restaurants updated per statement",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches",
+        )
+
+    def handle(self, *args, **options):
+        places = load_places(options["file"])
+        pending = Restaurant.objects.filter(latitude=None).order_by("id")
+        last = 0
+        located = missing = 0
+        while True:
+            batch = pending.filter(id__gt=last).only("id", "location")
+            batch = list(batch[: options["batch_size"]])
+            if not batch:
+                break
+            last = batch[-1].id
+            updated = []
+            for restaurant in batch:
+                point = places.get(normalize(restaurant.location))
+                if point is None:
+                    missing += 1
+                    continue
+                restaurant.latitude, restaurant.longitude = point
+                restaurant.geohash = restaurant.get_geohash()
+                restaurant.version = F("version") + 1
+                updated.append(restaurant)
+            with transaction.atomic():
+                Restaurant.objects.bulk_update(
+                    updated, ("latitude", "longitude", "geohash", "version")
+                )
+                changes.record(
+                    Restaurant,
+                    [restaurant.id for restaurant in updated],
+                    CatalogChange.UPDATE,
+                )
+            located += len(updated)
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Located %d restaurants, %d not found" % (located, missing)
+            )
+        )
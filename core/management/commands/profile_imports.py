@@ -0,0 +1,105 @@
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def parse_importtime(output):
+    """Parse ``python -X importtime`` output into (module, self, cumulative)
+
+    Times are in microseconds. Nested imports are indented in the module
+    column; the indentation is stripped.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.split(":", 1)[1].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        imports.append((module.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+class Command(BaseCommand):
+    """Django command to report per-module import cost of manage.py"""
+
+    help = "Profile module imports of a manage.py command in a fresh process"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "args",
+            nargs="*",
+            metavar="command",
+            help="manage.py command to profile (default: check)",
+        )
+        parser.add_argument(
+            "--wsgi",
+            action="store_true",
+            help="Profile loading the WSGI application instead",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Number of modules and packages to list",
+        )
+        parser.add_argument(
+            "--target",
+            type=float,
+            help="Fail if startup takes longer than this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        if options["wsgi"]:
+            label = settings.WSGI_APPLICATION
+            module = label.rsplit(".", 1)[0]
+            command = ["-c", "import %s" % module]
+        else:
+            label = " ".join(args or ["check"])
+            manage = str(settings.BASE_DIR / "manage.py")
+            command = [manage] + (list(args) or ["check"])
+
+        started = time.monotonic()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime"] + command,
+            cwd=str(settings.BASE_DIR),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        elapsed = time.monotonic() - started
+        if result.returncode:
+            raise CommandError("%s failed:\n%s" % (label, result.stderr))
+
+        imports = parse_importtime(result.stderr)
+        packages = Counter()
+        for module, self_us, cumulative_us in imports:
+            packages[module.split(".")[0]] += self_us
+
+        limit = options["limit"]
+        self.stdout.write("Slowest modules (cumulative ms):")
+        for module, self_us, cumulative_us in sorted(
+            imports, key=lambda item: item[2], reverse=True
+        )[:limit]:
+            self.stdout.write(
+                "  %8.1f  %8.1f  %s"
+                % (cumulative_us / 1000, self_us / 1000, module)
+            )
+        self.stdout.write("Slowest packages (self ms):")
+        for package, self_us in packages.most_common(limit):
+            self.stdout.write("  %8.1f  %s" % (self_us / 1000, package))
+
+        imported = sum(self_us for module, self_us, cumulative_us in imports)
+        self.stdout.write(
+            "%d modules imported in %.1f ms, startup took %.1f ms"
+            % (len(imports), imported / 1000, elapsed * 1000)
+        )
+        target = options["target"]
+        if target is not None and elapsed > target:
+            raise CommandError(
+                "Startup took %.2fs, over the %.2fs target" % (elapsed, target)
+            )
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import ExpiringToken
+
+
+class Command(BaseCommand):
+    """Django command to delete expired authentication tokens in batches"""
+
+    help = "Delete expired authentication tokens in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of tokens deleted per statement",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        pause = options["pause"]
+        now = timezone.now()
+        total = 0
+        while True:
+            keys = list(
+                ExpiringToken.objects.expired(now).values_list(
+                    "pk", flat=True
+                )[:batch_size]
+            )
+            if not keys:
+                break
+            deleted, _ = ExpiringToken.objects.filter(pk__in=keys).delete()
+            total += deleted
+            if pause:
+                time.sleep(pause)
+
+        self.stdout.write(
+            self.style.SUCCESS("Deleted %d expired tokens" % total)
+        )
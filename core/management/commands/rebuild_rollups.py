@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core import rollups
+from core.models import CuisineRollup, IngredientRollup, RestaurantRollup
+
+
+class Command(BaseCommand):
+    """Django command to recompute the catalog analytics rollups"""
+
+    help = "Recompute the catalog analytics rollups from scratch"
+
+    def handle(self, *args, **options):
+        rollups.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Rebuilt rollups for %d cuisines, %d restaurants and "
+                "%d ingredients"
+                % (
+                    CuisineRollup.objects.count(),
+                    RestaurantRollup.objects.count(),
+                    IngredientRollup.objects.count(),
+                )
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core import deletion
+
+
+class Command(BaseCommand):
+    """Django command to finish background deletions"""
+
+    help = "Resume deletions abandoned, e.g. by a worker restart"
+
+    def handle(self, *args, **options):
+        for job in deletion.abandoned().order_by("pk"):
+            if not deletion.claim(job):
+                continue
+            self.stdout.write("Running %s" % job)
+            deletion.run(job)
+        self.stdout.write(self.style.SUCCESS("Deletions finished"))
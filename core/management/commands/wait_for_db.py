@@ -1,6 +1,7 @@
+import random
 import time
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connections
 from django.db.utils import OperationalError
 
@@ -8,16 +9,73 @@ from django.db.utils import OperationalError
 class Command(BaseCommand):
     """Django command to pause execution until database is available"""
 
+    help = "Wait until every database accepts connections and queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            action="append",
+            dest="databases",
+            help="Database alias to wait for, may be repeated "
+            "(default: every configured database)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds to wait in total before giving up",
+        )
+        parser.add_argument(
+            "--initial-delay",
+            type=float,
+            default=0.1,
+            help="Upper bound of the first backoff sleep in seconds",
+        )
+        parser.add_argument(
+            "--max-delay",
+            type=float,
+            default=5,
+            help="Largest backoff sleep in seconds",
+        )
+
     def handle(self, *args, **options):
-        self.stdout.write("Waiting for Database...")
-        db_conn = None
-        while not db_conn:
+        aliases = options["databases"] or list(connections)
+        deadline = time.monotonic() + options["timeout"]
+        started = time.monotonic()
+        for alias in aliases:
+            self.stdout.write("Waiting for Database %s..." % alias)
+            self.wait_for(alias, deadline, options)
+            self.stdout.write(
+                "Database %s ready after %.2fs"
+                % (alias, time.monotonic() - started)
+            )
+
+        self.stdout.write(self.style.SUCCESS("Database available!"))
+
+    def wait_for(self, alias, deadline, options):
+        """Retry the check with exponential backoff and full jitter"""
+        maximum = options["max_delay"]
+        ceiling = min(maximum, options["initial_delay"])
+        while True:
             try:
-                db_conn = connections["default"]
-            except OperationalError:
+                self.check_connection(alias)
+                return
+            except OperationalError as e:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        "Database %s unavailable: %s" % (alias, e)
+                    )
+                delay = min(random.uniform(0, ceiling), remaining)
                 self.stdout.write(
-                    "Database unavailable, " "waiting for 1 second..."
+                    "Database %s unavailable, waiting %.2f seconds..."
+                    % (alias, delay)
                 )
-                time.sleep(1)
+                time.sleep(delay)
+                ceiling = min(maximum, ceiling * 2)
 
-        self.stdout.write(self.style.SUCCESS("Database available!"))
+    def check_connection(self, alias):
+        """Open a connection and run a trivial query on it"""
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
@@ -0,0 +1,36 @@
+# Generated by Django 3.1.14 on 2026-10-19 09:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_auto_20210218_0502"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExpiringToken",
+            fields=[
+                (
+                    "key",
+                    models.CharField(
+                        max_length=40, primary_key=True, serialize=False
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("expires", models.DateTimeField(db_index=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="auth_tokens",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
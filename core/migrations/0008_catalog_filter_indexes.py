@@ -0,0 +1,38 @@
+# Generated by Django 3.1.14 on 2026-10-19 09:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_expiringtoken"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["cuisine", "price", "id"],
+                name="core_dish_cuisine_c681f4_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["price", "id"], name="core_dish_price_16e7a7_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["serves", "id"], name="core_dish_serves_239bc6_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ingredient",
+            index=models.Index(
+                fields=["price", "id"], name="core_ingred_price_d8395d_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.1.14 on 2026-10-19 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_catalog_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cuisine",
+            index=models.Index(
+                fields=["name", "id"], name="core_cuisin_name_6e71de_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["name", "id"], name="core_dish_name_055689_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ingredient",
+            index=models.Index(
+                fields=["name", "id"], name="core_ingred_name_35bfe8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menu",
+            index=models.Index(
+                fields=["restaurant", "id"],
+                name="core_menu_restaur_0749a3_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="restaurant",
+            index=models.Index(
+                fields=["name", "id"], name="core_restau_name_0ed223_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="restaurant",
+            index=models.Index(
+                fields=["established", "id"],
+                name="core_restau_establi_8064c0_idx",
+            ),
+        ),
+    ]
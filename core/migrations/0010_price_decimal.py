@@ -0,0 +1,145 @@
+# Generated by Django 3.1.14 on 2026-10-19 09:39
+
+from django.db import migrations, models, transaction
+from django.db.models import Max, Min
+from django.db.models.functions import Cast
+
+BATCH_SIZE = 5000
+
+TABLES = ("core_ingredient", "core_dish")
+
+# The (price, id) indexes built ahead of the swap in 0011, by table.
+INDEXES = {
+    "core_ingredient": {"core_ingredient_price_swap": "price_decimal, id"},
+    "core_dish": {
+        "core_dish_price_swap": "price_decimal, id",
+        "core_dish_cuisine_price_swap": "cuisine_id, price_decimal, id",
+    },
+}
+
+
+def add_price_sync(apps, schema_editor):
+    """Keep the decimal column in step with every write of the float one
+
+    Until 0011 swaps the columns, running code keeps writing ``price``. A
+    trigger copies each write into ``price_decimal`` so no update made
+    after its row was copied is lost. Other databases are re-synced by
+    0011 instead.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE OR REPLACE FUNCTION core_sync_price_decimal() "
+        "RETURNS trigger AS $$ BEGIN "
+        "NEW.price_decimal := NEW.price; RETURN NEW; "
+        "END $$ LANGUAGE plpgsql"
+    )
+    for table in TABLES:
+        schema_editor.execute(
+            "CREATE TRIGGER %s_sync_price_decimal "
+            "BEFORE INSERT OR UPDATE OF price ON %s "
+            "FOR EACH ROW EXECUTE PROCEDURE core_sync_price_decimal()"
+            % (table, table)
+        )
+
+
+def drop_price_sync(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            "DROP TRIGGER IF EXISTS %s_sync_price_decimal ON %s"
+            % (table, table)
+        )
+    schema_editor.execute("DROP FUNCTION IF EXISTS core_sync_price_decimal()")
+
+
+def copy_prices(apps, schema_editor):
+    """Copy float prices into the decimal column in primary key batches
+
+    Each batch is a single UPDATE committed on its own, so only a few
+    thousand rows are locked at a time on large tables.
+    """
+    db = schema_editor.connection.alias
+    for name in ("Ingredient", "Dish"):
+        model = apps.get_model("core", name)
+        bounds = model.objects.using(db).aggregate(
+            low=Min("id"), high=Max("id")
+        )
+        if bounds["low"] is None:
+            continue
+        decimal = models.DecimalField(max_digits=10, decimal_places=2)
+        for start in range(bounds["low"], bounds["high"] + 1, BATCH_SIZE):
+            with transaction.atomic(using=db):
+                model.objects.using(db).filter(
+                    id__gte=start,
+                    id__lt=start + BATCH_SIZE,
+                    price_decimal__isnull=True,
+                ).update(price_decimal=Cast("price", decimal))
+
+
+def prepare_swap(apps, schema_editor):
+    """Do the slow parts of 0011 without blocking writes
+
+    The price indexes are built on the decimal column CONCURRENTLY, and a
+    validated ``IS NOT NULL`` check lets 0011 set NOT NULL without
+    scanning the table. Only PostgreSQL can do either; other databases
+    build the indexes in 0011.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            "ALTER TABLE %s ADD CONSTRAINT %s_price_decimal_not_null "
+            "CHECK (price_decimal IS NOT NULL) NOT VALID" % (table, table)
+        )
+        schema_editor.execute(
+            "ALTER TABLE %s VALIDATE CONSTRAINT %s_price_decimal_not_null"
+            % (table, table)
+        )
+        for name, columns in INDEXES[table].items():
+            schema_editor.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS %s ON %s (%s)"
+                % (name, table, columns)
+            )
+
+
+def undo_prepare_swap(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        for name in INDEXES[table]:
+            schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS " + name)
+        schema_editor.execute(
+            "ALTER TABLE %s DROP CONSTRAINT IF EXISTS "
+            "%s_price_decimal_not_null" % (table, table)
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("core", "0009_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dish",
+            name="price_decimal",
+            field=models.DecimalField(
+                decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="price_decimal",
+            field=models.DecimalField(
+                decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.RunPython(add_price_sync, drop_price_sync),
+        migrations.RunPython(copy_prices, migrations.RunPython.noop),
+        migrations.RunPython(prepare_swap, undo_prepare_swap),
+    ]
@@ -0,0 +1,152 @@
+# Generated by Django 3.1.14 on 2026-10-19 09:41
+
+from django.db import migrations, models
+from django.db.models import Q
+from django.db.models.functions import Cast
+
+TABLES = ("core_ingredient", "core_dish")
+
+# The indexes 0010 built concurrently and their names once swapped in.
+INDEXES = {
+    "core_ingredient_price_swap": "core_ingred_price_d8395d_idx",
+    "core_dish_price_swap": "core_dish_price_16e7a7_idx",
+    "core_dish_cuisine_price_swap": "core_dish_cuisine_c681f4_idx",
+}
+
+PRICE_INDEXES = (
+    ("Ingredient", ["price", "id"], "core_ingred_price_d8395d_idx"),
+    ("Dish", ["price", "id"], "core_dish_price_16e7a7_idx"),
+    ("Dish", ["cuisine", "price", "id"], "core_dish_cuisine_c681f4_idx"),
+)
+
+
+def finish_copy(apps, schema_editor):
+    """Stop syncing prices, or copy those changed since the batched copy
+
+    On PostgreSQL the trigger 0010 added kept both columns equal. Other
+    databases re-copy every row whose decimal price is missing or differs
+    from the float one.
+    """
+    if schema_editor.connection.vendor == "postgresql":
+        for table in TABLES:
+            schema_editor.execute(
+                "DROP TRIGGER %s_sync_price_decimal ON %s" % (table, table)
+            )
+        schema_editor.execute("DROP FUNCTION core_sync_price_decimal()")
+        return
+    db = schema_editor.connection.alias
+    decimal = models.DecimalField(max_digits=10, decimal_places=2)
+    for name in ("Ingredient", "Dish"):
+        model = apps.get_model("core", name)
+        copied = Cast("price", decimal)
+        model.objects.using(db).filter(
+            Q(price_decimal__isnull=True) | ~Q(price_decimal=copied)
+        ).update(price_decimal=copied)
+
+
+def drop_not_null_checks(apps, schema_editor):
+    """Drop the checks which let SET NOT NULL skip its table scan"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            "ALTER TABLE %s DROP CONSTRAINT %s_price_decimal_not_null"
+            % (table, table)
+        )
+
+
+def add_price_indexes(apps, schema_editor):
+    """Rename the indexes 0010 built, or build them on other databases"""
+    if schema_editor.connection.vendor == "postgresql":
+        for old_name, new_name in INDEXES.items():
+            schema_editor.execute(
+                "ALTER INDEX %s RENAME TO %s" % (old_name, new_name)
+            )
+        return
+    for name, fields, index_name in PRICE_INDEXES:
+        model = apps.get_model("core", name)
+        schema_editor.add_index(
+            model, models.Index(fields=fields, name=index_name)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_price_decimal"),
+    ]
+
+    operations = [
+        migrations.RunPython(finish_copy, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="dish",
+            name="core_dish_cuisine_c681f4_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="dish",
+            name="core_dish_price_16e7a7_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ingredient",
+            name="core_ingred_price_d8395d_idx",
+        ),
+        migrations.RemoveField(
+            model_name="dish",
+            name="price",
+        ),
+        migrations.RemoveField(
+            model_name="ingredient",
+            name="price",
+        ),
+        migrations.RenameField(
+            model_name="dish",
+            old_name="price_decimal",
+            new_name="price",
+        ),
+        migrations.RenameField(
+            model_name="ingredient",
+            old_name="price_decimal",
+            new_name="price",
+        ),
+        migrations.AlterField(
+            model_name="dish",
+            name="price",
+            field=models.DecimalField(decimal_places=2, max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name="ingredient",
+            name="price",
+            field=models.DecimalField(decimal_places=2, max_digits=10),
+        ),
+        migrations.RunPython(drop_not_null_checks, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    add_price_indexes, migrations.RunPython.noop
+                ),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="dish",
+                    index=models.Index(
+                        fields=["cuisine", "price", "id"],
+                        name="core_dish_cuisine_c681f4_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="dish",
+                    index=models.Index(
+                        fields=["price", "id"],
+                        name="core_dish_price_16e7a7_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="ingredient",
+                    index=models.Index(
+                        fields=["price", "id"],
+                        name="core_ingred_price_d8395d_idx",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 3.1.14 on 2026-10-19 09:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_price_decimal_swap"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CuisineRollup",
+            fields=[
+                (
+                    "cuisine",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="core.cuisine",
+                    ),
+                ),
+                ("dish_count", models.IntegerField(default=0)),
+                (
+                    "price_total",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="IngredientRollup",
+            fields=[
+                (
+                    "ingredient",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="core.ingredient",
+                    ),
+                ),
+                ("dish_count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RestaurantRollup",
+            fields=[
+                (
+                    "restaurant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="core.restaurant",
+                    ),
+                ),
+                ("dish_count", models.IntegerField(default=0)),
+                (
+                    "price_total",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.1.14 on 2026-10-19 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_change_log"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cuisine",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="dish",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="menu",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
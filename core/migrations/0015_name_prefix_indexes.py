@@ -0,0 +1,41 @@
+from django.db import migrations
+
+TABLES = ("core_ingredient", "core_cuisine", "core_dish", "core_restaurant")
+
+
+def create_indexes(apps, schema_editor):
+    """Index UPPER(name) for the admin's case-insensitive prefix search
+
+    Django runs ``istartswith`` as ``UPPER(name::text) LIKE UPPER(%s)``,
+    which only an expression index with ``text_pattern_ops`` can serve.
+    Other databases have no equivalent and keep scanning.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS %s_name_upper_like "
+            'ON %s (UPPER("name"::text) text_pattern_ops)' % (table, table)
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            "DROP INDEX CONCURRENTLY IF EXISTS %s_name_upper_like" % table
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("core", "0014_versions"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.1.14 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0017_deletions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dish",
+            name="diet",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="dairy_free",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="gluten_free",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="nut_free",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="vegan",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="vegetarian",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["diet", "id"], name="core_dish_diet_a2b84a_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+TABLES = ("core_ingredient", "core_cuisine", "core_dish")
+
+
+def create_indexes(apps, schema_editor):
+    """Index names by trigram for fuzzy search
+
+    The GIN ``gin_trgm_ops`` indexes serve pg_trgm's ``%`` similarity
+    operator. Other databases use the in-memory index in ``core.fuzzy``.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table in TABLES:
+        schema_editor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS %s_name_trgm "
+            'ON %s USING gin ("name" gin_trgm_ops)' % (table, table)
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            "DROP INDEX CONCURRENTLY IF EXISTS %s_name_trgm" % table
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("core", "0018_dietary_flags"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
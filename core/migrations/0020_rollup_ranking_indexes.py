@@ -0,0 +1,67 @@
+# Generated by Django 3.1.14 on 2026-10-19 10:43
+
+from django.db import migrations, models
+
+INDEXES = (
+    (
+        "cuisinerollup",
+        models.Index(
+            fields=["-dish_count", "cuisine"],
+            name="core_cuisin_dish_co_70a115_idx",
+        ),
+    ),
+    (
+        "ingredientrollup",
+        models.Index(
+            fields=["-dish_count", "ingredient"],
+            name="core_ingred_dish_co_6055d1_idx",
+        ),
+    ),
+    (
+        "restaurantrollup",
+        models.Index(
+            fields=["-dish_count", "restaurant"],
+            name="core_restau_dish_co_90b186_idx",
+        ),
+    ),
+)
+
+
+def options(schema_editor):
+    """Build and drop the indexes CONCURRENTLY where the database can"""
+    if schema_editor.connection.vendor == "postgresql":
+        return {"concurrently": True}
+    return {}
+
+
+def create_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        model = apps.get_model("core", model_name)
+        schema_editor.add_index(model, index, **options(schema_editor))
+
+
+def drop_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        model = apps.get_model("core", model_name)
+        schema_editor.remove_index(model, index, **options(schema_editor))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("core", "0019_name_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in INDEXES
+            ],
+        ),
+    ]
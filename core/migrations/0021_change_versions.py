@@ -0,0 +1,55 @@
+# Generated by Django 3.1.14 on 2026-10-19 11:01
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def number_entries(apps, schema_editor):
+    """Give the entries logged so far their ids as versions"""
+    CatalogChange = apps.get_model("core", "CatalogChange")
+    ChangeSequence = apps.get_model("core", "ChangeSequence")
+    CatalogChange.objects.update(version=F("id"))
+    last = CatalogChange.objects.aggregate(last=Max("id"))["last"]
+    ChangeSequence.objects.create(pk=1, last=last or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0020_rollup_ranking_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeSequence",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="catalogchange",
+            name="core_catalo_model_0e95e3_idx",
+        ),
+        migrations.AddField(
+            model_name="catalogchange",
+            name="version",
+            field=models.BigIntegerField(null=True, unique=True),
+        ),
+        migrations.RunPython(number_entries, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="catalogchange",
+            index=models.Index(
+                fields=["model", "object_id", "version"],
+                name="core_catalo_model_94af53_idx",
+            ),
+        ),
+    ]
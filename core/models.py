@@ -1,11 +1,18 @@
+import binascii
+import os
+
+from django.conf import settings
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils import timezone
 
+from core import geo
+
 
 class UserManager(BaseUserManager):
     """Handles creating and updating user"""
@@ -41,11 +48,72 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
 
 
+class ExpiringTokenManager(models.Manager):
+    """Handles issuing and pruning expiring tokens"""
+
+    def issue(self, user):
+        """Return a live token for the user, creating one if needed"""
+        now = timezone.now()
+        live = self.filter(user=user, expires__gt=now)
+        token = live.order_by("-expires").first()
+        if token is None:
+            token = self.create(user=user, expires=now + settings.TOKEN_TTL)
+        return token
+
+    def expired(self, now=None):
+        """Return tokens whose expiry is in the past"""
+        return self.filter(expires__lte=now or timezone.now())
+
+
+class ExpiringToken(models.Model):
+    """Stores an API token which expires after a period of inactivity"""
+
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(
+        User, related_name="auth_tokens", on_delete=models.CASCADE,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    expires = models.DateTimeField(db_index=True)
+
+    objects = ExpiringTokenManager()
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = binascii.hexlify(os.urandom(20)).decode()
+        return super().save(*args, **kwargs)
+
+    def is_expired(self, now=None):
+        """Check if the token has passed its expiry"""
+        return self.expires <= (now or timezone.now())
+
+    def touch(self, now=None):
+        """Slide the expiry forward once half of the lifetime is used up
+
+        Writing on every request would turn each authenticated read into
+        an UPDATE, so the expiry is only pushed forward when it gets close.
+        """
+        now = now or timezone.now()
+        if self.expires - now > settings.TOKEN_TTL / 2:
+            return False
+        self.expires = now + settings.TOKEN_TTL
+        type(self).objects.filter(pk=self.pk).update(expires=self.expires)
+        return True
+
+    def __str__(self):
+        return self.key
+
+
 class Ingredient(models.Model):
     """Stores ingredient name and price"""
 
     name = models.CharField(max_length=255)
-    price = models.FloatField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    vegetarian = models.BooleanField(default=False)
+    vegan = models.BooleanField(default=False)
+    gluten_free = models.BooleanField(default=False)
+    nut_free = models.BooleanField(default=False)
+    dairy_free = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=1)
 
     def __str__(self):
         return self.name
@@ -53,6 +121,12 @@ class Ingredient(models.Model):
     def __repr__(self):
         return self.__str__
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name", "id"]),
+            models.Index(fields=["price", "id"]),
+        ]
+
 
 class Cuisine(models.Model):
     """Stores cuisine name, popular ingredients, place of origin"""
@@ -60,6 +134,7 @@ class Cuisine(models.Model):
     popular_ingredients = models.ManyToManyField(Ingredient)
     name = models.CharField(max_length=255)
     origin = models.CharField(max_length=255)
+    version = models.PositiveIntegerField(default=1)
 
     def __str__(self):
         return self.name
@@ -67,15 +142,21 @@ class Cuisine(models.Model):
     def __repr__(self):
         return self.__str__
 
+    class Meta:
+        indexes = [models.Index(fields=["name", "id"])]
+
 
 class Dish(models.Model):
     """Stores dish name, ingredients used, price, people served and cuisine"""
 
     ingredients = models.ManyToManyField(Ingredient)
     name = models.CharField(max_length=255)
-    price = models.FloatField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
     serves = models.IntegerField(default=1)
     cuisine = models.ForeignKey(Cuisine, on_delete=models.CASCADE, null=True,)
+    # Bits of the dietary flags shared by all of the dish's ingredients.
+    diet = models.PositiveSmallIntegerField(default=0, editable=False)
+    version = models.PositiveIntegerField(default=1)
 
     def __str__(self):
         return self.name
@@ -85,6 +166,13 @@ class Dish(models.Model):
 
     class Meta:
         verbose_name_plural = "Dishes"
+        indexes = [
+            models.Index(fields=["cuisine", "price", "id"]),
+            models.Index(fields=["name", "id"]),
+            models.Index(fields=["price", "id"]),
+            models.Index(fields=["serves", "id"]),
+            models.Index(fields=["diet", "id"]),
+        ]
 
 
 class Restaurant(models.Model):
@@ -97,6 +185,35 @@ class Restaurant(models.Model):
     email = models.EmailField()
     contact_number = models.CharField(max_length=255)
     website = models.URLField()
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    geohash = models.CharField(
+        max_length=12, null=True, blank=True, editable=False, db_index=True
+    )
+    version = models.PositiveIntegerField(default=1)
+
+    def save(self, *args, **kwargs):
+        self.geohash = self.get_geohash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and (
+            "latitude" in update_fields or "longitude" in update_fields
+        ):
+            kwargs["update_fields"] = set(update_fields) | {"geohash"}
+        return super().save(*args, **kwargs)
+
+    def get_geohash(self):
+        """Return the geohash indexing the restaurant's position"""
+        if self.latitude is None or self.longitude is None:
+            return None
+        return geo.encode(self.latitude, self.longitude)
 
     def __str__(self):
         return self.name
@@ -104,6 +221,12 @@ class Restaurant(models.Model):
     def __repr__(self):
         return self.__str__
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name", "id"]),
+            models.Index(fields=["established", "id"]),
+        ]
+
 
 class Menu(models.Model):
     """Stores the dishes, cuisines"""
@@ -113,9 +236,125 @@ class Menu(models.Model):
     restaurant = models.ForeignKey(
         Restaurant, on_delete=models.CASCADE, null=True,
     )
+    version = models.PositiveIntegerField(default=1)
 
     def __str__(self):
-        return self.restaurant
+        return "Menu %s of %s" % (self.pk, self.restaurant)
 
     def __repr__(self):
         return self.__str__
+
+    class Meta:
+        indexes = [models.Index(fields=["restaurant", "id"])]
+
+
+class CuisineRollup(models.Model):
+    """Stores the precomputed number and total price of dishes in a cuisine"""
+
+    cuisine = models.OneToOneField(
+        Cuisine, on_delete=models.CASCADE, primary_key=True,
+    )
+    dish_count = models.IntegerField(default=0)
+    price_total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["-dish_count", "cuisine"])]
+
+
+class RestaurantRollup(models.Model):
+    """Stores the precomputed number and total price of menu listings"""
+
+    restaurant = models.OneToOneField(
+        Restaurant, on_delete=models.CASCADE, primary_key=True,
+    )
+    dish_count = models.IntegerField(default=0)
+    price_total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["-dish_count", "restaurant"])]
+
+
+class IngredientRollup(models.Model):
+    """Stores the precomputed number of dishes using an ingredient"""
+
+    ingredient = models.OneToOneField(
+        Ingredient, on_delete=models.CASCADE, primary_key=True,
+    )
+    dish_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["-dish_count", "ingredient"])]
+
+
+class CatalogChange(models.Model):
+    """Stores one entry of the catalog change log
+
+    ``version`` is assigned once the entry is committed, in commit order,
+    so clients reading up to a version never miss one committed later.
+    """
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    TRUNCATE = "truncate"
+    OPERATIONS = (
+        (CREATE, "Create"),
+        (UPDATE, "Update"),
+        (DELETE, "Delete"),
+        (TRUNCATE, "Truncate"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    operation = models.CharField(max_length=8, choices=OPERATIONS)
+    created = models.DateTimeField(auto_now_add=True)
+    version = models.BigIntegerField(null=True, unique=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["model", "object_id", "version"])]
+
+
+class ChangeSequence(models.Model):
+    """Stores the last version assigned to change log entries
+
+    Its single row is locked while versions are assigned.
+    """
+
+    last = models.BigIntegerField(default=0)
+
+
+class Deletion(models.Model):
+    """Stores the progress of deleting a restaurant or cuisine in chunks"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    status = models.CharField(
+        max_length=8, choices=STATUSES, default=PENDING
+    )
+    total = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return "Deletion of %s %s" % (self.model, self.object_id)
+
+    class Meta:
+        indexes = [models.Index(fields=["model", "object_id", "status"])]
@@ -0,0 +1,133 @@
+import heapq
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from core.models import Dish
+
+METRICS = ("jaccard", "cosine")
+
+
+class DishIngredientIndex:
+    """Sparse dish x ingredient matrix kept in memory for recommendations
+
+    The matrix is held both by row (dish -> ingredient ids) and by column
+    (ingredient -> dish ids). Scoring a query walks only the columns of the
+    query's ingredients, so the cost depends on how many dishes share an
+    ingredient with it rather than on the size of the catalog. The index is
+    built lazily from the through table in one query, kept up to date from
+    ``m2m_changed`` signals in this process and rebuilt once it is older
+    than ``RECOMMENDATION_INDEX_TTL`` to pick up other workers' writes.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._columns = defaultdict(set)
+        self._built_at = None
+        self._lock = threading.RLock()
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def build(self):
+        """Load the whole matrix from the dish/ingredient through table"""
+        rows = defaultdict(set)
+        columns = defaultdict(set)
+        links = Dish.ingredients.through.objects.values_list(
+            "dish_id", "ingredient_id"
+        )
+        for dish_id, ingredient_id in links.iterator(chunk_size=10000):
+            rows[dish_id].add(ingredient_id)
+            columns[ingredient_id].add(dish_id)
+        with self._lock:
+            self._rows = dict(rows)
+            self._columns = columns
+            self._built_at = time.monotonic()
+
+    def ensure_built(self):
+        ttl = settings.RECOMMENDATION_INDEX_TTL
+        if not self.is_built or time.monotonic() - self._built_at > ttl:
+            self.build()
+
+    def clear(self):
+        with self._lock:
+            self._rows = {}
+            self._columns = defaultdict(set)
+            self._built_at = None
+
+    def add(self, dish_id, ingredient_ids):
+        """Link ingredients to a dish"""
+        with self._lock:
+            row = self._rows.setdefault(dish_id, set())
+            for ingredient_id in ingredient_ids:
+                row.add(ingredient_id)
+                self._columns[ingredient_id].add(dish_id)
+
+    def discard(self, dish_id, ingredient_ids=None):
+        """Unlink ingredients, or every ingredient, from a dish"""
+        with self._lock:
+            row = self._rows.get(dish_id, set())
+            if ingredient_ids is None:
+                ingredient_ids = set(row)
+            for ingredient_id in ingredient_ids:
+                row.discard(ingredient_id)
+                self._columns.get(ingredient_id, set()).discard(dish_id)
+            if not row:
+                self._rows.pop(dish_id, None)
+
+    def dishes_with(self, ingredient_id):
+        """Return the ids of dishes using an ingredient"""
+        with self._lock:
+            return set(self._columns.get(ingredient_id, ()))
+
+    def similar(self, dish_id, k=10, metric="jaccard"):
+        """Return the top ``k`` (dish id, score) pairs most like a dish"""
+        self.ensure_built()
+        with self._lock:
+            row = self._rows.get(dish_id, set())
+            overlaps = self._overlaps(row)
+            overlaps.pop(dish_id, None)
+            size = len(row)
+            if metric == "cosine":
+                scores = (
+                    (other, count / math.sqrt(size * len(self._rows[other])))
+                    for other, count in overlaps.items()
+                )
+            else:
+                scores = (
+                    (other, count / (size + len(self._rows[other]) - count))
+                    for other, count in overlaps.items()
+                )
+            return self._top(scores, k)
+
+    def makeable(self, ingredient_ids, k=10):
+        """Return the top ``k`` dishes covered best by the ingredients
+
+        The score is the share of the dish's ingredients that were given,
+        so 1.0 means the dish can be made with nothing else.
+        """
+        self.ensure_built()
+        with self._lock:
+            overlaps = self._overlaps(set(ingredient_ids))
+            scores = (
+                (dish_id, count / len(self._rows[dish_id]))
+                for dish_id, count in overlaps.items()
+            )
+            return self._top(scores, k)
+
+    def _overlaps(self, ingredient_ids):
+        overlaps = Counter()
+        for ingredient_id in ingredient_ids:
+            overlaps.update(self._columns.get(ingredient_id, ()))
+        return overlaps
+
+    @staticmethod
+    def _top(scores, k):
+        return heapq.nlargest(k, scores, key=lambda item: (item[1], -item[0]))
+
+
+dish_index = DishIngredientIndex()
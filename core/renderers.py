@@ -0,0 +1,35 @@
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.settings import api_settings
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders responses as MessagePack for internal clients
+
+    Selected with ``Accept: application/msgpack`` or ``?format=msgpack``.
+    Values MessagePack has no type for are encoded by the JSON renderer's
+    encoder, so both formats give the same values: e.g. datetimes as ISO
+    8601 strings and decimals as floats.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=self.encode, use_bin_type=True)
+
+    encode = staticmethod(JSONEncoder().default)
+
+
+CATALOG_RENDERER_CLASSES = tuple(api_settings.DEFAULT_RENDERER_CLASSES)
+if msgpack is not None:
+    CATALOG_RENDERER_CLASSES += (MessagePackRenderer,)
@@ -0,0 +1,152 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+CACHE_KEY = "auth:revoked"
+
+# Slots read from the cache per request while syncing.
+SYNC_BATCH = 500
+
+
+def fingerprint(key):
+    """Return a short, non-reversible identifier for a token key"""
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def get_cache():
+    return caches[settings.TOKEN_REVOCATION_CACHE]
+
+
+class RevocationList:
+    """Process-local set of revoked token fingerprints, synced through cache
+
+    Checking a token costs a set lookup in the worker. The shared copy is a
+    log in ``TOKEN_REVOCATION_CACHE``: each revocation claims the next slot
+    with an atomic increment of a counter and is stored under its own key,
+    so revocations made at once by different workers are all kept. Workers
+    poll the counter at most once per ``TOKEN_REVOCATION_SYNC_INTERVAL``
+    seconds and read only the slots added since. Slots expire ``TOKEN_TTL``
+    after they are written, once the token they refer to would have
+    expired anyway, so a starting worker reads only the live ones.
+    """
+
+    def __init__(self, cache_key=CACHE_KEY):
+        self.cache_key = cache_key
+        self.version_key = "%s:version" % cache_key
+        self._entries = {}
+        self._version = None
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    def slot_key(self, slot):
+        return "%s:%d" % (self.cache_key, slot)
+
+    def revoke(self, key, expires):
+        """Revoke a token key until the given expiry datetime"""
+        digest = fingerprint(key)
+        expires_at = expires.timestamp()
+        timeout = max(
+            settings.TOKEN_TTL.total_seconds(), expires_at - time.time()
+        )
+        with self._lock:
+            self._entries[digest] = expires_at
+            slot = self._claim_slot()
+            get_cache().set(self.slot_key(slot), (digest, expires_at), timeout)
+
+    def is_revoked(self, key):
+        """Check if a token key has been revoked by any worker"""
+        return fingerprint(key) in self
+
+    def __contains__(self, digest):
+        self.sync()
+        expires_at = self._entries.get(digest)
+        return expires_at is not None and expires_at > time.time()
+
+    def sync(self, force=False):
+        """Read the revocations other workers added since the last sync"""
+        now = time.monotonic()
+        interval = settings.TOKEN_REVOCATION_SYNC_INTERVAL
+        if (
+            not force
+            and self._synced_at is not None
+            and now - self._synced_at < interval
+        ):
+            return
+        with self._lock:
+            version = get_cache().get(self.version_key) or 0
+            if force or self._version is None or version < self._version:
+                # Starting over, or the counter was lost from the cache.
+                entries = {}
+                first = self._first_live(version)
+            else:
+                entries = self._entries
+                first = self._version + 1
+            entries.update(self._read(first, version))
+            self._entries = self._prune(entries)
+            self._version = version
+            self._synced_at = now
+
+    def clear(self):
+        """Forget all revocations, locally and in the cache"""
+        with self._lock:
+            cache = get_cache()
+            version = cache.get(self.version_key) or 0
+            cache.delete_many(
+                [self.version_key]
+                + [self.slot_key(slot) for slot in range(1, version + 1)]
+            )
+            self._entries = {}
+            self._version = None
+            self._synced_at = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _claim_slot(self):
+        cache = get_cache()
+        try:
+            return cache.incr(self.version_key)
+        except ValueError:
+            cache.add(self.version_key, 0, None)
+            return cache.incr(self.version_key)
+
+    def _first_live(self, version):
+        """Return the first slot up to version not expired yet
+
+        Slots all live for ``TOKEN_TTL``, so they expire in the order they
+        were written and the live ones follow the expired ones.
+        """
+        cache = get_cache()
+        low, high = 1, version + 1
+        while low < high:
+            middle = (low + high) // 2
+            if cache.get(self.slot_key(middle)) is None:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _read(self, first, last):
+        """Return the revocations stored in slots first to last"""
+        cache = get_cache()
+        entries = {}
+        for start in range(first, last + 1, SYNC_BATCH):
+            slots = range(start, min(start + SYNC_BATCH, last + 1))
+            found = cache.get_many([self.slot_key(slot) for slot in slots])
+            entries.update(found.values())
+        return entries
+
+    @staticmethod
+    def _prune(entries):
+        now = time.time()
+        return {
+            digest: expires_at
+            for digest, expires_at in entries.items()
+            if expires_at > now
+        }
+
+
+revoked_tokens = RevocationList()
@@ -0,0 +1,263 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from core.models import (
+    CuisineRollup,
+    Dish,
+    IngredientRollup,
+    Menu,
+    RestaurantRollup,
+)
+
+DishIngredient = Dish.ingredients.through
+MenuDish = Menu.dishes.through
+
+CENT = Decimal("0.01")
+
+
+def bump(model, key, create=True, **deltas):
+    """Add deltas to the rollup row of ``key`` with a single UPDATE
+
+    Rows are created on the first increment. Decrements never create a
+    row, so a rollup whose parent is being deleted is left alone.
+    """
+    if key is None or not any(deltas.values()):
+        return
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(pk=key).update(**updates) or not create:
+        return
+    model.objects.get_or_create(pk=key)
+    model.objects.filter(pk=key).update(**updates)
+
+
+def listings(dish_ids=None, menu_ids=None, restaurant_ids=None):
+    """Return (restaurant id, listings, price total) for menu entries"""
+    entries = MenuDish.objects.filter(menu__restaurant__isnull=False)
+    if dish_ids is not None:
+        entries = entries.filter(dish_id__in=dish_ids)
+    if menu_ids is not None:
+        entries = entries.filter(menu_id__in=menu_ids)
+    if restaurant_ids is not None:
+        entries = entries.filter(menu__restaurant__in=restaurant_ids)
+    return (
+        entries.values("menu__restaurant")
+        .order_by()
+        .annotate(count=Count("id"), total=Sum("dish__price"))
+        .values_list("menu__restaurant", "count", "total")
+    )
+
+
+def add_listings(rows, sign):
+    for restaurant_id, count, total in rows:
+        bump(
+            RestaurantRollup,
+            restaurant_id,
+            create=sign > 0,
+            dish_count=sign * count,
+            price_total=sign * (total or 0),
+        )
+
+
+def as_price(value):
+    """Return a price assigned as a string, float or Decimal as Decimal"""
+    return Decimal(str(value or 0))
+
+
+def dish_saved(dish, old):
+    """Apply a created or updated dish; ``old`` is (cuisine id, price)"""
+    price = as_price(dish.price)
+    old_cuisine, old_price = old or (None, None)
+    if old == (dish.cuisine_id, price):
+        return
+    bump(
+        CuisineRollup,
+        old_cuisine,
+        create=False,
+        dish_count=-1,
+        price_total=-as_price(old_price),
+    )
+    bump(CuisineRollup, dish.cuisine_id, dish_count=1, price_total=price)
+    if old is not None and old_price != price:
+        delta = price - old_price
+        for restaurant_id, count, total in listings(dish_ids=[dish.pk]):
+            bump(RestaurantRollup, restaurant_id, price_total=delta * count)
+
+
+def dish_deleting(dish):
+    """Remove a dish, its ingredient links and its menu listings"""
+    bump(
+        CuisineRollup,
+        dish.cuisine_id,
+        create=False,
+        dish_count=-1,
+        price_total=-as_price(dish.price),
+    )
+    add_usage(usage(dish_ids=[dish.pk]), -1)
+    add_listings(listings(dish_ids=[dish.pk]), -1)
+
+
+def dishes_deleting(dish_ids):
+    """Remove many dishes with their links, a few grouped queries in all"""
+    for cuisine_id, count, total in cuisine_totals(dish_ids=dish_ids):
+        bump(
+            CuisineRollup,
+            cuisine_id,
+            create=False,
+            dish_count=-count,
+            price_total=-(total or 0),
+        )
+    add_usage(usage(dish_ids=dish_ids), -1)
+    add_listings(listings(dish_ids=dish_ids), -1)
+
+
+def usage(dish_ids=None, ingredient_ids=None):
+    """Return (ingredient id, dishes) for dish/ingredient links"""
+    links = DishIngredient.objects.all()
+    if dish_ids is not None:
+        links = links.filter(dish_id__in=dish_ids)
+    if ingredient_ids is not None:
+        links = links.filter(ingredient_id__in=ingredient_ids)
+    return (
+        links.values("ingredient")
+        .order_by()
+        .annotate(count=Count("id"))
+        .values_list("ingredient", "count")
+    )
+
+
+def add_usage(rows, sign):
+    for ingredient_id, count in rows:
+        bump(
+            IngredientRollup,
+            ingredient_id,
+            create=sign > 0,
+            dish_count=sign * count,
+        )
+
+
+def menu_restaurant_changed(menu, old_restaurant):
+    """Move a menu's listings from its old restaurant to the new one"""
+    totals = MenuDish.objects.filter(menu_id=menu.pk).aggregate(
+        count=Count("id"), total=Sum("dish__price")
+    )
+    count, total = totals["count"], totals["total"] or 0
+    bump(
+        RestaurantRollup,
+        old_restaurant,
+        create=False,
+        dish_count=-count,
+        price_total=-total,
+    )
+    bump(
+        RestaurantRollup,
+        menu.restaurant_id,
+        dish_count=count,
+        price_total=total,
+    )
+
+
+def cuisine_totals(cuisine_ids=None, dish_ids=None):
+    """Return (cuisine id, dishes, price total) for dishes in cuisines"""
+    dishes = Dish.objects.filter(cuisine__isnull=False)
+    if cuisine_ids is not None:
+        dishes = dishes.filter(cuisine__in=cuisine_ids)
+    if dish_ids is not None:
+        dishes = dishes.filter(pk__in=dish_ids)
+    return (
+        dishes.values("cuisine")
+        .order_by()
+        .annotate(count=Count("id"), total=Sum("price"))
+        .values_list("cuisine", "count", "total")
+    )
+
+
+def refresh(cuisine_ids=None, restaurant_ids=None):
+    """Recompute the rollups of some cuisines and restaurants, or all
+
+    Used after bulk UPDATEs, which bypass the signals keeping rollups
+    current.
+    """
+    cuisines = CuisineRollup.objects.all()
+    restaurants = RestaurantRollup.objects.all()
+    if cuisine_ids is not None:
+        cuisines = cuisines.filter(cuisine__in=cuisine_ids)
+    if restaurant_ids is not None:
+        restaurants = restaurants.filter(restaurant__in=restaurant_ids)
+    with transaction.atomic():
+        cuisines.delete()
+        restaurants.delete()
+        CuisineRollup.objects.bulk_create(
+            CuisineRollup(
+                cuisine_id=cuisine_id,
+                dish_count=count,
+                price_total=total or 0,
+            )
+            for cuisine_id, count, total in cuisine_totals(cuisine_ids)
+        )
+        RestaurantRollup.objects.bulk_create(
+            RestaurantRollup(
+                restaurant_id=restaurant_id,
+                dish_count=count,
+                price_total=total or 0,
+            )
+            for restaurant_id, count, total in listings(
+                restaurant_ids=restaurant_ids
+            )
+        )
+
+
+def rebuild():
+    """Recompute every rollup table from the catalog in a few queries"""
+    with transaction.atomic():
+        refresh()
+        IngredientRollup.objects.all().delete()
+        IngredientRollup.objects.bulk_create(
+            IngredientRollup(ingredient_id=ingredient_id, dish_count=count)
+            for ingredient_id, count in usage()
+        )
+
+
+def average(total, count):
+    return (total / count).quantize(CENT) if count else None
+
+
+def summary(limit):
+    """Return the analytics report read straight from the rollup tables
+
+    Each section lists the ``limit`` cuisines, restaurants or ingredients
+    with the most dishes, read in order from the ``(-dish_count, id)``
+    index of its rollup table.
+    """
+    report = {}
+    for name, model, parent in (
+        ("cuisines", CuisineRollup, "cuisine"),
+        ("restaurants", RestaurantRollup, "restaurant"),
+    ):
+        rows = (
+            model.objects.filter(dish_count__gt=0)
+            .order_by("-dish_count", parent)
+            .values_list(
+                parent, parent + "__name", "dish_count", "price_total"
+            )[:limit]
+        )
+        report[name] = [
+            {
+                parent: key,
+                "name": label,
+                "dishes": count,
+                "avg_price": average(total, count),
+            }
+            for key, label, count, total in rows
+        ]
+    rows = (
+        IngredientRollup.objects.filter(dish_count__gt=0)
+        .order_by("-dish_count", "ingredient")
+        .values_list("ingredient", "ingredient__name", "dish_count")[:limit]
+    )
+    report["ingredients"] = [
+        {"ingredient": key, "name": label, "dishes": count}
+        for key, label, count in rows
+    ]
+    return report
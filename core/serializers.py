@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
-from core import models
+from core import diet, models
+from core.fields import BulkPrimaryKeyRelatedField
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -8,23 +9,45 @@ class IngredientSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.Ingredient
-        fields = ("id", "name", "price")
+        fields = ("id", "name", "price") + diet.FLAGS + ("version",)
+        read_only_fields = ("version",)
+        extra_kwargs = {"price": {"coerce_to_string": False}}
 
 
 class CuisineSerializer(serializers.ModelSerializer):
     """Serializes Cuisine"""
 
+    serializer_related_field = BulkPrimaryKeyRelatedField
+
     class Meta:
         model = models.Cuisine
-        fields = ("id", "popular_ingredients", "name", "origin")
+        fields = ("id", "popular_ingredients", "name", "origin", "version")
+        read_only_fields = ("version",)
 
 
 class DishSerializer(serializers.ModelSerializer):
     """Serializes Dish"""
 
+    serializer_related_field = BulkPrimaryKeyRelatedField
+    diet = serializers.SerializerMethodField()
+
     class Meta:
         model = models.Dish
-        fields = ("id", "ingredients", "name", "price", "serves", "cuisine")
+        fields = (
+            "id",
+            "ingredients",
+            "name",
+            "price",
+            "serves",
+            "cuisine",
+            "diet",
+            "version",
+        )
+        read_only_fields = ("version",)
+        extra_kwargs = {"price": {"coerce_to_string": False}}
+
+    def get_diet(self, obj):
+        return diet.flags(obj.diet)
 
 
 class RestaurantSerializer(serializers.ModelSerializer):
@@ -41,12 +64,38 @@ class RestaurantSerializer(serializers.ModelSerializer):
             "email",
             "contact_number",
             "website",
+            "latitude",
+            "longitude",
+            "version",
         )
+        read_only_fields = ("version",)
 
 
 class MenuSerializer(serializers.ModelSerializer):
     """Serializes Menu"""
 
+    serializer_related_field = BulkPrimaryKeyRelatedField
+
     class Meta:
         model = models.Menu
-        fields = ("id", "dishes", "cuisines", "restaurant")
+        fields = ("id", "dishes", "cuisines", "restaurant", "version")
+        read_only_fields = ("version",)
+
+
+class DeletionSerializer(serializers.ModelSerializer):
+    """Serializes the progress of a Deletion"""
+
+    class Meta:
+        model = models.Deletion
+        fields = (
+            "id",
+            "model",
+            "object_id",
+            "status",
+            "total",
+            "deleted",
+            "error",
+            "created",
+            "updated",
+        )
+        read_only_fields = fields
@@ -0,0 +1,244 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core import changes, diet, models, rollups
+from core.autocomplete import name_index
+from core.fuzzy import trigram_index
+from core.recommendations import dish_index
+
+
+@receiver(m2m_changed, sender=models.Dish.ingredients.through)
+def update_dish_index(sender, instance, action, reverse, pk_set, **kwargs):
+    """Apply dish ingredient changes to the recommendation index"""
+    if not dish_index.is_built or not action.startswith("post_"):
+        return
+
+    if not reverse:
+        if action == "post_add":
+            dish_index.add(instance.pk, pk_set)
+        elif action == "post_remove":
+            dish_index.discard(instance.pk, pk_set)
+        elif action == "post_clear":
+            dish_index.discard(instance.pk)
+        return
+
+    if action == "post_clear":
+        pk_set = dish_index.dishes_with(instance.pk)
+    for dish_id in pk_set:
+        if action == "post_add":
+            dish_index.add(dish_id, {instance.pk})
+        else:
+            dish_index.discard(dish_id, {instance.pk})
+
+
+@receiver(post_delete, sender=models.Dish)
+def remove_from_dish_index(sender, instance, **kwargs):
+    """Drop a deleted dish from the recommendation index"""
+    if dish_index.is_built:
+        dish_index.discard(instance.pk)
+
+
+@receiver(post_delete, sender=models.Ingredient)
+def remove_ingredient_from_dish_index(sender, instance, **kwargs):
+    """Unlink a deleted ingredient from every dish in the index"""
+    if dish_index.is_built:
+        for dish_id in dish_index.dishes_with(instance.pk):
+            dish_index.discard(dish_id, {instance.pk})
+
+
+@receiver(pre_save, sender=models.Dish)
+def remember_dish_rollup(sender, instance, raw, **kwargs):
+    """Keep the stored cuisine and price to adjust rollups after saving"""
+    instance._rollup_old = None
+    if instance.pk and not raw:
+        instance._rollup_old = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("cuisine_id", "price")
+            .first()
+        )
+
+
+@receiver(post_save, sender=models.Dish)
+def update_dish_rollups(sender, instance, raw, **kwargs):
+    if not raw:
+        rollups.dish_saved(instance, instance._rollup_old)
+
+
+@receiver(pre_delete, sender=models.Dish)
+def remove_dish_rollups(sender, instance, **kwargs):
+    rollups.dish_deleting(instance)
+
+
+@receiver(pre_save, sender=models.Menu)
+def remember_menu_rollup(sender, instance, raw, **kwargs):
+    """Keep the stored restaurant to move listings after saving"""
+    instance._rollup_old = None
+    if instance.pk and not raw:
+        instance._rollup_old = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("restaurant_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=models.Menu)
+def update_menu_rollups(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        if instance._rollup_old != instance.restaurant_id:
+            rollups.menu_restaurant_changed(instance, instance._rollup_old)
+
+
+@receiver(pre_delete, sender=models.Menu)
+def remove_menu_rollups(sender, instance, **kwargs):
+    rollups.add_listings(rollups.listings(menu_ids=[instance.pk]), -1)
+
+
+def rollup_sign(action):
+    """Return +1/-1 for m2m actions that change rollups, else None
+
+    Removals are applied before the rows go so the links that really
+    exist can still be counted; both run in the same transaction.
+    """
+    return {"post_add": 1, "pre_remove": -1, "pre_clear": -1}.get(action)
+
+
+@receiver(m2m_changed, sender=models.Dish.ingredients.through)
+def update_ingredient_rollups(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    sign = rollup_sign(action)
+    if sign is None:
+        return
+    ids = {"dish_ids": [instance.pk], "ingredient_ids": pk_set}
+    if reverse:
+        ids = {"dish_ids": pk_set, "ingredient_ids": [instance.pk]}
+    rollups.add_usage(rollups.usage(**ids), sign)
+
+
+@receiver(m2m_changed, sender=models.Menu.dishes.through)
+def update_listing_rollups(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    sign = rollup_sign(action)
+    if sign is None:
+        return
+    ids = {"menu_ids": [instance.pk], "dish_ids": pk_set}
+    if reverse:
+        ids = {"menu_ids": pk_set, "dish_ids": [instance.pk]}
+    rollups.add_listings(rollups.listings(**ids), sign)
+
+
+@receiver(m2m_changed, sender=models.Dish.ingredients.through)
+def update_dish_diet(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recompute the diet of dishes whose ingredients changed"""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            changed = diet.refresh([instance.pk])
+            instance.diet = changed.get(instance.pk, instance.diet)
+        return
+    if action == "pre_clear":
+        instance._diet_dishes = diet.dishes_with(instance.pk)
+    elif action in ("post_add", "post_remove"):
+        diet.refresh(pk_set, bump=True)
+    elif action == "post_clear":
+        diet.refresh(instance._diet_dishes, bump=True)
+
+
+def refresh_ingredient_dishes(dish_ids):
+    changed = diet.refresh(dish_ids, bump=True)
+    changes.record(models.Dish, changed, models.CatalogChange.UPDATE)
+
+
+@receiver(pre_save, sender=models.Ingredient)
+def remember_ingredient_flags(sender, instance, raw, **kwargs):
+    instance._diet_old = None
+    if instance.pk and not raw:
+        instance._diet_old = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list(*diet.FLAGS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=models.Ingredient)
+def update_ingredient_diets(sender, instance, created, raw, **kwargs):
+    """Recompute the dishes using an ingredient whose flags changed"""
+    if created or raw or instance._diet_old is None:
+        return
+    flags = tuple(getattr(instance, flag) for flag in diet.FLAGS)
+    if flags != instance._diet_old:
+        refresh_ingredient_dishes(diet.dishes_with(instance.pk))
+
+
+@receiver(pre_delete, sender=models.Ingredient)
+def remember_ingredient_dishes(sender, instance, **kwargs):
+    instance._diet_dishes = diet.dishes_with(instance.pk)
+
+
+@receiver(post_delete, sender=models.Ingredient)
+def update_deleted_ingredient_diets(sender, instance, **kwargs):
+    """Recompute the dishes an ingredient was removed from
+
+    The change log already has their updates, from ``log_link_owners``.
+    """
+    diet.refresh(instance._diet_dishes, bump=True)
+
+
+def index_name(sender, instance, raw, **kwargs):
+    """Apply a new or renamed object to the in-memory name indexes"""
+    if not raw:
+        name_index.put(changes.name(sender), instance.pk, instance.name)
+        trigram_index.put(changes.name(sender), instance.pk, instance.name)
+
+
+def unindex_name(sender, instance, **kwargs):
+    name_index.discard(changes.name(sender), instance.pk)
+    trigram_index.discard(changes.name(sender), instance.pk)
+
+
+for model in name_index.MODELS.values():
+    post_save.connect(index_name, sender=model)
+    post_delete.connect(unindex_name, sender=model)
+
+
+def log_save(sender, instance, created, **kwargs):
+    """Append a create or update of a catalog object to the change log"""
+    operation = models.CatalogChange.UPDATE
+    if created:
+        operation = models.CatalogChange.CREATE
+    changes.record(sender, [instance.pk], operation)
+
+
+def log_delete(sender, instance, **kwargs):
+    changes.record(sender, [instance.pk], models.CatalogChange.DELETE)
+
+
+def log_link_owners(sender, instance, **kwargs):
+    changes.record_link_owners(sender, instance.pk)
+
+
+def log_links(sender, instance, action, reverse, pk_set, **kwargs):
+    """Log link changes as updates of the objects owning the links"""
+    owner, linked, field = changes.LINKS[sender]
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            changes.record(owner, [instance.pk], models.CatalogChange.UPDATE)
+        return
+    if action in ("post_add", "post_remove"):
+        changes.record(owner, pk_set, models.CatalogChange.UPDATE)
+    elif action == "pre_clear":
+        changes.record_link_owners(linked, instance.pk)
+
+
+for model in changes.TRACKED_MODELS:
+    post_save.connect(log_save, sender=model)
+    post_delete.connect(log_delete, sender=model)
+    pre_delete.connect(log_link_owners, sender=model)
+for through in changes.LINKS:
+    m2m_changed.connect(log_links, sender=through)
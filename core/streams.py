@@ -0,0 +1,171 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest
+from rest_framework import exceptions
+
+from core.authentication import (
+    AccessTokenAuthentication,
+    ExpiringTokenAuthentication,
+    read_stream_ticket,
+)
+from core.events import broker, tailer
+
+MAX_RESTAURANTS = 50
+
+
+def authenticate(headers, query):
+    """Return the user for a token in the headers or a ticket in the query
+
+    Browsers cannot set headers on ``EventSource`` or WebSocket requests,
+    so they pass a short-lived ``?ticket=`` from ``/api/events/ticket/``
+    rather than a token that access logs would keep.
+    """
+    if "ticket" in query:
+        return read_stream_ticket(query["ticket"][0])
+    request = HttpRequest()
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    request.META["HTTP_AUTHORIZATION"] = authorization
+    for authentication in (
+        AccessTokenAuthentication(),
+        ExpiringTokenAuthentication(),
+    ):
+        try:
+            result = authentication.authenticate(request)
+        except exceptions.AuthenticationFailed:
+            return None
+        if result is not None:
+            return result[0]
+    return None
+
+
+def parse_restaurants(query):
+    """Return the restaurant ids asked for, None for all, or raise"""
+    raw = ",".join(query.get("restaurant", ()))
+    ids = {int(value) for value in raw.split(",") if value.strip()}
+    if len(ids) > MAX_RESTAURANTS:
+        raise ValueError("Too many restaurants")
+    return ids or None
+
+
+def encode(batch):
+    return json.dumps(batch, separators=(",", ":"))
+
+
+class EventStreamApp:
+    """ASGI application streaming catalog changes per restaurant
+
+    Requests to ``EVENTS_PATH`` are answered with server-sent events or,
+    for WebSocket connections, text frames, each carrying the list of
+    changes coalesced over ``EVENTS_COALESCE_WINDOW``. Everything else is
+    passed to the Django application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            if scope["path"] == settings.EVENTS_PATH:
+                return await self.stream(scope, receive, send)
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close"})
+            return
+        return await self.application(scope, receive, send)
+
+    async def stream(self, scope, receive, send):
+        websocket = scope["type"] == "websocket"
+        if websocket:
+            message = await receive()
+            if message["type"] != "websocket.connect":
+                return
+        query = parse_qs(scope.get("query_string", b"").decode())
+        headers = dict(scope.get("headers", ()))
+        try:
+            restaurants = parse_restaurants(query)
+        except ValueError:
+            return await self.reject(send, websocket, 400)
+        user = await sync_to_async(authenticate)(headers, query)
+        if user is None:
+            return await self.reject(send, websocket, 401)
+        if len(broker) >= settings.EVENTS_MAX_CONNECTIONS:
+            return await self.reject(send, websocket, 503)
+
+        subscription = broker.subscribe(restaurants)
+        tailer.ensure_running()
+        try:
+            if websocket:
+                await send({"type": "websocket.accept"})
+            else:
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": 200,
+                        "headers": [
+                            (b"content-type", b"text/event-stream"),
+                            (b"cache-control", b"no-cache"),
+                            (b"x-accel-buffering", b"no"),
+                        ],
+                    }
+                )
+            await self.pump(subscription, receive, send, websocket)
+        finally:
+            broker.unsubscribe(subscription)
+            if not broker.has_subscribers:
+                tailer.stop()
+
+    async def pump(self, subscription, receive, send, websocket):
+        """Send batches until the client disconnects"""
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            while True:
+                batch = asyncio.ensure_future(
+                    subscription.next_batch(settings.EVENTS_HEARTBEAT)
+                )
+                await asyncio.wait(
+                    (batch, disconnected),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected.done():
+                    batch.cancel()
+                    return
+                await send(self.message(batch.result(), websocket))
+        finally:
+            disconnected.cancel()
+
+    @staticmethod
+    def message(batch, websocket):
+        if websocket:
+            return {"type": "websocket.send", "text": encode(batch)}
+        body = ": keepalive\n\n"
+        if batch:
+            body = "event: changes\ndata: %s\n\n" % encode(batch)
+        return {
+            "type": "http.response.body",
+            "body": body.encode(),
+            "more_body": True,
+        }
+
+    @staticmethod
+    async def reject(send, websocket, status):
+        if websocket:
+            await send({"type": "websocket.close", "code": 4000 + status})
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
+
+
+async def wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message["type"] in ("http.disconnect", "websocket.disconnect"):
+            return
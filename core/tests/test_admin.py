@@ -1,7 +1,13 @@
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase, Client
+from django.db.models import F
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 
+from core import bulk
+from core.models import CatalogChange, Cuisine, CuisineRollup, Dish, Menu
+
 
 class AdminSiteTest(TestCase):
     """Tests for Admin Site"""
@@ -38,3 +44,151 @@ class AdminSiteTest(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+
+class CatalogAdminTest(TestCase):
+    """Tests for the catalog admin pages"""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="password@123",
+        )
+        self.client.force_login(self.admin_user)
+        self.indian = Cuisine.objects.create(name="Indian", origin="India")
+        self.thai = Cuisine.objects.create(name="Thai", origin="Thailand")
+        self.dishes = [
+            Dish.objects.create(name=name, price="10.00", cuisine=self.indian)
+            for name in ("Biryani", "Korma")
+        ]
+        self.menu = Menu.objects.create()
+        self.menu.dishes.add(*self.dishes)
+
+    def test_change_pages(self):
+        """Test catalog change lists and forms render"""
+        for url in (
+            reverse("admin:core_dish_changelist"),
+            reverse("admin:core_dish_change", args=[self.dishes[0].id]),
+            reverse("admin:core_menu_change", args=[self.menu.id]),
+            reverse("admin:core_cuisine_changelist") + "?q=ind",
+        ):
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, 200)
+
+    def test_dish_form_uses_autocomplete(self):
+        url = reverse("admin:core_dish_change", args=[self.dishes[0].id])
+        res = self.client.get(url)
+
+        self.assertContains(res, "admin-autocomplete")
+        self.assertNotContains(res, '<option value="%d"' % self.thai.id)
+
+    def test_adjust_prices(self):
+        """Test the price action updates dishes and their rollups"""
+        res = self.client.post(
+            reverse("admin:core_dish_changelist"),
+            {
+                "action": "adjust_prices",
+                "_selected_action": [dish.id for dish in self.dishes],
+                "percent": "-10",
+            },
+        )
+
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(
+            set(Dish.objects.values_list("price", "version")),
+            {(Decimal("9.00"), 2)},
+        )
+        self.assertEqual(
+            CuisineRollup.objects.get(cuisine=self.indian).price_total,
+            Decimal("18.00"),
+        )
+
+    def test_adjust_prices_out_of_range(self):
+        """Test percentages which would break prices change nothing"""
+        Dish.objects.filter(pk=self.dishes[0].pk).update(price="99999999.00")
+        errors = {
+            "-100": "Enter a percentage from -99 to 1000.",
+            "1001": "Enter a percentage from -99 to 1000.",
+            "10": "The adjusted prices would be out of range.",
+        }
+        for percent, error in errors.items():
+            res = self.client.post(
+                reverse("admin:core_dish_changelist"),
+                {
+                    "action": "adjust_prices",
+                    "_selected_action": [dish.id for dish in self.dishes],
+                    "percent": percent,
+                },
+                follow=True,
+            )
+
+            self.assertContains(res, error)
+        self.assertEqual(
+            set(Dish.objects.values_list("version", flat=True)), {1}
+        )
+
+    @override_settings(BULK_UPDATE_CHUNK_SIZE=1)
+    def test_bulk_update_in_chunks(self):
+        """Test a check failing partway keeps earlier chunks consistent"""
+        first, second = sorted(self.dishes, key=lambda dish: dish.pk)
+
+        def check(chunk):
+            if chunk.filter(pk=second.pk).exists():
+                raise ValueError
+
+        with self.assertRaises(ValueError):
+            bulk.update_dishes(Dish.objects.all(), check, price=F("price") + 1)
+
+        self.assertEqual(
+            dict(Dish.objects.values_list("pk", "price")),
+            {first.pk: Decimal("11.00"), second.pk: Decimal("10.00")},
+        )
+        self.assertEqual(
+            CuisineRollup.objects.get(cuisine=self.indian).price_total,
+            Decimal("21.00"),
+        )
+
+    def test_delete_cuisine(self):
+        """Test cuisines are deleted with their dishes like in the API"""
+        url = reverse("admin:core_cuisine_delete", args=[self.indian.id])
+        res = self.client.get(url)
+
+        self.assertContains(res, "Indian (2 Dishes)")
+
+        res = self.client.post(url, {"post": "yes"})
+
+        self.assertEqual(res.status_code, 302)
+        self.assertFalse(Dish.objects.filter(cuisine=self.indian).exists())
+        self.assertFalse(CuisineRollup.objects.filter(pk=self.indian.pk))
+        self.assertTrue(
+            CatalogChange.objects.filter(
+                model="cuisine", object_id=self.indian.id
+            ).exists()
+        )
+        res = self.client.get(reverse("admin:core_cuisine_changelist"))
+        self.assertNotContains(res, "delete_selected")
+
+    def test_reassign_cuisine(self):
+        self.client.post(
+            reverse("admin:core_dish_changelist"),
+            {
+                "action": "reassign_cuisine",
+                "_selected_action": [self.dishes[0].id],
+                "cuisine": str(self.thai.id),
+            },
+        )
+
+        self.dishes[0].refresh_from_db()
+        self.assertEqual(self.dishes[0].cuisine, self.thai)
+        self.assertEqual(
+            CuisineRollup.objects.get(cuisine=self.thai).dish_count, 1
+        )
+        self.assertEqual(
+            CuisineRollup.objects.get(cuisine=self.indian).dish_count, 1
+        )
+        self.assertTrue(
+            CatalogChange.objects.filter(
+                model="dish", object_id=self.dishes[0].id
+            ).exists()
+        )
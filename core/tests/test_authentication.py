@@ -0,0 +1,246 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import exceptions
+
+from core.authentication import (
+    AccessTokenAuthentication,
+    ExpiringTokenAuthentication,
+    issue_access_token,
+    issue_stream_ticket,
+    read_stream_ticket,
+)
+from core.checks import check_revocation_cache
+from core.models import ExpiringToken
+from core.revocation import revoked_tokens
+
+
+@override_settings(TOKEN_TTL=timedelta(hours=1))
+class ExpiringTokenAuthenticationTest(TestCase):
+    """Tests for expiring token authentication"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="password@123",
+        )
+        self.auth = ExpiringTokenAuthentication()
+        revoked_tokens.clear()
+
+    def test_issue_reuses_live_token(self):
+        """Test issuing twice returns the same live token"""
+        token = ExpiringToken.objects.issue(self.user)
+
+        self.assertEqual(ExpiringToken.objects.issue(self.user), token)
+        self.assertEqual(len(token.key), 40)
+
+    def test_valid_token_authenticates(self):
+        """Test a live token authenticates its user"""
+        token = ExpiringToken.objects.issue(self.user)
+        user, auth = self.auth.authenticate_credentials(token.key)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(auth, token)
+
+    def test_expired_token_rejected(self):
+        """Test a token past its expiry is rejected"""
+        token = ExpiringToken.objects.issue(self.user)
+        ExpiringToken.objects.filter(pk=token.pk).update(
+            expires=timezone.now() - timedelta(seconds=1)
+        )
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(token.key)
+
+    def test_expiry_slides_when_half_used(self):
+        """Test using a token late in its life extends the expiry"""
+        token = ExpiringToken.objects.issue(self.user)
+        soon = timezone.now() + timedelta(minutes=10)
+        ExpiringToken.objects.filter(pk=token.pk).update(expires=soon)
+
+        self.auth.authenticate_credentials(token.key)
+
+        token.refresh_from_db()
+        self.assertGreater(token.expires, soon + timedelta(minutes=30))
+
+    def test_fresh_token_not_written(self):
+        """Test using a fresh token does not update its expiry"""
+        token = ExpiringToken.objects.issue(self.user)
+
+        with self.assertNumQueries(1):
+            self.auth.authenticate_credentials(token.key)
+
+    def test_revoked_token_rejected_without_query(self):
+        """Test a revoked token is rejected from the in-memory list"""
+        token = ExpiringToken.objects.issue(self.user)
+        revoked_tokens.revoke(token.key, token.expires)
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                self.auth.authenticate_credentials(token.key)
+
+    def test_revocation_synced_between_workers(self):
+        """Test a revocation made by another worker is picked up"""
+        from core.revocation import RevocationList
+
+        other = RevocationList()
+        token = ExpiringToken.objects.issue(self.user)
+        other.revoke(token.key, token.expires)
+        revoked_tokens.sync(force=True)
+
+        self.assertTrue(revoked_tokens.is_revoked(token.key))
+
+    def test_revocations_from_workers_all_kept(self):
+        """Test revocations made by two workers in turn are both shared"""
+        from core.revocation import RevocationList
+
+        first, second = RevocationList(), RevocationList()
+        first.sync(force=True)
+        second.sync(force=True)
+        first.revoke("abc", timezone.now() + timedelta(hours=1))
+        second.revoke("def", timezone.now() + timedelta(hours=1))
+        revoked_tokens.sync(force=True)
+
+        self.assertTrue(revoked_tokens.is_revoked("abc"))
+        self.assertTrue(revoked_tokens.is_revoked("def"))
+
+    def test_new_worker_skips_expired_slots(self):
+        """Test a starting worker reads only the revocations still live"""
+        from core.revocation import RevocationList
+
+        expires = timezone.now() + timedelta(hours=1)
+        with override_settings(TOKEN_TTL=timedelta(seconds=-1)):
+            revoked_tokens.revoke("abc", timezone.now())
+        revoked_tokens.revoke("def", expires)
+
+        worker = RevocationList()
+        self.assertEqual(worker._first_live(2), 2)
+        self.assertTrue(worker.is_revoked("def"))
+
+    def test_expired_revocations_dropped(self):
+        """Test revocations are forgotten once the token would expire"""
+        revoked_tokens.revoke("abc", timezone.now() - timedelta(seconds=1))
+        revoked_tokens.sync(force=True)
+
+        self.assertFalse(revoked_tokens.is_revoked("abc"))
+        self.assertEqual(len(revoked_tokens), 0)
+
+
+@override_settings(STATELESS_AUTH=True, ACCESS_TOKEN_TTL=timedelta(minutes=5))
+class AccessTokenAuthenticationTest(TestCase):
+    """Tests for stateless signed access tokens"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email="test@test.com", password="password@123",
+        )
+        self.token = ExpiringToken.objects.issue(self.user)
+        self.auth = AccessTokenAuthentication()
+        revoked_tokens.clear()
+
+    def test_access_token_verified_without_queries(self):
+        """Test an access token authenticates with no database access"""
+        access = issue_access_token(self.token)
+
+        with self.assertNumQueries(0):
+            user, payload = self.auth.authenticate_credentials(access)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertTrue(user.is_staff)
+        self.assertTrue(user.is_authenticated)
+
+    def test_tampered_access_token_rejected(self):
+        """Test an access token with a bad signature is rejected"""
+        access = issue_access_token(self.token)
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(access[:-1] + "x")
+
+    def test_old_access_token_rejected(self):
+        """Test an access token older than its lifetime is rejected"""
+        access = issue_access_token(self.token)
+
+        with override_settings(ACCESS_TOKEN_TTL=timedelta(seconds=-1)):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                self.auth.authenticate_credentials(access)
+
+    def test_access_token_rejected_after_revocation(self):
+        """Test revoking the expiring token revokes its access tokens"""
+        access = issue_access_token(self.token)
+        revoked_tokens.revoke(self.token.key, self.token.expires)
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(access)
+
+
+@override_settings(EVENTS_TICKET_TTL=30)
+class StreamTicketTest(TestCase):
+    """Tests for short-lived event stream tickets"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="password@123",
+        )
+        self.token = ExpiringToken.objects.issue(self.user)
+        revoked_tokens.clear()
+
+    def test_ticket_read_without_queries(self):
+        """Test a ticket identifies its user with no database access"""
+        ticket = issue_stream_ticket(self.user, self.token)
+
+        with self.assertNumQueries(0):
+            user = read_stream_ticket(ticket)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertFalse(user.is_staff)
+
+    def test_bad_and_old_tickets_rejected(self):
+        """Test tampered tickets and tickets past their lifetime fail"""
+        ticket = issue_stream_ticket(self.user, self.token)
+
+        self.assertIsNone(read_stream_ticket(ticket[:-1] + "x"))
+        self.assertIsNone(read_stream_ticket(self.token.key))
+        with override_settings(EVENTS_TICKET_TTL=-1):
+            self.assertIsNone(read_stream_ticket(ticket))
+
+    def test_ticket_rejected_after_revocation(self):
+        """Test revoking the expiring token revokes its tickets"""
+        ticket = issue_stream_ticket(self.user, self.token)
+        revoked_tokens.revoke(self.token.key, self.token.expires)
+
+        self.assertIsNone(read_stream_ticket(ticket))
+
+
+class RevocationCacheCheckTest(TestCase):
+    """Tests for the deploy check of the revocation cache"""
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            }
+        },
+        TOKEN_REVOCATION_CACHE="default",
+    )
+    def test_local_cache_reported(self):
+        """Test a per-process cache is reported by check --deploy"""
+        errors = check_revocation_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["core.E001"])
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            },
+            "shared": {
+                "BACKEND": "django.core.cache.backends.filebased."
+                "FileBasedCache",
+                "LOCATION": "/tmp/revocations",
+            },
+        },
+        TOKEN_REVOCATION_CACHE="shared",
+    )
+    def test_shared_cache_accepted(self):
+        self.assertEqual(check_revocation_cache(None), [])
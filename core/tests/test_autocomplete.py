@@ -0,0 +1,88 @@
+from django.test import TestCase
+
+from core import autocomplete
+from core.autocomplete import NameIndex, name_index
+from core.models import Cuisine, Dish, Menu
+
+
+class NameIndexTest(TestCase):
+    """Tests for the in-memory name prefix index"""
+
+    def setUp(self):
+        self.index = NameIndex()
+        self.index.load(
+            [
+                (1, "Paneer Tikka", 5),
+                (2, "Chicken Tikka", 9),
+                (3, "Pad Thai", 0),
+                (4, "Pâté", 1),
+            ]
+        )
+
+    def test_word_starts_ranked_by_score(self):
+        self.assertEqual(
+            self.index.suggest("tik", 10),
+            [(2, "Chicken Tikka"), (1, "Paneer Tikka")],
+        )
+        self.assertEqual(
+            self.index.suggest("paneer t", 10), [(1, "Paneer Tikka")]
+        )
+        self.assertEqual(
+            self.index.suggest("pa", 10),
+            [(1, "Paneer Tikka"), (4, "Pâté"), (3, "Pad Thai")],
+        )
+        self.assertEqual(
+            self.index.suggest("tikka", 1), [(2, "Chicken Tikka")]
+        )
+
+    def test_put_and_discard(self):
+        """Test renames and deletes update both long and short prefixes"""
+        self.index.put(1, "Paneer Butter Masala")
+        self.assertEqual(self.index.suggest("tik", 10), [(2, "Chicken Tikka")])
+        self.assertEqual(
+            self.index.suggest("butter", 10), [(1, "Paneer Butter Masala")]
+        )
+
+        self.index.discard(2)
+        self.assertEqual(self.index.suggest("tik", 10), [])
+        self.assertEqual(self.index.suggest("chicken", 10), [])
+
+    def test_short_prefixes_keep_the_top(self):
+        index = NameIndex()
+        index.load((pk, "Dish %d" % pk, pk) for pk in range(50))
+
+        found = index.suggest("di", 5)
+        self.assertEqual([pk for pk, name in found], [49, 48, 47, 46, 45])
+
+        index.discard(49)
+        found = index.suggest("dis", autocomplete.MAX_SUGGESTIONS)
+        self.assertEqual(len(found), autocomplete.MAX_SUGGESTIONS)
+        self.assertEqual(found[0][0], 48)
+
+
+class AutocompleteIndexTest(TestCase):
+    """Tests for keeping the autocomplete index current"""
+
+    def setUp(self):
+        name_index.clear()
+        self.dish = Dish.objects.create(name="Biryani", price="10.00")
+        Dish.objects.create(name="Bisque", price="8.00")
+        Menu.objects.create().dishes.add(self.dish)
+
+    def test_build_and_signals(self):
+        name_index.build()
+        self.assertEqual(
+            name_index.suggest("bi", ["dish"])["dish"],
+            [(self.dish.id, "Biryani"), (self.dish.id + 1, "Bisque")],
+        )
+
+        Cuisine.objects.create(name="Bihari", origin="India")
+        self.dish.name = "Pulao"
+        self.dish.save()
+
+        found = name_index.suggest("BI", ["dish", "cuisine"])
+        self.assertEqual([name for pk, name in found["dish"]], ["Bisque"])
+        self.assertEqual([name for pk, name in found["cuisine"]], ["Bihari"])
+
+        self.dish.delete()
+        self.assertEqual(name_index.suggest("pul", ["dish"])["dish"], [])
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core import changes
+from core.models import CatalogChange, Cuisine, Dish, Ingredient, Menu
+
+
+def logged():
+    return list(
+        CatalogChange.objects.order_by("id").values_list(
+            "model", "object_id", "operation"
+        )
+    )
+
+
+class TestChangeLog(TestCase):
+    """Test the catalog change log"""
+
+    def setUp(self):
+        self.rice = Ingredient.objects.create(name="Rice", price="1.00")
+        self.dish = Dish.objects.create(name="Biryani", price="10.00")
+        self.menu = Menu.objects.create()
+        CatalogChange.objects.all().delete()
+
+    def test_saves_and_deletes(self):
+        """Test creates, updates and deletes are logged in order"""
+        cuisine = Cuisine.objects.create(name="Thai", origin="Thailand")
+        cuisine_id = cuisine.id
+        self.dish.name = "Pulao"
+        self.dish.save()
+        cuisine.delete()
+
+        self.assertEqual(
+            logged(),
+            [
+                ("cuisine", cuisine_id, "create"),
+                ("dish", self.dish.id, "update"),
+                ("cuisine", cuisine_id, "delete"),
+            ],
+        )
+
+    def test_links_update_owner(self):
+        """Test link changes from either side are logged on the owner"""
+        self.dish.ingredients.add(self.rice)
+        self.rice.dish_set.clear()
+        self.menu.dishes.add(self.dish)
+        dish_id = self.dish.id
+        self.dish.delete()
+
+        self.assertEqual(
+            logged(),
+            [
+                ("dish", dish_id, "update"),
+                ("dish", dish_id, "update"),
+                ("menu", self.menu.id, "update"),
+                ("menu", self.menu.id, "update"),
+                ("dish", dish_id, "delete"),
+            ],
+        )
+
+    def test_compact(self):
+        """Test compaction keeps the latest entry and expires deletes"""
+        self.dish.save()
+        self.dish.save()
+        self.menu.delete()
+        out = StringIO()
+
+        call_command("compact_changes", stdout=out)
+        deleted = CatalogChange.objects.get(operation="delete").version
+
+        self.assertIn("Removed 1 ", out.getvalue())
+        self.assertEqual(changes.horizon(), 0)
+
+        removed = changes.compact(timezone.now() + timedelta(seconds=1))
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(changes.horizon(), deleted)
+        self.assertEqual(
+            [entry[1:] for entry in changes.changes_since(0, 10, 10 ** 9)],
+            [("dish", self.dish.id, "update")],
+        )
@@ -0,0 +1,103 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core import coalescing
+from core.coalescing import SingleFlight
+
+
+class SingleFlightTest(SimpleTestCase):
+    """Tests for sharing concurrent computations"""
+
+    def test_concurrent_calls_share_one_computation(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        waiting = []
+        calls = []
+
+        class CountingEvent(threading.Event):
+            def wait(self, timeout=None):
+                waiting.append(1)
+                return super().wait(timeout)
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return [1, 2]
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(flight.do("key", compute))
+            )
+            for _ in range(5)
+        ]
+        threads[0].start()
+        started.wait(5)
+        flight._calls["key"].done = CountingEvent()
+        for thread in threads[1:]:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while len(waiting) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[1, 2]] * 5)
+        self.assertFalse(flight.in_flight("key"))
+
+    def test_errors_are_not_kept(self):
+        flight = SingleFlight()
+
+        with self.assertRaises(ValueError):
+            flight.do("key", mock.Mock(side_effect=ValueError))
+
+        self.assertEqual(flight.do("key", lambda: 3), 3)
+
+
+@override_settings(CATALOG_CACHE_TTL=60, CATALOG_CACHE_STALE=30)
+class CachedReadTest(SimpleTestCase):
+    """Tests for cached reads with stale serving and early expiry"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_until_invalidated(self):
+        compute = mock.Mock(side_effect=[1, 2])
+
+        self.assertEqual(coalescing.get_or_compute("k", compute), 1)
+        self.assertEqual(coalescing.get_or_compute("k", compute), 1)
+        coalescing.bump_generation()
+        self.assertEqual(coalescing.get_or_compute("k", compute), 2)
+
+    def test_stale_entry_served_while_refreshing(self):
+        """Test only the request winning the lock recomputes"""
+        coalescing.get_or_compute("k", lambda: "old")
+        key = "catalog:%s:k" % coalescing.generation()
+        value, expires, delta = cache.get(key)
+        cache.set(key, (value, time.time() - 1, delta))
+
+        with override_settings(CATALOG_CACHE_LOCK=True):
+            cache.add(key + ":lock", 1)
+            self.assertEqual(coalescing.get_or_compute("k", lambda: 1), "old")
+            cache.delete(key + ":lock")
+            self.assertEqual(
+                coalescing.get_or_compute("k", lambda: "new"), "new"
+            )
+
+        self.assertEqual(coalescing.get_or_compute("k", lambda: 2), "new")
+
+    def test_early_expiry(self):
+        """Test entries costly to compute are refreshed before expiring"""
+        with mock.patch("random.random", return_value=0):
+            self.assertTrue(coalescing.is_fresh(100, 0.1, 99))
+        with mock.patch("random.random", return_value=0.999999):
+            self.assertFalse(coalescing.is_fresh(100, 0.1, 99))
+            self.assertTrue(coalescing.is_fresh(100, 0.001, 99))
@@ -1,8 +1,19 @@
+from datetime import timedelta
+from io import StringIO
 from unittest.mock import patch
 
-from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
 from django.db.utils import OperationalError
 from django.test import TestCase
+from django.utils import timezone
+
+from core.management.commands.profile_imports import parse_importtime
+from core.models import ExpiringToken
+
+ENSURE_CONNECTION = (
+    "django.db.backends.base.base.BaseDatabaseWrapper.ensure_connection"
+)
 
 
 class TestCommands(TestCase):
@@ -10,15 +21,105 @@ class TestCommands(TestCase):
 
     def test_wait_for_db_ready(self):
         """Test waiting for db when db is available"""
-        with patch("django.db.utils.ConnectionHandler.__getitem__") as gi:
-            gi.return_value = True
-            call_command("wait_for_db")
-            self.assertEqual(gi.call_count, 1)
+        with patch(ENSURE_CONNECTION) as ec:
+            call_command("wait_for_db", stdout=StringIO())
+            self.assertEqual(ec.call_count, 1)
 
     @patch("time.sleep", return_value=True)
     def test_wait_for_db(self, ts):
         """Test waiting for db"""
-        with patch("django.db.utils.ConnectionHandler.__getitem__") as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command("wait_for_db")
-            self.assertEqual(gi.call_count, 6)
+        with patch(ENSURE_CONNECTION) as ec:
+            ec.side_effect = [OperationalError] * 5 + [None]
+            call_command("wait_for_db", stdout=StringIO())
+            self.assertEqual(ec.call_count, 6)
+            self.assertEqual(ts.call_count, 5)
+
+    @patch("time.sleep", return_value=True)
+    def test_wait_for_db_backoff(self, ts):
+        """Test sleeps grow exponentially up to the maximum delay"""
+        with patch(ENSURE_CONNECTION) as ec, patch("random.uniform") as ru:
+            ec.side_effect = [OperationalError] * 6 + [None]
+            ru.side_effect = lambda low, high: high
+            call_command(
+                "wait_for_db",
+                initial_delay=1,
+                max_delay=8,
+                stdout=StringIO(),
+            )
+            self.assertEqual(
+                [c.args[0] for c in ts.call_args_list], [1, 2, 4, 8, 8, 8]
+            )
+
+    @patch("time.sleep", return_value=True)
+    def test_wait_for_db_many_attempts(self, ts):
+        """Test the backoff stays at the maximum however long it retries"""
+        with patch(ENSURE_CONNECTION) as ec:
+            ec.side_effect = [OperationalError] * 1100 + [None]
+            call_command(
+                "wait_for_db",
+                initial_delay=0.5,
+                max_delay=8,
+                stdout=StringIO(),
+            )
+            self.assertEqual(ts.call_count, 1100)
+            self.assertLessEqual(max(c.args[0] for c in ts.call_args_list), 8)
+
+    @patch("time.sleep", return_value=True)
+    def test_wait_for_db_timeout(self, ts):
+        """Test waiting gives up once the timeout has passed"""
+        with patch(ENSURE_CONNECTION) as ec:
+            ec.side_effect = OperationalError("refused")
+            with self.assertRaises(CommandError):
+                call_command("wait_for_db", timeout=0, stdout=StringIO())
+
+    def test_wait_for_db_reports_time(self):
+        """Test each alias is checked with a query and timed"""
+        out = StringIO()
+        call_command("wait_for_db", stdout=out)
+
+        self.assertIn("Database default ready after", out.getvalue())
+
+    def test_prune_tokens(self):
+        """Test expired tokens are deleted in batches"""
+        user = get_user_model().objects.create_user(
+            email="test@test.com", password="password@123",
+        )
+        past = timezone.now() - timedelta(days=1)
+        for _ in range(5):
+            ExpiringToken.objects.create(user=user, expires=past)
+        live = ExpiringToken.objects.issue(user)
+
+        out = StringIO()
+        call_command("prune_tokens", batch_size=2, stdout=out)
+
+        self.assertEqual(list(ExpiringToken.objects.all()), [live])
+        self.assertIn("Deleted 5 expired tokens", out.getvalue())
+
+    def test_explain_orderings(self):
+        """Test declared orderings are reported as served by indexes"""
+        out = StringIO()
+        call_command("explain_orderings", "--fail", stdout=out)
+
+        self.assertIn("All orderings are served by indexes", out.getvalue())
+
+    def test_parse_importtime(self):
+        """Test import time output is parsed into per-module costs"""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     _io\n"
+            "import time:      1500 |       1620 | django.conf\n"
+        )
+
+        self.assertEqual(
+            parse_importtime(output),
+            [("_io", 120, 120), ("django.conf", 1500, 1620)],
+        )
+
+    def test_profile_imports(self):
+        """Test loading the WSGI application is profiled in a new process"""
+        out = StringIO()
+        call_command("profile_imports", wsgi=True, limit=3, stdout=out)
+
+        self.assertIn("modules imported in", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("profile_imports", wsgi=True, target=0, stdout=out)
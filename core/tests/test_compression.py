@@ -0,0 +1,183 @@
+import gzip
+import json
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core import compression
+from core.compression import (
+    CompressionMiddleware,
+    compressed_cache,
+    parse_accept_encoding,
+)
+from core.models import Ingredient
+from core.renderers import MessagePackRenderer, msgpack
+
+BODY = b'{"name": "Paneer Tikka", "price": 12.0}' * 100
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTest(TestCase):
+    """Tests for response compression"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        compressed_cache.clear()
+
+    def get_response(self, accept, response=None):
+        if response is None:
+            response = HttpResponse(BODY, content_type="application/json")
+        middleware = CompressionMiddleware(lambda request: response)
+        request = self.factory.get("/", HTTP_ACCEPT_ENCODING=accept)
+        return middleware(request)
+
+    def test_parse_accept_encoding(self):
+        """Test encodings are parsed with their quality values"""
+        self.assertEqual(
+            parse_accept_encoding("gzip, br;q=0.5, zstd;q=0"),
+            {"gzip": 1.0, "br": 0.5, "zstd": 0.0},
+        )
+
+    @override_settings(COMPRESSION_ENCODINGS=["gzip"])
+    def test_gzip(self):
+        """Test a large JSON response is gzipped"""
+        response = self.get_response("gzip, deflate")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_identity_when_not_accepted(self):
+        """Test nothing is compressed without a matching encoding"""
+        response = self.get_response("gzip;q=0")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, BODY)
+
+    def test_small_response_not_compressed(self):
+        """Test bodies under the size threshold are sent as is"""
+        response = HttpResponse(b"{}", content_type="application/json")
+        response = self.get_response("gzip", response)
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_binary_content_not_compressed(self):
+        """Test content types which do not compress are skipped"""
+        response = HttpResponse(BODY, content_type="image/png")
+        response = self.get_response("gzip", response)
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    @override_settings(COMPRESSION_ENCODINGS=["gzip"])
+    def test_streaming_gzip(self):
+        """Test streamed responses are compressed chunk by chunk"""
+        response = StreamingHttpResponse(
+            iter([BODY, BODY]), content_type="application/json"
+        )
+        response = self.get_response("gzip", response)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = b"".join(response.streaming_content)
+        self.assertEqual(gzip.decompress(content), BODY * 2)
+
+    @override_settings(COMPRESSION_ENCODINGS=["gzip"])
+    def test_compressed_body_reused(self):
+        """Test identical bodies are compressed only once"""
+        self.get_response("gzip")
+        encoder = compression.GzipEncoder(6)
+        with patch.object(
+            compression.GzipEncoder, "compress", side_effect=AssertionError
+        ):
+            response = self.get_response("gzip")
+
+        self.assertEqual(response.content, encoder.compress(BODY))
+
+    @unittest.skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli_preferred(self):
+        """Test brotli is chosen over gzip when both are accepted"""
+        response = self.get_response("gzip, br")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(response.content), BODY)
+
+    @unittest.skipUnless(compression.zstandard, "zstandard is not installed")
+    @override_settings(COMPRESSION_ENCODINGS=["zstd", "gzip"])
+    def test_streaming_zstd(self):
+        """Test streamed responses can be compressed with zstd"""
+        response = StreamingHttpResponse(
+            iter([BODY, BODY]), content_type="application/json"
+        )
+        response = self.get_response("zstd", response)
+
+        content = b"".join(response.streaming_content)
+        reader = compression.zstandard.ZstdDecompressor().decompressobj()
+        self.assertEqual(reader.decompress(content), BODY * 2)
+
+
+@unittest.skipUnless(msgpack, "msgpack is not installed")
+class MessagePackRendererTest(TestCase):
+    """Tests for the MessagePack renderer"""
+
+    def test_render(self):
+        """Test data round trips through MessagePack"""
+        data = [{"id": 1, "name": "Salt", "price": 0.5}]
+        content = MessagePackRenderer().render(data)
+
+        self.assertEqual(msgpack.unpackb(content), data)
+
+    def test_values_match_json(self):
+        """Test values MessagePack has no type for render as in JSON"""
+        moment = datetime(2026, 10, 19, 10, 5, tzinfo=timezone.utc)
+        data = {
+            "created": moment,
+            "day": moment.date(),
+            "at": moment.time(),
+            "price": Decimal("9.50"),
+        }
+
+        content = MessagePackRenderer().render(data)
+
+        self.assertEqual(
+            msgpack.unpackb(content), json.loads(JSONRenderer().render(data))
+        )
+        self.assertEqual(
+            msgpack.unpackb(content)["created"], "2026-10-19T10:05:00Z"
+        )
+
+    def test_catalog_negotiates_msgpack(self):
+        """Test catalog endpoints render MessagePack when asked to"""
+        user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        salt = Ingredient.objects.create(name="Salt", price=0.5)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        res = client.get(
+            reverse("ingredient-list"), HTTP_ACCEPT="application/msgpack"
+        )
+
+        self.assertEqual(res["Content-Type"], "application/msgpack")
+        self.assertEqual(
+            msgpack.unpackb(res.content),
+            [
+                {
+                    "id": salt.id,
+                    "name": "Salt",
+                    "price": 0.5,
+                    "vegetarian": False,
+                    "vegan": False,
+                    "gluten_free": False,
+                    "nut_free": False,
+                    "dairy_free": False,
+                    "version": 1,
+                }
+            ],
+        )
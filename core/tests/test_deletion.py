@@ -0,0 +1,168 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import deletion, rollups
+from core.models import (
+    CatalogChange,
+    Cuisine,
+    CuisineRollup,
+    Deletion,
+    Dish,
+    Ingredient,
+    IngredientRollup,
+    Menu,
+    Restaurant,
+    RestaurantRollup,
+)
+
+
+class DeletionTest(TestCase):
+    """Tests for chunked restaurant and cuisine deletions"""
+
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(
+            name="Spice",
+            owner="A",
+            location="Delhi",
+            email="a@spice.com",
+            contact_number="123",
+            website="https://spice.com",
+        )
+        self.indian = Cuisine.objects.create(name="Indian", origin="India")
+        self.thai = Cuisine.objects.create(name="Thai", origin="Thailand")
+        self.rice = Ingredient.objects.create(name="Rice", price="1.00")
+        self.dishes = [
+            Dish.objects.create(
+                name="Dish %d" % i, price="10.00", cuisine=self.indian
+            )
+            for i in range(5)
+        ]
+        self.curry = Dish.objects.create(
+            name="Curry", price="8.00", cuisine=self.thai
+        )
+        for dish in self.dishes + [self.curry]:
+            dish.ingredients.add(self.rice)
+        self.menus = [
+            Menu.objects.create(restaurant=self.restaurant) for _ in range(3)
+        ]
+        for menu in self.menus:
+            menu.dishes.add(self.dishes[0], self.curry)
+            menu.cuisines.add(self.indian)
+        self.other = Menu.objects.create()
+        self.other.dishes.add(self.dishes[1], self.curry)
+        self.other.cuisines.add(self.indian, self.thai)
+
+    def test_purge_restaurant(self):
+        """Test menus go in chunks and rollups and the log stay current"""
+        steps = list(deletion.purge_restaurant(self.restaurant.id, 2))
+
+        self.assertEqual(steps, [2, 1, 1])
+        self.assertFalse(Restaurant.objects.exists())
+        self.assertEqual(list(Menu.objects.all()), [self.other])
+        self.assertFalse(RestaurantRollup.objects.exists())
+        self.assertEqual(
+            set(
+                CatalogChange.objects.filter(
+                    operation=CatalogChange.DELETE
+                ).values_list("model", "object_id")
+            ),
+            {("menu", menu.id) for menu in self.menus}
+            | {("restaurant", self.restaurant.id)},
+        )
+
+    def test_purge_cuisine(self):
+        """Test dishes and links go and the derived data matches a rebuild"""
+        steps = list(deletion.purge_cuisine(self.indian.id, 2))
+
+        self.assertEqual(steps, [2, 2, 1, 1])
+        self.assertEqual(list(Dish.objects.all()), [self.curry])
+        self.assertEqual(list(self.other.cuisines.all()), [self.thai])
+        self.assertEqual(IngredientRollup.objects.get().dish_count, 1)
+        self.assertEqual(
+            RestaurantRollup.objects.get().price_total, Decimal("24.00")
+        )
+        self.assertFalse(CuisineRollup.objects.filter(cuisine=self.indian.id))
+        updated = CatalogChange.objects.filter(
+            model="menu", operation=CatalogChange.UPDATE
+        ).values_list("object_id", flat=True)
+        self.assertEqual(
+            set(updated), {menu.id for menu in self.menus + [self.other]}
+        )
+
+        kept = (
+            set(CuisineRollup.objects.values_list("cuisine", "dish_count")),
+            set(RestaurantRollup.objects.values_list("dish_count")),
+        )
+        rollups.rebuild()
+        self.assertEqual(
+            kept,
+            (
+                set(
+                    CuisineRollup.objects.values_list("cuisine", "dish_count")
+                ),
+                set(RestaurantRollup.objects.values_list("dish_count")),
+            ),
+        )
+
+    @override_settings(DELETION_ASYNC_THRESHOLD=2, DELETION_CHUNK_SIZE=2)
+    def test_schedule_and_run(self):
+        """Test large objects get a deletion that reports its progress"""
+        self.assertIsNone(deletion.schedule(self.thai))
+        self.assertFalse(Cuisine.objects.filter(id=self.thai.id).exists())
+
+        job = deletion.schedule(self.restaurant)
+        self.assertEqual((job.status, job.total), (Deletion.PENDING, 4))
+        self.assertEqual(deletion.schedule(self.restaurant), job)
+        self.assertTrue(Restaurant.objects.exists())
+
+        deletion.run(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted), (Deletion.DONE, 4))
+        self.assertFalse(Restaurant.objects.exists())
+
+    @override_settings(DELETION_ASYNC_THRESHOLD=2, DELETION_CHUNK_SIZE=2)
+    def test_abandoned_deletion_resumed(self):
+        """Test a deletion cut short is resumed by the next request"""
+        job = deletion.schedule(self.restaurant)
+        Deletion.objects.filter(pk=job.pk).update(status=Deletion.RUNNING)
+
+        with patch("core.deletion.transaction.on_commit") as on_commit:
+            self.assertEqual(deletion.schedule(self.restaurant), job)
+            on_commit.assert_not_called()
+
+            Deletion.objects.filter(pk=job.pk).update(
+                updated=timezone.now() - timedelta(hours=1)
+            )
+            self.assertEqual(deletion.schedule(self.restaurant), job)
+            self.assertEqual(deletion.schedule(self.restaurant), job)
+
+        on_commit.assert_called_once()
+        with patch("core.deletion.start") as start:
+            on_commit.call_args[0][0]()
+        start.assert_called_once_with(job.pk)
+
+    @override_settings(DELETION_ASYNC_THRESHOLD=2, DELETION_CHUNK_SIZE=2)
+    def test_run_deletions_resumes_abandoned(self):
+        """Test the command finishes only deletions no thread works on"""
+        job = deletion.schedule(self.restaurant)
+        out = StringIO()
+
+        call_command("run_deletions", stdout=out)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Deletion.PENDING)
+
+        Deletion.objects.filter(pk=job.pk).update(
+            updated=timezone.now() - timedelta(hours=1)
+        )
+        call_command("run_deletions", stdout=out)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted), (Deletion.DONE, 4))
+        self.assertFalse(Restaurant.objects.exists())
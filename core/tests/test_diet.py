@@ -0,0 +1,69 @@
+from django.test import TestCase
+
+from core import diet
+from core.models import CatalogChange, Dish, Ingredient
+
+
+class DietTest(TestCase):
+    """Tests for the dietary bitmask of dishes"""
+
+    def setUp(self):
+        self.tofu = Ingredient.objects.create(
+            name="Tofu", price="2.00", vegetarian=True, vegan=True
+        )
+        self.peanut = Ingredient.objects.create(
+            name="Peanut", price="1.00", vegetarian=True, vegan=True
+        )
+        self.dish = Dish.objects.create(name="Satay", price="9.00")
+
+    def test_supersets(self):
+        required = diet.mask(["vegan", "nut_free"])
+        masks = diet.supersets(required)
+
+        self.assertEqual(len(masks), 8)
+        self.assertIn(diet.ALL, masks)
+        self.assertTrue(all(value & required == required for value in masks))
+
+    def test_links_update_the_mask(self):
+        """Test the mask holds the flags shared by all ingredients"""
+        self.dish.ingredients.add(self.tofu)
+        self.assertEqual(self.dish.diet, diet.mask(["vegetarian", "vegan"]))
+
+        self.dish.ingredients.add(self.peanut)
+        self.peanut.vegan = False
+        self.peanut.save()
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.diet, diet.mask(["vegetarian"]))
+        self.assertEqual(self.dish.version, 2)
+
+        self.dish.ingredients.remove(self.peanut)
+        self.dish.refresh_from_db()
+        self.assertEqual(diet.flags(self.dish.diet), ["vegetarian", "vegan"])
+
+        self.dish.ingredients.clear()
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.diet, 0)
+
+    def test_ingredient_flags_log_dish_updates(self):
+        self.dish.ingredients.add(self.tofu)
+        CatalogChange.objects.all().delete()
+
+        self.tofu.gluten_free = True
+        self.tofu.save()
+
+        self.dish.refresh_from_db()
+        self.assertIn("gluten_free", diet.flags(self.dish.diet))
+        self.assertTrue(
+            CatalogChange.objects.filter(
+                model="dish", object_id=self.dish.id
+            ).exists()
+        )
+
+    def test_reverse_links_and_deletes(self):
+        self.tofu.dish_set.add(self.dish)
+        self.dish.refresh_from_db()
+        self.assertEqual(diet.flags(self.dish.diet), ["vegetarian", "vegan"])
+
+        self.tofu.delete()
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.diet, 0)
@@ -0,0 +1,206 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core import changes
+from core.authentication import issue_access_token, issue_stream_ticket
+from core.events import Broker, Tailer, broker, restaurants_for
+from core.models import Dish, ExpiringToken, Ingredient, Menu, Restaurant
+from core.streams import EventStreamApp
+
+
+def change(model, pk, operation="update"):
+    return {"model": model, "id": pk, "operation": operation}
+
+
+@override_settings(EVENTS_COALESCE_WINDOW=0)
+class TestBroker(SimpleTestCase):
+    """Tests for the in-process change broker"""
+
+    def test_coalesces_changes_per_object(self):
+        """Test a burst of changes to one object is sent once"""
+        broker = Broker()
+
+        async def run():
+            subscription = broker.subscribe()
+            broker.publish(change("dish", 1), {1})
+            broker.publish(change("dish", 2), {1})
+            broker.publish(change("dish", 1, "delete"), {1})
+            await asyncio.sleep(0)
+            return await subscription.next_batch(1)
+
+        batch = asyncio.run(run())
+
+        self.assertEqual(
+            batch, [change("dish", 1, "delete"), change("dish", 2)]
+        )
+
+    def test_routes_by_restaurant(self):
+        """Test subscribers only get changes to their restaurants"""
+        broker = Broker()
+
+        async def run():
+            first = broker.subscribe({1})
+            second = broker.subscribe({2})
+            broker.publish(change("menu", 5), {1})
+            await asyncio.sleep(0)
+            batches = (
+                await first.next_batch(0.01),
+                await second.next_batch(0.01),
+            )
+            broker.unsubscribe(first)
+            broker.unsubscribe(second)
+            return batches
+
+        self.assertEqual(asyncio.run(run()), ([change("menu", 5)], []))
+        self.assertEqual(len(broker), 0)
+        self.assertFalse(broker.has_subscribers)
+
+
+def create_restaurant(name):
+    return Restaurant.objects.create(
+        name=name,
+        owner="A",
+        location="Delhi",
+        email="a@%s.com" % name.lower(),
+        contact_number="123",
+        website="https://%s.com" % name.lower(),
+    )
+
+
+class TestRestaurantsFor(TestCase):
+    """Test changed objects are routed to the restaurants listing them"""
+
+    def test_lookups(self):
+        rice = Ingredient.objects.create(name="Rice", price="1.00")
+        dish = Dish.objects.create(name="Biryani", price="10.00")
+        dish.ingredients.add(rice)
+        spice, other = create_restaurant("Spice"), create_restaurant("Other")
+        menu = Menu.objects.create(restaurant=spice)
+        menu.dishes.add(dish)
+        Menu.objects.create(restaurant=other)
+
+        self.assertEqual(
+            restaurants_for("dish", [dish.id]), {dish.id: {spice.id}}
+        )
+        self.assertEqual(
+            restaurants_for("ingredient", [rice.id]), {rice.id: {spice.id}}
+        )
+        self.assertEqual(
+            restaurants_for("menu", [menu.id]), {menu.id: {spice.id}}
+        )
+        self.assertEqual(
+            restaurants_for("restaurant", [other.id]), {other.id: {other.id}}
+        )
+
+
+class RecordingBroker:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, event, restaurants):
+        self.published.append((event, restaurants))
+
+
+class TestTailer(TestCase):
+    """Test changes written anywhere are published from the change log"""
+
+    def test_publishes_logged_changes(self):
+        spice, other = create_restaurant("Spice"), create_restaurant("Other")
+        menu = Menu.objects.create(restaurant=spice)
+        tailer = Tailer(RecordingBroker())
+        tailer.last = changes.current_version()
+        dish = Dish.objects.create(name="Biryani", price="10.00")
+        menu.dishes.add(dish)
+        gone = Menu.objects.create(restaurant=other)
+        gone_id = gone.id
+        gone.delete()
+
+        tailer.poll()
+
+        self.assertEqual(
+            tailer.broker.published,
+            [
+                (change("dish", dish.id, "create"), {spice.id}),
+                (change("menu", menu.id), {spice.id}),
+                (change("menu", gone_id, "create"), set()),
+                (change("menu", gone_id, "delete"), None),
+            ],
+        )
+        self.assertEqual(tailer.last, changes.current_version())
+
+    @patch("core.events.close_old_connections")
+    def test_poll_replaces_broken_connections(self, close_old_connections):
+        """Test connections are checked before and after each poll"""
+        tailer = Tailer(RecordingBroker())
+        tailer.last = changes.current_version()
+
+        tailer.poll()
+
+        self.assertEqual(close_old_connections.call_count, 2)
+
+
+@override_settings(
+    STATELESS_AUTH=True, EVENTS_COALESCE_WINDOW=0, EVENTS_HEARTBEAT=5
+)
+class TestEventStream(TestCase):
+    """Tests for the server-sent events stream"""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.com", password="password@123",
+        )
+        token = ExpiringToken.objects.issue(user)
+        self.access = issue_access_token(token)
+        self.ticket = issue_stream_ticket(user, token)
+        self.app = EventStreamApp(None)
+
+    def tearDown(self):
+        broker.clear()
+
+    def scope(self, query):
+        return {
+            "type": "http",
+            "path": "/api/events/",
+            "query_string": query.encode(),
+            "headers": [],
+        }
+
+    def test_unauthenticated(self):
+        """Test tokens are not accepted in the query string"""
+        async def run():
+            communicator = ApplicationCommunicator(
+                self.app, self.scope("restaurant=1&access=" + self.access)
+            )
+            await communicator.send_input({"type": "http.request"})
+            return await communicator.receive_output(1)
+
+        start = async_to_sync(run)()
+
+        self.assertEqual(start["status"], 401)
+
+    def test_streams_changes(self):
+        async def run():
+            communicator = ApplicationCommunicator(
+                self.app, self.scope("restaurant=1&ticket=" + self.ticket)
+            )
+            await communicator.send_input({"type": "http.request"})
+            start = await communicator.receive_output(1)
+            broker.publish(change("dish", 3), {1})
+            body = await communicator.receive_output(1)
+            await communicator.send_input({"type": "http.disconnect"})
+            await communicator.wait(1)
+            return start, body
+
+        start, body = async_to_sync(run)()
+
+        self.assertEqual(start["status"], 200)
+        event, data = body["body"].decode().strip().split("\n")
+        self.assertEqual(event, "event: changes")
+        self.assertEqual(json.loads(data[6:]), [change("dish", 3)])
+        self.assertEqual(len(broker), 0)
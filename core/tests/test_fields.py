@@ -0,0 +1,48 @@
+from django.test import TestCase
+
+from core.models import Dish, Menu
+from core.serializers import MenuSerializer
+
+
+class TestBulkRelatedFields(TestCase):
+    """Tests for many related fields validated in one query"""
+
+    def setUp(self):
+        self.dishes = [
+            Dish.objects.create(name="Dish %d" % i, price="1.00")
+            for i in range(30)
+        ]
+        self.ids = [dish.id for dish in self.dishes]
+
+    def test_validates_in_one_query(self):
+        serializer = MenuSerializer(data={"dishes": self.ids})
+
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+
+        self.assertEqual(serializer.validated_data["dishes"], self.dishes)
+
+    def test_reports_all_missing_ids(self):
+        serializer = MenuSerializer(
+            data={"dishes": [self.ids[0], 998, "999", 998]}
+        )
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(
+            serializer.errors["dishes"],
+            ['Invalid pks "998, 999" - objects do not exist.'],
+        )
+
+    def test_rejects_incorrect_types(self):
+        serializer = MenuSerializer(data={"dishes": [self.ids[0], "abc"]})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("Incorrect type", serializer.errors["dishes"][0])
+
+    def test_save_sets_links(self):
+        menu = Menu.objects.create()
+        serializer = MenuSerializer(menu, data={"dishes": self.ids})
+        serializer.is_valid()
+        serializer.save()
+
+        self.assertEqual(list(menu.dishes.order_by("id")), self.dishes)
@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from core import fuzzy
+from core.models import Dish, Ingredient
+
+
+class TrigramTest(TestCase):
+    """Tests for the trigram similarity fallback"""
+
+    def setUp(self):
+        fuzzy.trigram_index.clear()
+
+    def test_trigrams_match_pg_trgm(self):
+        self.assertEqual(
+            fuzzy.trigrams("Tika!"), {"  t", " ti", "tik", "ika", "ka "}
+        )
+
+    def test_search_scores(self):
+        tikka = Dish.objects.create(name="Paneer Tikka", price=12)
+        Dish.objects.create(name="Pasta", price=9)
+
+        found = fuzzy.trigram_index.search("dish", "panner tika", 10)
+
+        self.assertEqual([pk for pk, score in found], [tikka.id])
+        self.assertAlmostEqual(found[0][1], 8 / 17)
+
+    def test_discard(self):
+        salt = Ingredient.objects.create(name="Salt", price=1)
+        self.assertEqual(
+            len(fuzzy.trigram_index.search("ingredient", "salt", 5)), 1
+        )
+
+        salt.delete()
+
+        self.assertEqual(
+            fuzzy.trigram_index.search("ingredient", "salt", 5), []
+        )
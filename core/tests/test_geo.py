@@ -0,0 +1,152 @@
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from core import geo
+from core.models import CatalogChange, Restaurant
+
+
+def create_restaurant(name, location="Delhi", **kwargs):
+    return Restaurant.objects.create(
+        name=name,
+        owner="A",
+        location=location,
+        email="a@%s.com" % name.lower(),
+        contact_number="123",
+        website="https://%s.com" % name.lower(),
+        **kwargs
+    )
+
+
+class TestGeohash(SimpleTestCase):
+    """Tests for geohash helpers"""
+
+    def test_encode(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geo.encode(-25.382708, -49.265506, 6), "6gkzwg")
+
+    def test_cell_block_wraps_antimeridian(self):
+        cells = geo.cell_block(0.1, 179.99, 3)
+
+        self.assertEqual(len(cells), 9)
+        self.assertIn(geo.encode(0.1, -179.9, 3), cells)
+
+    def test_distance(self):
+        self.assertAlmostEqual(
+            geo.distance(28.6139, 77.2090, 19.0760, 72.8777), 1148, delta=2
+        )
+
+
+class TestNearby(TestCase):
+    """Tests for nearest and within-radius restaurant lookups"""
+
+    def setUp(self):
+        points = {
+            "Connaught": (28.6315, 77.2167),
+            "IndiaGate": (28.6129, 77.2295),
+            "Noida": (28.5355, 77.3910),
+            "Mumbai": (19.0760, 72.8777),
+        }
+        self.restaurants = {
+            name: create_restaurant(name, latitude=lat, longitude=lng)
+            for name, (lat, lng) in points.items()
+        }
+        create_restaurant("Unknown")
+
+    def names(self, found):
+        return [restaurant.name for distance, restaurant in found]
+
+    def test_nearest(self):
+        found = geo.nearby(Restaurant.objects.all(), 28.6139, 77.2090, 3)
+
+        self.assertEqual(
+            self.names(found), ["IndiaGate", "Connaught", "Noida"]
+        )
+        self.assertLess(found[0][0], found[1][0])
+
+    def test_within_radius(self):
+        found = geo.nearby(
+            Restaurant.objects.all(), 28.6139, 77.2090, 10, radius=5
+        )
+
+        self.assertEqual(self.names(found), ["IndiaGate", "Connaught"])
+
+    def test_nearest_widens_to_coarser_cells(self):
+        """Test the search widens for far objects, but only so far"""
+        found = geo.nearby(Restaurant.objects.all(), 26.9124, 75.7873, 4)
+
+        self.assertEqual(
+            set(self.names(found)), {"Connaught", "IndiaGate", "Noida"}
+        )
+
+        found = geo.nearby(Restaurant.objects.all(), -33.86, 151.2, 10)
+
+        self.assertEqual(found, [])
+
+    def test_loads_only_nearest(self):
+        with self.assertNumQueries(2):
+            found = geo.nearby(
+                Restaurant.objects.all(), 28.6129, 77.2295, 1, radius=100
+            )
+
+        self.assertEqual(self.names(found), ["IndiaGate"])
+
+    def test_radius_search_stops_at_nearest(self):
+        """Test a wide radius is not scanned once the nearest are found"""
+        with patch.object(geo, "candidates", wraps=geo.candidates) as scan:
+            found = geo.nearby(
+                Restaurant.objects.all(), 28.6139, 77.2090, 1, radius=100
+            )
+
+        self.assertEqual(self.names(found), ["IndiaGate"])
+        finest_covering = next(
+            precision
+            for precision in range(geo.PRECISION, 0, -1)
+            if geo.covered_radius(28.6139, precision) >= 100
+        )
+        self.assertGreater(scan.call_args[0][3], finest_covering)
+
+    def test_geohash_follows_position(self):
+        restaurant = self.restaurants["Noida"]
+        restaurant.latitude, restaurant.longitude = 19.0760, 72.8777
+        restaurant.save(update_fields=["latitude", "longitude"])
+
+        restaurant.refresh_from_db()
+        self.assertEqual(restaurant.geohash, geo.encode(19.0760, 72.8777))
+
+
+class TestGeocodeCommand(TestCase):
+    """Tests for the restaurant geocoding backfill"""
+
+    def test_backfill(self):
+        delhi = create_restaurant("Spice", location="  new   DELHI ")
+        nowhere = create_restaurant("Nowhere", location="Atlantis")
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False
+        ) as places:
+            places.write("location,latitude,longitude\n")
+            places.write("New Delhi,28.6139,77.2090\n")
+            places.write("Broken,abc,1\n")
+        self.addCleanup(os.remove, places.name)
+        out = StringIO()
+
+        call_command(
+            "geocode_restaurants", places.name, batch_size=1, stdout=out
+        )
+
+        self.assertIn("Located 1 restaurants, 1 not found", out.getvalue())
+        delhi.refresh_from_db()
+        nowhere.refresh_from_db()
+        self.assertEqual((delhi.latitude, delhi.longitude), (28.6139, 77.2090))
+        self.assertEqual(delhi.geohash, geo.encode(28.6139, 77.2090))
+        self.assertEqual(delhi.version, 2)
+        self.assertIsNone(nowhere.geohash)
+        self.assertTrue(
+            CatalogChange.objects.filter(
+                model="restaurant", object_id=delhi.id, operation="update"
+            ).exists()
+        )
@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+from django.db.utils import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.warmup import state
+
+
+class HealthTest(TestCase):
+    """Tests for the health and readiness endpoints"""
+
+    def setUp(self):
+        state.reset()
+
+    def test_live(self):
+        """Test liveness does not need warmup or the database"""
+        with self.assertNumQueries(0):
+            res = self.client.get(reverse("health-live"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(state.ready)
+
+    def test_ready_runs_warmup(self):
+        """Test readiness warms the worker up and reports step timings"""
+        res = self.client.get(reverse("health-ready"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(state.ready)
+        self.assertIn("core.warmup.load_urls", res.json()["warmup"])
+
+    @override_settings(WARMUP_STEPS=["core.warmup.load_urls", "missing.step"])
+    def test_not_ready_until_warmup_succeeds(self):
+        """Test a failing step keeps the worker out of rotation"""
+        with self.assertLogs("core.warmup", level="ERROR"):
+            res = self.client.get(reverse("health-ready"))
+
+        self.assertEqual(res.status_code, 503)
+        self.assertFalse(state.ready)
+        self.assertIn("core.warmup.load_urls", state.timings)
+
+    def test_not_ready_without_database(self):
+        """Test readiness fails when the database cannot be queried"""
+        state.run()
+        with patch("django.db.backends.utils.CursorWrapper.execute") as ex:
+            ex.side_effect = OperationalError
+            res = self.client.get(reverse("health-ready"))
+
+        self.assertEqual(res.status_code, 503)
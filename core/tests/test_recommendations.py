@@ -0,0 +1,66 @@
+from django.test import TestCase
+
+from core.models import Dish, Ingredient
+from core.recommendations import dish_index
+
+
+class DishIngredientIndexTest(TestCase):
+    """Tests for the in-memory dish similarity index"""
+
+    def setUp(self):
+        dish_index.clear()
+        self.paneer = Ingredient.objects.create(name="Paneer", price=3)
+        self.tomato = Ingredient.objects.create(name="Tomato", price=1)
+        self.cream = Ingredient.objects.create(name="Cream", price=2)
+        self.tikka = Dish.objects.create(name="Paneer Tikka", price=12)
+        self.tikka.ingredients.add(self.paneer, self.tomato)
+        self.makhani = Dish.objects.create(name="Paneer Makhani", price=18)
+        self.makhani.ingredients.add(self.paneer, self.tomato, self.cream)
+        self.soup = Dish.objects.create(name="Tomato Soup", price=5)
+        self.soup.ingredients.add(self.tomato)
+
+    def test_similar_jaccard(self):
+        """Test similar dishes are ranked by Jaccard similarity"""
+        ranked = dish_index.similar(self.tikka.pk)
+
+        self.assertEqual(
+            ranked, [(self.makhani.pk, 2 / 3), (self.soup.pk, 1 / 2)]
+        )
+
+    def test_similar_cosine(self):
+        """Test similar dishes can be ranked by cosine similarity"""
+        ranked = dish_index.similar(self.soup.pk, k=1, metric="cosine")
+
+        self.assertEqual(ranked, [(self.tikka.pk, 1 / 2 ** 0.5)])
+
+    def test_makeable(self):
+        """Test dishes fully covered by the ingredients rank first"""
+        ranked = dish_index.makeable([self.paneer.pk, self.tomato.pk])
+
+        self.assertEqual(
+            ranked,
+            [
+                (self.tikka.pk, 1.0),
+                (self.soup.pk, 1.0),
+                (self.makhani.pk, 2 / 3),
+            ],
+        )
+
+    def test_index_updated_from_signals(self):
+        """Test ingredient changes are applied without a rebuild"""
+        dish_index.build()
+        self.soup.ingredients.add(self.cream)
+        self.paneer.dish_set.remove(self.tikka)
+        self.tomato.delete()
+
+        with self.assertNumQueries(0):
+            ranked = dish_index.similar(self.soup.pk)
+        self.assertEqual(ranked, [(self.makhani.pk, 1 / 2)])
+
+    def test_deleted_dish_removed(self):
+        """Test a deleted dish is no longer recommended"""
+        dish_index.build()
+        self.makhani.delete()
+
+        ranked = dish_index.similar(self.tikka.pk)
+        self.assertEqual(ranked, [(self.soup.pk, 0.5)])
@@ -0,0 +1,140 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import rollups
+from core.models import (
+    Cuisine,
+    CuisineRollup,
+    Dish,
+    Ingredient,
+    IngredientRollup,
+    Menu,
+    Restaurant,
+    RestaurantRollup,
+)
+
+
+def snapshot():
+    """Return the non-empty rollup rows as comparable tuples"""
+    return (
+        set(
+            CuisineRollup.objects.filter(dish_count__gt=0).values_list(
+                "cuisine", "dish_count", "price_total"
+            )
+        ),
+        set(
+            RestaurantRollup.objects.filter(dish_count__gt=0).values_list(
+                "restaurant", "dish_count", "price_total"
+            )
+        ),
+        set(
+            IngredientRollup.objects.filter(dish_count__gt=0).values_list(
+                "ingredient", "dish_count"
+            )
+        ),
+    )
+
+
+def create_restaurant(name):
+    return Restaurant.objects.create(
+        name=name,
+        owner="A",
+        location="Delhi",
+        email="a@%s.com" % name.lower(),
+        contact_number="123",
+        website="https://%s.com" % name.lower(),
+    )
+
+
+class TestRollups(TestCase):
+    """Test incremental rollups agree with a full rebuild"""
+
+    def setUp(self):
+        self.indian = Cuisine.objects.create(name="Indian", origin="India")
+        self.thai = Cuisine.objects.create(name="Thai", origin="Thailand")
+        self.rice, self.salt, self.lime = (
+            Ingredient.objects.create(name=name, price="1.00")
+            for name in ("Rice", "Salt", "Lime")
+        )
+        self.biryani = Dish.objects.create(
+            name="Biryani", price="10.50", cuisine=self.indian
+        )
+        self.curry = Dish.objects.create(
+            name="Curry", price="8.00", cuisine=self.thai
+        )
+        self.spice = create_restaurant("Spice")
+        self.menu = Menu.objects.create(restaurant=self.spice)
+
+    def assertMatchesRebuild(self):
+        incremental = snapshot()
+        rollups.rebuild()
+        self.assertEqual(incremental, snapshot())
+
+    def test_dish_changes(self):
+        """Test creating, repricing and moving dishes between cuisines"""
+        self.assertEqual(
+            CuisineRollup.objects.get(cuisine=self.indian).price_total,
+            Decimal("10.50"),
+        )
+        self.menu.dishes.add(self.biryani)
+        self.biryani.price = "12.25"
+        self.biryani.cuisine = self.thai
+        self.biryani.save()
+        self.curry.delete()
+
+        self.assertEqual(
+            RestaurantRollup.objects.get(restaurant=self.spice).price_total,
+            Decimal("12.25"),
+        )
+        self.assertMatchesRebuild()
+
+    def test_ingredient_links(self):
+        """Test adding, removing and clearing ingredients both ways"""
+        self.biryani.ingredients.add(self.rice, self.salt)
+        self.curry.ingredients.add(self.rice)
+        self.lime.dish_set.add(self.curry, self.biryani)
+        self.biryani.ingredients.remove(self.salt, self.lime)
+        self.biryani.ingredients.remove(self.salt)
+        self.rice.dish_set.clear()
+
+        self.assertEqual(
+            IngredientRollup.objects.get(ingredient=self.lime).dish_count, 1
+        )
+        self.assertMatchesRebuild()
+
+    def test_menu_listings(self):
+        """Test listings follow menu dishes, restaurants and deletions"""
+        other = create_restaurant("Other")
+        second = Menu.objects.create(restaurant=self.spice)
+        self.menu.dishes.add(self.biryani, self.curry)
+        self.curry.menu_set.add(second)
+        second.dishes.remove(self.curry)
+        self.menu.restaurant = other
+        self.menu.save()
+        second.dishes.add(self.biryani)
+        self.biryani.delete()
+
+        self.assertEqual(
+            RestaurantRollup.objects.get(restaurant=other).dish_count, 1
+        )
+        self.assertMatchesRebuild()
+        self.menu.delete()
+        self.assertMatchesRebuild()
+
+    def test_rebuild_command(self):
+        """Test the rebuild command restores rollups that drifted"""
+        self.biryani.ingredients.add(self.rice)
+        CuisineRollup.objects.all().delete()
+        IngredientRollup.objects.update(dish_count=5)
+        out = StringIO()
+
+        call_command("rebuild_rollups", stdout=out)
+
+        self.assertIn("2 cuisines", out.getvalue())
+        self.assertEqual(
+            IngredientRollup.objects.get(ingredient=self.rice).dish_count, 1
+        )
+        self.assertEqual(CuisineRollup.objects.count(), 2)
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.views import DishesViewSet
+from core.throttling import (
+    CatalogThrottle,
+    LocalStore,
+    SlidingWindowThrottle,
+    TokenBucketThrottle,
+    local_store,
+)
+
+
+class FakeClockMixin:
+    now = 1000.0
+
+    def timer(self):
+        return self.now
+
+
+class Bucket(FakeClockMixin, TokenBucketThrottle):
+    scope = "test"
+
+
+class Window(FakeClockMixin, SlidingWindowThrottle):
+    scope = "test"
+
+
+@override_settings(RATE_LIMITS={"test": "10/s"})
+class ThrottleAlgorithmTest(TestCase):
+    """Tests for the token bucket and sliding window algorithms"""
+
+    def test_token_bucket_allows_burst_then_refills(self):
+        """Test the bucket empties, then refills at the configured rate"""
+        throttle = Bucket()
+        state = None
+        for _ in range(10):
+            state, wait = throttle.consume(state, 1, 0)
+            self.assertIsNone(wait)
+
+        state, wait = throttle.consume(state, 2, 0)
+        self.assertAlmostEqual(wait, 0.2)
+        state, wait = throttle.consume(state, 2, 0.2)
+        self.assertIsNone(wait)
+
+    def test_sliding_window_weights_previous_window(self):
+        """Test the previous window still counts while it overlaps"""
+        throttle = Window()
+        state = None
+        for _ in range(10):
+            state, wait = throttle.consume(state, 1, 100.0)
+            self.assertIsNone(wait)
+
+        state, wait = throttle.consume(state, 1, 100.5)
+        self.assertAlmostEqual(wait, 0.5)
+        state, wait = throttle.consume(state, 1, 101.05)
+        self.assertAlmostEqual(wait, 0.05)
+        state, wait = throttle.consume(state, 1, 101.2)
+        self.assertIsNone(wait)
+
+    def test_local_store_sweeps_expired_entries(self):
+        """Test expired counters are dropped once the store is full"""
+        store = LocalStore(max_entries=2)
+        store.update("a", lambda value: (1, None), -1)
+        store.update("b", lambda value: (1, None), -1)
+        store.update("c", lambda value: (1, None), 60)
+
+        self.assertEqual(list(store._data), ["c"])
+
+
+@override_settings(
+    RATE_LIMITS={"catalog": "4/min", "auth": "2/min"},
+    RATE_LIMIT_COSTS={"list": 2, "search": 2},
+)
+class RateLimitAPITest(TestCase):
+    """Tests for rate limits on the API"""
+
+    def setUp(self):
+        local_store.clear()
+        self.user = get_user_model().objects.create_user(
+            email="xyz@test.com", password="password123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        local_store.clear()
+
+    def test_lists_limited_with_retry_after(self):
+        """Test lists use up the bucket and report when to retry"""
+        url = reverse("dish-list")
+        for _ in range(2):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "30")
+
+    def test_search_costs_more(self):
+        """Test a search on a list costs more than the list alone"""
+        factory = APIRequestFactory()
+        view = DishesViewSet(action="list")
+        throttle = CatalogThrottle()
+
+        request = Request(factory.get("/", {"search": "tikka"}))
+        self.assertEqual(throttle.get_cost(request, view), 4)
+        request = Request(factory.get("/"))
+        self.assertEqual(throttle.get_cost(request, view), 2)
+        view.action = "retrieve"
+        self.assertEqual(throttle.get_cost(request, view), 1)
+
+    def test_batch_costs_each_request(self):
+        """Test a batch takes a token for every request it carries"""
+        paths = ["/api/dishes/1/", "/api/dishes/2/", "/api/dishes/3/"]
+        url = reverse("batch")
+        res = self.client.post(url, {"requests": paths}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.post(url, {"requests": paths[:2]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_routes_limited_separately(self):
+        """Test exhausting one route leaves the others usable"""
+        for _ in range(2):
+            self.client.get(reverse("dish-list"))
+
+        res = self.client.get(reverse("ingredient-list"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_login_limited_by_ip(self):
+        """Test repeated login attempts are throttled"""
+        client = APIClient()
+        url = reverse("user:token")
+        payload = {"email": "xyz@test.com", "password": "wrong"}
+        for _ in range(2):
+            res = client.post(url, payload)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = client.post(url, payload)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
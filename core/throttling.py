@@ -0,0 +1,224 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from core.revocation import fingerprint
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """Parse a rate such as ``"100/min"`` into (requests, seconds)"""
+    if rate is None:
+        return None, None
+    num, period = rate.split("/")
+    return int(num), DURATIONS[period[0]]
+
+
+class LocalStore:
+    """Counter store kept in this process
+
+    Entries carry their own expiry and are swept whenever the store grows
+    past ``max_entries``, so idle clients do not accumulate forever.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def update(self, key, func, timeout):
+        """Replace the value at ``key`` with ``func(value)`` atomically"""
+        now = time.monotonic()
+        with self._lock:
+            value, expires = self._data.get(key, (None, None))
+            if expires is not None and expires <= now:
+                value = None
+            value, result = func(value)
+            self._data[key] = (value, now + timeout)
+            if len(self._data) > self.max_entries:
+                self._sweep(now)
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._data = {}
+
+    def _sweep(self, now):
+        self._data = {
+            key: entry for key, entry in self._data.items() if entry[1] > now
+        }
+
+
+class CacheStore:
+    """Counter store shared between workers through a Django cache
+
+    The read-modify-write is not atomic, so concurrent requests from the
+    same client on different workers may occasionally both be admitted.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def update(self, key, func, timeout):
+        cache = caches[self.alias]
+        value, result = func(cache.get(key))
+        cache.set(key, value, timeout)
+        return result
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+local_store = LocalStore()
+
+
+def get_store():
+    """Return the shared cache store if configured, else the local one"""
+    if settings.RATE_LIMIT_CACHE:
+        return CacheStore(settings.RATE_LIMIT_CACHE)
+    return local_store
+
+
+class RateThrottle(BaseThrottle):
+    """Base for throttles keyed by client and route with weighted costs
+
+    ``scope`` names the entry in ``RATE_LIMITS`` holding the rate. The
+    client is the token it authenticated with, else the user, else the IP
+    address, and each route is limited separately. Requests cost more when
+    they search or list a whole collection, as configured in
+    ``RATE_LIMIT_COSTS``.
+    """
+
+    scope = None
+    timer = time.time
+
+    def __init__(self):
+        self.num_requests, self.duration = parse_rate(
+            settings.RATE_LIMITS.get(self.scope)
+        )
+        self.wait_seconds = None
+
+    def get_client(self, request):
+        auth = request.auth
+        if getattr(auth, "key", None):
+            return "token:%s" % fingerprint(auth.key)
+        if isinstance(auth, dict) and "r" in auth:
+            return "token:%s" % auth["r"]
+        if request.user and request.user.is_authenticated:
+            return "user:%s" % request.user.pk
+        return "ip:%s" % self.get_ident(request)
+
+    def get_route(self, request, view):
+        basename = getattr(view, "basename", None) or type(view).__name__
+        return "%s.%s" % (basename, getattr(view, "action", None) or "")
+
+    def get_cache_key(self, request, view):
+        return "throttle:%s:%s:%s" % (
+            self.scope,
+            self.get_client(request),
+            self.get_route(request, view),
+        )
+
+    def get_cost(self, request, view):
+        costs = settings.RATE_LIMIT_COSTS
+        cost = 1
+        if getattr(view, "action", None) == "list":
+            cost = costs.get("list", 1)
+        if request.query_params.get(api_settings.SEARCH_PARAM):
+            cost += costs.get("search", 0)
+        return cost
+
+    def allow_request(self, request, view):
+        if self.num_requests is None:
+            return True
+        key = self.get_cache_key(request, view)
+        cost = self.get_cost(request, view)
+        now = self.timer()
+        self.wait_seconds = get_store().update(
+            key,
+            lambda state: self.consume(state, cost, now),
+            self.duration * 2,
+        )
+        return self.wait_seconds is None
+
+    def consume(self, state, cost, now):
+        """Return the new state and None, or the seconds to wait"""
+        raise NotImplementedError
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class TokenBucketThrottle(RateThrottle):
+    """Token bucket allowing bursts up to the full rate
+
+    The bucket holds ``num_requests`` tokens and refills continuously over
+    ``duration``; each request takes its cost in tokens.
+    """
+
+    def consume(self, state, cost, now):
+        capacity = self.num_requests
+        refill = capacity / self.duration
+        cost = min(cost, capacity)
+        tokens, updated = state or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        if tokens >= cost:
+            return (tokens - cost, now), None
+        return (tokens, now), (cost - tokens) / refill
+
+
+class SlidingWindowThrottle(RateThrottle):
+    """Sliding window counter without bursts at window boundaries
+
+    The previous fixed window's count is weighted by how much of it still
+    overlaps the sliding window, which approximates a true sliding log in
+    constant space.
+    """
+
+    def consume(self, state, cost, now):
+        window = int(now // self.duration)
+        current_window, current, previous = state or (window, 0, 0)
+        if window != current_window:
+            previous = current if window == current_window + 1 else 0
+            current = 0
+        elapsed = now / self.duration - window
+        weighted = previous * (1 - elapsed) + current
+        state = (window, current, previous)
+        if weighted + cost <= self.num_requests:
+            return (window, current + cost, previous), None
+        if previous and current + cost <= self.num_requests:
+            excess = weighted + cost - self.num_requests
+            return state, excess / previous * self.duration
+        return state, (1 - elapsed) * self.duration
+
+
+class CatalogThrottle(TokenBucketThrottle):
+    """Limits reads and writes on the catalog viewsets"""
+
+    scope = "catalog"
+
+
+class BatchThrottle(CatalogThrottle):
+    """Limits batches by the catalog requests they carry
+
+    Detail lookups of a batch are answered without dispatching them to
+    their views, so the batch costs a token for each request it holds.
+    """
+
+    def get_cost(self, request, view):
+        data = request.data if hasattr(request.data, "get") else {}
+        paths = data.get("requests")
+        if isinstance(paths, list) and paths:
+            return len(paths)
+        return 1
+
+
+class AuthThrottle(SlidingWindowThrottle):
+    """Limits sign up and login attempts"""
+
+    scope = "auth"
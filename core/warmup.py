@@ -0,0 +1,92 @@
+import inspect
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.urls import resolve, reverse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupState:
+    """Tracks whether this worker has finished warming up"""
+
+    def __init__(self):
+        self.ready = False
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def run(self):
+        """Run every step in ``WARMUP_STEPS`` once and mark the worker ready
+
+        A failing step is logged and retried on the next call, so the
+        readiness probe keeps reporting the worker as not ready until the
+        whole warmup has succeeded.
+        """
+        with self._lock:
+            if self.ready:
+                return True
+            for path in settings.WARMUP_STEPS:
+                if path in self.timings:
+                    continue
+                started = time.monotonic()
+                try:
+                    import_string(path)()
+                except Exception:
+                    logger.exception("Warmup step %s failed", path)
+                    return False
+                self.timings[path] = time.monotonic() - started
+            self.ready = True
+            return True
+
+    def reset(self):
+        with self._lock:
+            self.ready = False
+            self.timings = {}
+
+
+state = WarmupState()
+
+
+def load_urls():
+    """Import every view module and compile the URL resolver"""
+    resolve(reverse("dish-list"))
+
+
+def build_serializers():
+    """Build the field maps of the catalog serializers once"""
+    from rest_framework.serializers import BaseSerializer
+
+    from core import serializers
+
+    for name, serializer_class in inspect.getmembers(
+        serializers, inspect.isclass
+    ):
+        if (
+            issubclass(serializer_class, BaseSerializer)
+            and serializer_class.__module__ == serializers.__name__
+        ):
+            serializer_class().fields
+
+
+def open_connections():
+    """Connect to every configured database"""
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def build_recommendation_index():
+    """Load the dish similarity index"""
+    from core.recommendations import dish_index
+
+    dish_index.ensure_built()
+
+
+def build_autocomplete_index():
+    """Load the catalog name prefix index"""
+    from core.autocomplete import name_index
+
+    name_index.ensure_built()
@@ -1,11 +1,13 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 CREATE_USER_URL = reverse("user:create")
 TOKEN_URL = reverse("user:token")
+REFRESH_URL = reverse("user:refresh")
+REVOKE_URL = reverse("user:revoke")
 ME_URL = reverse("user:me")
 
 
@@ -70,6 +72,26 @@ class PublicUserApiTests(TestCase):
         self.assertIn("token", res.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    @override_settings(STATELESS_AUTH=True)
+    def test_create_access_token_for_user(self):
+        """Test a signed access token is issued and can be refreshed"""
+        payload = {"email": "test@londonappdev.com", "password": "testpass"}
+        create_user(**payload)
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertIn("access", res.data)
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + res.data["access"]
+        )
+        dishes = self.client.get(reverse("dish-list"))
+        self.assertEqual(dishes.status_code, status.HTTP_200_OK)
+
+        token = res.data["token"]
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + token)
+        res = self.client.post(REFRESH_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+
     def test_create_token_invalid_credentials(self):
         """Test that token is not created if invalid credentials are given"""
         create_user(email="test@londonappdev.com", password="testpass")
@@ -135,3 +157,18 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload["name"])
         self.assertTrue(self.user.check_password(payload["password"]))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_revoke_token(self):
+        """Test a revoked token can no longer be used"""
+        payload = {"email": "other@londonappdev.com", "password": "testpass"}
+        create_user(**payload)
+        token = self.client.post(TOKEN_URL, payload).data["token"]
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token " + token)
+
+        self.assertEqual(client.get(ME_URL).status_code, status.HTTP_200_OK)
+        res = client.post(REVOKE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        res = client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -7,5 +7,11 @@ app_name = "user"
 urlpatterns = [
     path("create/", views.CreateUserView.as_view(), name="create"),
     path("token/", views.CreateTokenView.as_view(), name="token"),
+    path(
+        "token/refresh/",
+        views.RefreshAccessTokenView.as_view(),
+        name="refresh",
+    ),
+    path("token/revoke/", views.RevokeTokenView.as_view(), name="revoke"),
     path("me/", views.ManageUserView.as_view(), name="me"),
 ]
@@ -1,7 +1,17 @@
-from rest_framework import generics, authentication, permissions
+from django.conf import settings
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
+from core.authentication import (
+    ExpiringTokenAuthentication,
+    issue_access_token,
+)
+from core.models import ExpiringToken
+from core.revocation import revoked_tokens
+from core.throttling import AuthThrottle
 from user.serializers import UserSerializer, AuthTokenSerializer
 
 
@@ -9,6 +19,7 @@ class CreateUserView(generics.CreateAPIView):
     """Create a new user in the system"""
 
     serializer_class = UserSerializer
+    throttle_classes = (AuthThrottle,)
 
 
 class CreateTokenView(ObtainAuthToken):
@@ -16,13 +27,51 @@ class CreateTokenView(ObtainAuthToken):
 
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = (AuthThrottle,)
+
+    def post(self, request, *args, **kwargs):
+        """Return a live expiring token for the authenticated user"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = ExpiringToken.objects.issue(serializer.validated_data["user"])
+        data = {"token": token.key, "expires": token.expires}
+        if settings.STATELESS_AUTH:
+            data["access"] = issue_access_token(token)
+        return Response(data)
+
+
+class RefreshAccessTokenView(APIView):
+    """Issue a new signed access token using an expiring token"""
+
+    authentication_classes = (ExpiringTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        """Return a fresh access token for the authenticating token"""
+        if not settings.STATELESS_AUTH:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response({"access": issue_access_token(request.auth)})
+
+
+class RevokeTokenView(APIView):
+    """Revoke the token used to make the request"""
+
+    authentication_classes = (ExpiringTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        """Delete the token and add it to the shared revocation list"""
+        token = request.auth
+        revoked_tokens.revoke(token.key, token.expires)
+        token.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
 
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (ExpiringTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):